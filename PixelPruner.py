@@ -2,24 +2,69 @@ import sys
 import os
 import json
 import tkinter as tk
-from tkinter import filedialog, ttk, messagebox
+from tkinter import filedialog, ttk, messagebox, simpledialog
 from tkinterdnd2 import TkinterDnD, DND_FILES
-import subprocess
-import zipfile
-from datetime import datetime
-import webbrowser
-import winsound
 import threading
-from packaging.version import parse
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import archives
+import perf
+from imagestore import ImageStore, MB, load_image_file
+from jobs import crop_output_path
+from journal import CropJournal
+from trash import Trash
+from captions import TagStore, caption_path
+from imageindex import ImageIndex
+from blit import PhotoSurface, benchmark, new_photo, transfer_method
+from render import CROP_BOX, CROPS, IMAGE, PREVIEW, SOURCE_LAYOUT, SOURCES, RenderScheduler
+from folderindex import INDEX_DIR, FolderIndex
+from imageops import (
+    apply_orientation,
+    box_to_source,
+    open_working_image,
+    oriented_size,
+    pyramid_factor,
+    read_region,
+    reduce_image,
+)
 
 # For Pillow >= 10
 try:
-    from PIL import Image, ImageTk, __version__ as PILLOW_VERSION
+    from PIL import Image, __version__ as PILLOW_VERSION
     Resampling = Image.Resampling
 except AttributeError:
     # For older versions
     Resampling = Image
 
+# Gallery layout: thumbnail edge length and number of columns
+SOURCE_THUMB_SIZE = 128
+SOURCE_COLUMNS = 3
+CROP_THUMB_SIZE = 256
+CROP_COLUMNS = 2
+GALLERY_SPACING = 10
+
+# Orders and shape filters of the sources gallery; the first of each is the default
+SOURCE_SORTS = ("Folder order", "Name", "Resolution", "Aspect ratio", "File size", "Modified")
+SOURCE_SHAPES = ("All", "Too small", "Landscape", "Portrait", "Square")
+
+# Number of upcoming images to compute crop suggestions for, and how many
+# suggestions to remember
+SUGGESTION_LOOKAHEAD = 3
+SUGGESTION_CACHE_SIZE = 256
+
+# Background of the PrunerIQ rating badge on crop thumbnails
+RATING_COLORS = {
+    "Excellent": "#2e7d32",
+    "Good": "#558b2f",
+    "Fair": "#ef6c00",
+    "Poor": "#c62828",
+}
+
+# Caption edits are written to disk this long after the last change
+CAPTION_FLUSH_DELAY_MS = 2000
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -36,6 +81,15 @@ def app_path():
         return os.path.dirname(sys.executable)
     return os.path.abspath(os.path.dirname(__file__))
 
+def open_in_explorer(folder):
+    # Imported on use to keep startup fast
+    import subprocess
+    subprocess.Popen(['explorer', folder.replace("/", "\\")])
+
+def open_link(url):
+    import webbrowser
+    webbrowser.open_new(url)
+
 class ToolTip:
     def __init__(self, widget, text):
         self.widget = widget
@@ -79,9 +133,12 @@ class PixelPruner:
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="File", menu=self.file_menu)
         self.file_menu.add_command(label="Set Input Folder", command=self.select_input_folder)
+        self.file_menu.add_command(label="Open Archive...", command=self.open_archive)
+        self.file_menu.add_command(label="Open Video...", command=self.open_video)
         self.file_menu.add_command(label="Set Output Folder", command=self.select_output_folder)
         self.file_menu.add_command(label="Open Current Input Folder", command=self.open_input_folder)
         self.file_menu.add_command(label="Open Current Output Folder", command=self.open_output_folder)
+        self.file_menu.add_command(label="Replay Crop Session...", command=self.replay_crop_session)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=master.quit)
 
@@ -89,7 +146,15 @@ class PixelPruner:
         self.edit_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Edit", menu=self.edit_menu)
         self.edit_menu.add_command(label="Undo Last Crop", command=self.undo_last_crop)
+        self.edit_menu.add_command(label="Redo Crop", command=self.redo_crop)
         self.edit_menu.add_command(label="Zip Crops", command=self.zip_crops)
+        self.edit_menu.add_separator()
+        self.edit_menu.add_command(label="Restore Last Delete", command=self.restore_last_delete)
+        self.edit_menu.add_command(label="Restore All Deleted", command=self.restore_all_deleted)
+        self.edit_menu.add_command(label="Empty Trash", command=self.empty_trash)
+        self.edit_menu.add_separator()
+        self.edit_menu.add_command(label="Save Crop Template", command=self.save_crop_template)
+        self.edit_menu.add_command(label="Apply Template to All...", command=self.apply_template_to_all)
 
         # Create the View menu
         self.view_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -105,16 +170,33 @@ class PixelPruner:
         self.crop_sound_var = tk.BooleanVar(value=False)
         self.show_welcome_var = tk.BooleanVar(value=True)
         self.safe_mode_var = tk.BooleanVar(value=False)
+        self.perf_enabled_var = tk.BooleanVar(value=False)
+        self.autocrop_var = tk.BooleanVar(value=False)
+        self.captions_var = tk.BooleanVar(value=False)
+        self.score_crops_var = tk.BooleanVar(value=False)
+        self.profile_var = tk.BooleanVar(value=False)
         self.default_input_folder = ""
         self.default_output_folder = ""
         self.settings_menu.add_checkbutton(label="Auto-advance", variable=self.auto_advance_var, command=self.save_settings)
         self.settings_menu.add_checkbutton(label="Crop Sound", variable=self.crop_sound_var, command=self.save_settings)
+        self.settings_menu.add_checkbutton(label="Auto-crop Suggestions", variable=self.autocrop_var, command=self.toggle_autocrop)
+        self.settings_menu.add_checkbutton(label="Caption Sidecars", variable=self.captions_var, command=self.save_settings)
+        self.settings_menu.add_checkbutton(label="Score Crops", variable=self.score_crops_var, command=self.save_settings)
+        self.settings_menu.add_checkbutton(label="Performance Timing", variable=self.perf_enabled_var, command=self.toggle_perf_timing)
         self.settings_menu.add_command(label="Set Defaults", command=self.show_welcome_screen)
+        self.settings_menu.add_command(label="Memory Budget...", command=self.set_memory_budget)
+        self.settings_menu.add_command(label="Video Frame Window...", command=self.set_video_window)
+        self.settings_menu.add_command(label="Trash Retention...", command=self.set_trash_retention)
 
         # Create the Tools menu
         self.tools_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Tools", menu=self.tools_menu)
         self.tools_menu.add_command(label="PrunerIQ Analysis", command=self.launch_pruneriq)
+        self.tools_menu.add_command(label="Open PrunerIQ Results...", command=self.open_pruneriq_results)
+        self.tools_menu.add_command(label="Auto-crop All Images...", command=self.autocrop_all)
+        self.tools_menu.add_command(label="Captions...", command=self.show_captions_dialog)
+        self.tools_menu.add_command(label="Aspect Buckets...", command=self.show_buckets_dialog)
+        self.tools_menu.add_command(label="Performance...", command=self.show_performance_dialog)
 
         # Create the Help menu
         self.help_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -128,6 +210,7 @@ class PixelPruner:
         
         self.size_var = tk.StringVar()
         self.custom_option = "Custom..."
+        self.bucket_option = "Auto Bucket"
         self.size_options = [
             "512x512",
             "768x768",
@@ -257,32 +340,12 @@ class PixelPruner:
         self.canvas = tk.Canvas(self.main_frame, cursor="cross", bg="gray")
         self.canvas.pack(side=tk.LEFT, fill="both", expand=True)
 
-        self.preview_canvas = tk.Canvas(self.main_frame, width=512, height=512, bg="gray")
-        self.preview_canvas.pack_forget()  # Hide preview pane initially
-
-        # Create a frame for the crops pane with a scrollable canvas
-        self.crops_frame = tk.Frame(self.main_frame)
-        self.crops_canvas = tk.Canvas(self.crops_frame, bg="gray", width=512)  # Set width to match preview pane
-        self.crops_scrollbar = tk.Scrollbar(self.crops_frame, orient="vertical", command=self.crops_canvas.yview)
-        self.crops_canvas.configure(yscrollcommand=self.crops_scrollbar.set)
-        self.crops_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.crops_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.crops_frame.pack_forget()  # Hide crops pane initially
-
-        self.crops_canvas.bind("<Enter>", self.bind_crops_mouse_wheel)
-        self.crops_canvas.bind("<Leave>", self.unbind_crops_mouse_wheel)
-
-        # Create a frame for the source images pane with a scrollable canvas
-        self.source_frame = tk.Frame(self.main_frame)
-        self.source_canvas = tk.Canvas(self.source_frame, bg="gray", width=512)
-        self.source_scrollbar = tk.Scrollbar(self.source_frame, orient="vertical", command=self.source_canvas.yview)
-        self.source_canvas.configure(yscrollcommand=self.source_scrollbar.set)
-        self.source_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.source_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.source_frame.pack_forget()  # Hide source pane initially
-
-        self.source_canvas.bind("<Enter>", lambda e: self.source_canvas.bind_all("<MouseWheel>", self.on_source_mouse_wheel))
-        self.source_canvas.bind("<Leave>", lambda e: self.source_canvas.unbind_all("<MouseWheel>"))
+        # The side panes are built the first time they are shown
+        self.preview_canvas = None
+        self.crops_frame = None
+        self.crops_canvas = None
+        self.source_frame = None
+        self.source_canvas = None
 
         self.status_bar = tk.Frame(master, bd=1, relief=tk.SUNKEN)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -290,11 +353,17 @@ class PixelPruner:
         self.status_label.pack(side=tk.LEFT, padx=10)
         self.cropped_images_label = tk.Label(self.status_bar, text="Images Cropped: 0", anchor=tk.E)
         self.cropped_images_label.pack(side=tk.RIGHT, padx=10)
+        self.memory_label = tk.Label(self.status_bar, text="", anchor=tk.E)
+        self.memory_label.pack(side=tk.RIGHT, padx=10)
 
         self.folder_path = None
-        self.images = []
+        self.images = ImageIndex()
         self.image_index = 0
         self.current_image = None
+        self.current_path = None
+        self.source_size = (0, 0)  # Full resolution of the source behind current_image
+        self.source_factor = 1  # current_image pixels per source pixel, > 1 for reduced working copies
+        self.orientation = 0  # Pending counter-clockwise rotation of current_image in degrees
         self.image_scale = 1
         self.rect = None
         self.image_offset_x = 0
@@ -303,9 +372,50 @@ class PixelPruner:
         self.original_size = (512, 512)
         self.current_size = (512, 512)
         self.crop_counter = 0  # Global counter for all crops
-        self.cropped_images = []  # List to keep track of cropped images
-        self.cropped_thumbnails = []  # List to keep track of cropped thumbnails
-        self.source_thumbnails = []  # Thumbnails for source images
+        self.cropped_images = ImageIndex(newest_first=True)  # Cropped images, newest first
+        self.image_store = ImageStore()  # Decoded images and thumbnails, bounded by the memory budget
+        self.display_surface = PhotoSurface(self.master)  # Reused Tk images for the main canvas and preview
+        self.preview_surface = PhotoSurface(self.master)
+        self.preview_item = None
+        self.display_key = None  # What the display surface currently shows
+        self.pointer = None  # Last mouse position over the canvas
+
+        # Event handlers mark parts dirty; each is repainted at most once per frame
+        self.renderer = RenderScheduler(self.master)
+        self.renderer.register(IMAGE, self.redraw_image, covers=(CROP_BOX,))
+        self.renderer.register(CROP_BOX, self.move_crop_box)
+        self.renderer.register(PREVIEW, self.redraw_preview)
+        self.renderer.register(SOURCE_LAYOUT, self.refresh_source_canvas, covers=(SOURCES,))
+        self.renderer.register(SOURCES, self.draw_visible_sources)
+        self.renderer.register(CROPS, self.draw_visible_crops)
+        self.source_items = {}  # Gallery index -> (canvas item, thumbnail) for visible sources
+        self.crop_items = {}  # Gallery index -> canvas items and thumbnail for visible crops
+        self.source_offset_x = 0
+        self.crop_journals = {}  # Output folder -> CropJournal
+        self.redo_crops = []  # (output folder, trash batch) of undone crops, newest last
+        self.crop_template = None  # Relative crop box applied by "Apply Template to All"
+        self.trash = Trash()  # Deleted files are moved here in the background
+        self.folder_index = FolderIndex(os.path.join(app_path(), INDEX_DIR))  # Cached folder listings
+        self.tag_stores = {}  # Folder -> TagStore of caption sidecars
+        self.buckets = []  # (width, height) aspect buckets used by "Auto Bucket"
+        self.metric_stores = {}  # Folder -> MetricStore of PrunerIQ metrics
+        self.crop_ratings = {}  # Crop path -> PrunerIQ rating shown on its thumbnail
+        self.scoring_executor = None
+        self.metadata_index = None  # Generation metadata, opened on first use
+        self.metadata_executor = None
+        self.metadata_cancel = threading.Event()
+        self.source_filter = None  # Sources matching the gallery filters, None when unfiltered
+        self.source_filter_var = tk.StringVar()
+        self.source_query = ""  # Metadata query applied to the gallery
+        self.source_headers = {}  # Source path -> header fields read by FolderIndex.headers
+        self.source_rank = {}  # Source path -> position in load order
+        self.header_executor = None
+        self.source_sort_var = tk.StringVar(value=SOURCE_SORTS[0])
+        self.source_sort_reverse_var = tk.BooleanVar(value=False)
+        self.source_shape_var = tk.StringVar(value=SOURCE_SHAPES[0])
+        self.caption_flush_id = None
+        self.crop_suggestions = OrderedDict()  # (path, size) -> suggested box, None while pending
+        self.suggestion_executor = None
         self.preview_enabled = False  # Preview pane toggle
         self.crops_enabled = False  # Crop thumbnails pane toggle
         self.source_enabled = False  # Source images pane toggle
@@ -333,6 +443,7 @@ class PixelPruner:
         # Track window state to resize images when the window is maximized or restored
         self.last_state = self.master.state()
         self.master.bind("<Configure>", self.on_window_resize)
+        self.canvas.bind("<Configure>", lambda e: self.renderer.request(IMAGE))
 
         self.master.minsize(1300, 750)  # Set a minimum size for the window
 
@@ -342,7 +453,9 @@ class PixelPruner:
         self.master.bind("a", lambda event: self.rotate_image(90))
         self.master.bind("d", lambda event: self.rotate_image(-90))
         self.master.bind("<Control-z>", lambda event: self.undo_last_crop())
+        self.master.bind("<Control-y>", lambda event: self.redo_crop())
         self.master.bind("<Delete>", lambda event: self.delete_current_image())
+        self.master.bind("<Return>", lambda event: self.accept_crop_suggestion())
 
         # Set the focus to the master window
         master.focus_set()
@@ -350,6 +463,9 @@ class PixelPruner:
         # Load user settings and apply them
         self.load_settings()
         self.update_safe_mode_ui()
+        self.update_memory_label()
+        self.resume_crop_session()
+        self.purge_expired_trash()
         self.master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Center the window on the screen
@@ -357,6 +473,66 @@ class PixelPruner:
 
         if self.show_welcome_var.get():
             self.show_welcome_screen()
+        elif self.folder_path:
+            # Restore the default folder once the window is up
+            self.master.after_idle(self.load_images_from_folder)
+
+    def build_preview_pane(self):
+        self.preview_canvas = tk.Canvas(self.main_frame, width=512, height=512, bg="gray")
+
+    def build_crops_pane(self):
+        # Create a frame for the crops pane with a scrollable canvas
+        self.crops_frame = tk.Frame(self.main_frame)
+        self.crops_canvas = tk.Canvas(self.crops_frame, bg="gray", width=512)  # Set width to match preview pane
+        self.crops_scrollbar = tk.Scrollbar(self.crops_frame, orient="vertical", command=self.on_crops_scroll)
+        self.crops_canvas.configure(yscrollcommand=self.crops_scrollbar.set)
+        self.crops_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.crops_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.crops_canvas.bind("<Enter>", self.bind_crops_mouse_wheel)
+        self.crops_canvas.bind("<Leave>", self.unbind_crops_mouse_wheel)
+        self.crops_canvas.bind("<Configure>", lambda e: self.renderer.request(CROPS))
+        self.refresh_crops_canvas()
+
+    def build_source_pane(self):
+        # Create a frame for the source images pane with a scrollable canvas
+        self.source_frame = tk.Frame(self.main_frame)
+
+        # Filter by generation metadata above the gallery
+        filter_row = tk.Frame(self.source_frame)
+        filter_row.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        filter_entry = tk.Entry(filter_row, textvariable=self.source_filter_var)
+        # Keep typed letters away from the window's W/A/S/D and Delete shortcuts
+        filter_entry.bindtags((str(filter_entry), "Entry", "all"))
+        filter_entry.bind("<Return>", lambda e: self.apply_source_filter(self.source_filter_var.get()))
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        ToolTip(filter_entry, "Filter by prompt words, seed:, model: or sampler:")
+        tk.Button(filter_row, text="Filter", command=lambda: self.apply_source_filter(self.source_filter_var.get())).pack(side=tk.LEFT)
+        tk.Button(filter_row, text="Clear", command=lambda: self.apply_source_filter("")).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Sort and filter by the header fields of the sources
+        sort_row = tk.Frame(self.source_frame)
+        sort_row.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        tk.Label(sort_row, text="Sort:").pack(side=tk.LEFT)
+        sort_box = ttk.Combobox(sort_row, textvariable=self.source_sort_var, values=SOURCE_SORTS, state="readonly", width=13)
+        sort_box.bind("<<ComboboxSelected>>", lambda e: self.sort_sources())
+        sort_box.pack(side=tk.LEFT, padx=(5, 0))
+        tk.Checkbutton(sort_row, text="Reverse", variable=self.source_sort_reverse_var, command=self.sort_sources).pack(side=tk.LEFT, padx=(5, 0))
+        tk.Label(sort_row, text="Show:").pack(side=tk.LEFT, padx=(10, 0))
+        shape_box = ttk.Combobox(sort_row, textvariable=self.source_shape_var, values=SOURCE_SHAPES, state="readonly", width=10)
+        shape_box.bind("<<ComboboxSelected>>", lambda e: self.update_source_filter())
+        shape_box.pack(side=tk.LEFT, padx=(5, 0))
+        ToolTip(shape_box, "Too small: sources that cannot fill the selected crop size without upscaling")
+
+        self.source_canvas = tk.Canvas(self.source_frame, bg="gray", width=512)
+        self.source_scrollbar = tk.Scrollbar(self.source_frame, orient="vertical", command=self.on_source_scroll)
+        self.source_canvas.configure(yscrollcommand=self.source_scrollbar.set)
+        self.source_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.source_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.source_canvas.bind("<Enter>", lambda e: self.source_canvas.bind_all("<MouseWheel>", self.on_source_mouse_wheel))
+        self.source_canvas.bind("<Leave>", lambda e: self.source_canvas.unbind_all("<MouseWheel>"))
+        self.source_canvas.bind("<Configure>", lambda e: self.renderer.request(SOURCE_LAYOUT))
 
     def center_window(self):
         self.master.update_idletasks()
@@ -377,6 +553,89 @@ class PixelPruner:
     def update_cropped_images_counter(self):
         self.cropped_images_label.config(text=f"Images Cropped: {len(self.cropped_images)}")
 
+    def update_memory_label(self):
+        used = self.image_store.used_bytes / MB
+        budget = self.image_store.budget_bytes / MB
+        self.memory_label.config(text=f"Memory: {used:.0f} / {budget:.0f} MB")
+
+    def set_current_image(self, image, path=None, source_size=None):
+        """Replace the working image, releasing the previous decode immediately.
+
+        ``source_size`` is the full resolution of the file at ``path`` when
+        ``image`` is a reduced working copy of a very large source.
+        """
+        previous = self.current_image
+        self.current_image = image
+        self.current_path = path
+        self.orientation = 0
+        self.display_key = None
+        if image is not None:
+            self.source_size = source_size or image.size
+            self.source_factor = self.source_size[0] / image.width
+        self.image_store.discard_where(lambda key: key[0] == "pyramid")
+        if previous is not None and previous is not image:
+            previous.close()
+        if image is None:
+            self.image_store.discard(("current",))
+        else:
+            self.image_store.put(("current",), image, pinned=True)
+
+    def pyramid_level(self, factor):
+        """Return ``current_image`` reduced by a power-of-two ``factor``."""
+        if factor == 1:
+            return self.current_image
+        return self.image_store.get(("pyramid", factor), lambda: reduce_image(self.current_image, factor))
+
+    def canvas_box_to_image(self, x1, y1, x2, y2):
+        """Convert canvas coordinates to a sorted box on the full-resolution (rotated) image."""
+        real_x1, real_y1 = (x1 - self.image_offset_x) * self.image_scale, (y1 - self.image_offset_y) * self.image_scale
+        real_x2, real_y2 = (x2 - self.image_offset_x) * self.image_scale, (y2 - self.image_offset_y) * self.image_scale
+        if real_x1 > real_x2:
+            real_x1, real_x2 = real_x2, real_x1
+        if real_y1 > real_y2:
+            real_y1, real_y2 = real_y2, real_y1
+        return real_x1, real_y1, real_x2, real_y2
+
+    def oriented_box_to_source(self, box):
+        """Map a box on the rotated view to coordinates in the unrotated source."""
+        return box_to_source(box, self.source_size, self.orientation)
+
+    def read_source_region(self, box):
+        """Return the full-resolution pixels of ``box`` (source coordinates).
+
+        The resident decode is used when it is full resolution; reduced
+        working copies of huge sources read only the tiles under the box.
+        """
+        if self.source_factor == 1:
+            return read_region(self.current_path, box, cached=self.current_image)
+        return read_region(self.current_path, box)
+
+    def set_memory_budget(self):
+        budget = simpledialog.askinteger(
+            "Memory Budget",
+            "Maximum memory for cached images (MB):",
+            initialvalue=self.settings.get("memory_budget_mb", 1024),
+            minvalue=64,
+            parent=self.master,
+        )
+        if budget:
+            self.settings["memory_budget_mb"] = budget
+            self.image_store.set_budget(budget)
+            self.update_memory_label()
+            self.save_settings()
+
+    def set_video_window(self):
+        seconds = simpledialog.askfloat(
+            "Video Frame Window",
+            "Keep the sharpest frame of every (seconds):",
+            initialvalue=self.settings.get("video_window_seconds", 1.0),
+            minvalue=0.05,
+            parent=self.master,
+        )
+        if seconds:
+            self.settings["video_window_seconds"] = seconds
+            self.save_settings()
+
     def show_info_message(self, title, message):
         if not self.showing_popup:
             self.showing_popup = True
@@ -391,18 +650,27 @@ class PixelPruner:
         # Update Edit menu entry for Undo Last Crop
         try:
             self.edit_menu.entryconfig("Undo Last Crop", state=state)
+            self.edit_menu.entryconfig("Empty Trash", state=state)
         except Exception:
             pass
 
     def on_window_resize(self, event):
-        """Redraw the image when the window is resized or state changes."""
-        if event.widget is self.master and self.current_image:
-            # Only redraw when the zoom state or canvas size changes
+        """Redraw the image when the window state changes.
+
+        Canvas size changes are caught by the canvas' own ``<Configure>``
+        binding; both only mark the image dirty.
+        """
+        if event.widget is self.master:
             state = self.master.state()
-            if state != self.last_state or event.width != self.canvas.winfo_width() or event.height != self.canvas.winfo_height():
+            if state != self.last_state:
                 self.last_state = state
-                self.display_image()
+                self.renderer.request(IMAGE)
 
+    def redraw_image(self):
+        if self.current_image is not None:
+            self.display_image()
+
+    @perf.timed("load_image")
     def load_image(self):
         if not self.folder_path and not self.images:
             self.show_info_message("Information", "Please select an input folder.")
@@ -410,15 +678,23 @@ class PixelPruner:
         if 0 <= self.image_index < len(self.images):
             try:
                 image_path = self.images[self.image_index]
-                self.current_image = Image.open(image_path)
+                image, source_size = open_working_image(image_path)
+            except Image.DecompressionBombError:
+                messagebox.showerror("Error", f"Image is too large to open safely: {image_path}")
+                return
             except IOError:
                 messagebox.showerror("Error", f"Failed to load image: {image_path}")
                 return
 
+            self.set_current_image(image, image_path, source_size)
             self.display_image()
+            self.update_memory_label()
 
+    @perf.timed("display_image")
     def display_image(self):
-        aspect_ratio = self.current_image.width / self.current_image.height
+        self.renderer.discard(IMAGE)
+        image_width, image_height = oriented_size(self.source_size, self.orientation)
+        aspect_ratio = image_width / image_height
 
         # Determine available canvas space. When the window is maximized
         # ("zoomed" state on Windows), use the full canvas size. Otherwise
@@ -427,29 +703,42 @@ class PixelPruner:
         max_w = self.canvas.winfo_width() if is_zoomed else 800
         max_h = self.canvas.winfo_height() if is_zoomed else 600
 
-        self.scaled_width = min(self.current_image.width, max_w)
+        self.scaled_width = min(image_width, max_w)
         self.scaled_height = int(self.scaled_width / aspect_ratio)
         if self.scaled_height > max_h:
-            self.scaled_height = min(self.current_image.height, max_h)
+            self.scaled_height = min(image_height, max_h)
             self.scaled_width = int(self.scaled_height * aspect_ratio)
         
         resampling_filter = Resampling.LANCZOS
-        
-        self.tkimage = ImageTk.PhotoImage(self.current_image.resize((self.scaled_width, self.scaled_height), resampling_filter))
+
+        # Resample the smallest pyramid level covering the view, then apply
+        # the rotation to the small result instead of the full image
+        display_size = oriented_size((self.scaled_width, self.scaled_height), self.orientation)
+        key = (self.current_path, self.orientation, display_size)
+        if key != self.display_key:
+            # Resizes and pane toggles that keep the size only recentre
+            level = self.pyramid_level(pyramid_factor(self.current_image.size, display_size))
+            display = apply_orientation(level.resize(display_size, resampling_filter), self.orientation)
+            self.display_surface.show(display)
+            self.tkimage = self.display_surface.photo
+            self.image_store.put(("display",), self.tkimage, pinned=True)
+            self.display_key = key
 
         # Center the image within the canvas
         self.center_image_on_canvas()
 
         self.canvas.delete("all")
         self.canvas.create_image(self.image_offset_x, self.image_offset_y, anchor="nw", image=self.tkimage)
-        self.image_scale = self.current_image.width / self.scaled_width
-        size = tuple(map(int, self.size_var.get().split('x')))
+        self.image_scale = image_width / self.scaled_width
+        size = self.selected_crop_size()
         self.original_size = size
         self.current_size = size
-        scaled_size = (int(size[0] / self.image_scale), int(size[1] / self.image_scale))  # Scale crop box to match displayed image
+        scaled_size = self.fit_crop_box(size)  # Scale crop box to match displayed image
         self.rect = self.canvas.create_rectangle(self.image_offset_x, self.image_offset_y, self.image_offset_x + scaled_size[0], self.image_offset_y + scaled_size[1], outline='red')
         self.update_crop_box_size()
         self.update_image_counter()
+        self.schedule_crop_suggestions()
+        self.apply_crop_suggestion()
 
     def center_image_on_canvas(self):
         canvas_width = self.canvas.winfo_width()
@@ -461,8 +750,9 @@ class PixelPruner:
         if not self.folder_path and not self.images:
             self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
             return
-        if self.current_image:
-            self.current_image = self.current_image.rotate(angle, expand=True)
+        if self.current_image is not None:
+            # Only the orientation flag changes; the source is never resampled
+            self.orientation = (self.orientation + angle) % 360
             self.display_image()
             self.update_status(f"Image rotated by {angle} degrees")
 
@@ -473,8 +763,12 @@ class PixelPruner:
             self.size_var.set(self.previous_size)
             self.open_custom_size_dialog()
         else:
-            self.previous_size = selection
+            if selection != self.bucket_option:
+                self.previous_size = selection
             self.update_crop_box_size()
+            self.schedule_crop_suggestions()
+            self.apply_crop_suggestion()
+            self.on_target_size_changed()
 
     def open_custom_size_dialog(self):
         dialog = tk.Toplevel(self.master)
@@ -511,6 +805,7 @@ class PixelPruner:
             self.size_var.set(value)
             self.previous_size = value
             self.update_crop_box_size()
+            self.on_target_size_changed()
             dialog.destroy()
 
         def cancel():
@@ -532,42 +827,54 @@ class PixelPruner:
     def update_crop_box_size(self, event=None):
         if self.rect:
             self.canvas.delete(self.rect)  # Remove existing rectangle before creating a new one
-            size = tuple(map(int, self.size_var.get().split('x')))
+            size = self.selected_crop_size()
             self.original_size = size
             self.current_size = size
-            scaled_size = (int(size[0] / self.image_scale), int(size[1] / self.image_scale))
-            if scaled_size[0] > self.scaled_width:
-                scaled_size = (self.scaled_width, self.scaled_width)
-            if scaled_size[1] > self.scaled_height:
-                scaled_size = (self.scaled_height, self.scaled_height)
+            scaled_size = self.fit_crop_box(size)
             self.rect = self.canvas.create_rectangle(self.image_offset_x, self.image_offset_y, self.image_offset_x + scaled_size[0], self.image_offset_y + scaled_size[1], outline='red')
 
+    def selected_crop_size(self):
+        """Return the output size chosen in the size dropdown.
+
+        With "Auto Bucket" selected this is the planned aspect bucket
+        closest to the current (rotated) image.
+        """
+        selection = self.size_var.get()
+        if selection == self.bucket_option:
+            if self.buckets and self.current_image is not None:
+                from buckets import nearest_bucket
+                return nearest_bucket(oriented_size(self.source_size, self.orientation), self.buckets)
+            selection = self.previous_size if self.previous_size != self.bucket_option else "512x512"
+        return tuple(map(int, selection.split('x')))
+
+    def fit_crop_box(self, size):
+        """Return the on-screen size of a ``size`` crop, shrunk to fit the image."""
+        scale = max(self.image_scale, size[0] / self.scaled_width, size[1] / self.scaled_height)
+        return (int(size[0] / scale), int(size[1] / scale))
+
     def on_mouse_move(self, event):
         if self.rect:
-            size = self.current_size
-            scaled_size = (int(size[0] / self.image_scale), int(size[1] / self.image_scale))
-            if scaled_size[0] > self.scaled_width:
-                scaled_size = (self.scaled_width, self.scaled_width)
-            if scaled_size[1] > self.scaled_height:
-                scaled_size = (self.scaled_height, self.scaled_height)
-            x1, y1 = max(self.image_offset_x, min(event.x, self.image_offset_x + self.scaled_width - scaled_size[0])), max(self.image_offset_y, min(event.y, self.image_offset_y + self.scaled_height - scaled_size[1]))
+            # Only the latest position of a burst of motion events is drawn
+            self.pointer = (event.x, event.y)
+            parts = (CROP_BOX, PREVIEW) if self.preview_enabled else (CROP_BOX,)
+            self.renderer.request(*parts)
+
+    def move_crop_box(self):
+        if self.rect and self.pointer:
+            x, y = self.pointer
+            scaled_size = self.fit_crop_box(self.current_size)
+            x1, y1 = max(self.image_offset_x, min(x, self.image_offset_x + self.scaled_width - scaled_size[0])), max(self.image_offset_y, min(y, self.image_offset_y + self.scaled_height - scaled_size[1]))
             x2, y2 = x1 + scaled_size[0], y1 + scaled_size[1]
             self.canvas.coords(self.rect, x1, y1, x2, y2)
-            
-            if self.preview_enabled:
-                self.update_preview(x1, y1, x2, y2)
-
-    def update_preview(self, x1, y1, x2, y2):
-        if self.current_image:
-            real_x1, real_y1 = (x1 - self.image_offset_x) * self.image_scale, (y1 - self.image_offset_y) * self.image_scale
-            real_x2, real_y2 = (x2 - self.image_offset_x) * self.image_scale, (y2 - self.image_offset_y) * self.image_scale
 
-            if real_x1 > real_x2:
-                real_x1, real_x2 = real_x2, real_x1
-            if real_y1 > real_y2:
-                real_y1, real_y2 = real_y2, real_y1
+    def redraw_preview(self):
+        if self.preview_enabled and self.rect:
+            self.update_preview(*self.canvas.coords(self.rect))
 
-            cropped = self.current_image.crop((real_x1, real_y1, real_x2, real_y2))
+    @perf.timed("update_preview")
+    def update_preview(self, x1, y1, x2, y2):
+        if self.current_image is not None:
+            real_box = self.canvas_box_to_image(x1, y1, x2, y2)
 
             # Parse desired output size
             target_width, target_height = self.original_size
@@ -583,16 +890,29 @@ class PixelPruner:
                 preview_h = preview_max
                 preview_w = int(preview_h * aspect_ratio)
 
-            cropped = cropped.resize((preview_w, preview_h), Resampling.LANCZOS)
-            self.tkpreview = ImageTk.PhotoImage(cropped)
+            # Crop from the smallest pyramid level that still has enough
+            # pixels for the preview, then rotate only the preview-sized result
+            x1s, y1s, x2s, y2s = (v / self.source_factor for v in self.oriented_box_to_source(real_box))
+            preview_size = oriented_size((preview_w, preview_h), self.orientation)
+            factor = pyramid_factor((max(1, int(x2s - x1s)), max(1, int(y2s - y1s))), preview_size)
+            level = self.pyramid_level(factor)
+            cropped = level.crop((x1s / factor, y1s / factor, x2s / factor, y2s / factor))
+            cropped = apply_orientation(cropped.resize(preview_size, Resampling.LANCZOS), self.orientation)
+            # Pixels are pasted into the same Tk image while the size holds
+            self.preview_surface.show(cropped)
+            self.tkpreview = self.preview_surface.photo
 
-            self.preview_canvas.delete("all")
             canvas_w = self.preview_canvas.winfo_width()
             canvas_h = self.preview_canvas.winfo_height()
             offset_x = (canvas_w - preview_w) // 2
             offset_y = (canvas_h - preview_h) // 2
 
-            self.preview_canvas.create_image(offset_x, offset_y, anchor="nw", image=self.tkpreview)
+            if self.preview_item is not None and self.preview_canvas.type(self.preview_item):
+                self.preview_canvas.coords(self.preview_item, offset_x, offset_y)
+                self.preview_canvas.itemconfig(self.preview_item, image=self.tkpreview)
+            else:
+                self.preview_canvas.delete("all")
+                self.preview_item = self.preview_canvas.create_image(offset_x, offset_y, anchor="nw", image=self.tkpreview)
 
 
     def on_button_press(self, event):
@@ -627,89 +947,475 @@ class PixelPruner:
 
     def on_crops_mouse_wheel(self, event):
         self.crops_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        self.renderer.request(CROPS)
 
     def on_source_mouse_wheel(self, event):
         self.source_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
+        self.renderer.request(SOURCES)
+
+    def on_crops_scroll(self, *args):
+        self.crops_canvas.yview(*args)
+        self.renderer.request(CROPS)
+
+    def on_source_scroll(self, *args):
+        self.source_canvas.yview(*args)
+        self.renderer.request(SOURCES)
+
+    def visible_gallery_range(self, canvas, row_height, cols, count):
+        """Return the range of gallery indices inside the canvas viewport."""
+        top = canvas.canvasy(0)
+        bottom = canvas.canvasy(canvas.winfo_height())
+        # Keep one extra row above and below so scrolling doesn't flash
+        first_row = max(0, int(top // row_height) - 1)
+        last_row = int(bottom // row_height) + 1
+        return range(first_row * cols, min(count, (last_row + 1) * cols))
+
+    @perf.timed("crop_image")
     def crop_image(self, x1, y1, x2, y2):
-        real_x1, real_y1 = (x1 - self.image_offset_x) * self.image_scale, (y1 - self.image_offset_y) * self.image_scale
-        real_x2, real_y2 = (x2 - self.image_offset_x) * self.image_scale, (y2 - self.image_offset_y) * self.image_scale
-        if real_x1 > real_x2:
-            real_x1, real_x2 = real_x2, real_x1
-        if real_y1 > real_y2:
-            real_y1, real_y2 = real_y2, real_y1
+        real_box = self.canvas_box_to_image(x1, y1, x2, y2)
         size = self.current_size
-        cropped = self.current_image.crop((real_x1, real_y1, real_x2, real_y2))
+        source_box = self.oriented_box_to_source(real_box)
+        # Rotation is materialised on the crop region only
+        cropped = self.read_source_region(source_box)
+        cropped = apply_orientation(cropped, self.orientation)
         cropped = cropped.resize(self.original_size)
 
-        # Prompt for output folder if not set and images are dragged in
-        if not self.output_folder and not self.folder_path:
-            self.select_output_folder()
-            if not self.output_folder:
-                self.show_info_message("Information", "Please set an Output Folder from the File Menu!")
-                return
-
-        # Use input folder as output folder if set and output folder is not set
-        if not self.output_folder:
-            self.output_folder = self.folder_path
+        if not self.ensure_output_folder():
+            return
+        journal = self.resume_crop_session()
 
         # Generate a unique filename by appending a global counter
         self.crop_counter += 1
         image_path = self.images[self.image_index]
-        base_filename = os.path.basename(image_path)
-        filename, ext = os.path.splitext(base_filename)
-        cropped_filename = f"cropped_{self.crop_counter}_{filename}.png"
-        cropped_filepath = os.path.join(self.output_folder, cropped_filename)
+        cropped_filepath = crop_output_path(self.output_folder, self.crop_counter, image_path)
         cropped.save(cropped_filepath, "PNG")
-        self.cropped_images.insert(0, cropped_filepath)  # Insert at the beginning of the list
+        if journal:
+            journal.record_crop(self.crop_counter, image_path, source_box, self.orientation, self.original_size, cropped_filepath)
+            self.forget_redo(journal.folder)
+        self.add_crop_caption(image_path, cropped_filepath)
+        self.score_crop(cropped, cropped_filepath)
+        self.cropped_images.add(cropped_filepath)  # Newest crops come first
         self.update_cropped_images_counter()
 
         # Play crop sound if enabled
         if self.crop_sound_var.get():
+            import winsound
             winsound.PlaySound(resource_path("click.wav"), winsound.SND_FILENAME | winsound.SND_ASYNC)
 
         # Create thumbnail and update crops canvas
         self.update_crops_canvas(cropped, cropped_filepath)
-        cropped_filepath = os.path.join(self.output_folder, cropped_filename)
         normalized_path = os.path.normpath(cropped_filepath)
         self.update_status(f"Cropped image saved as {normalized_path}")
 
+    def ensure_output_folder(self):
+        """Make sure crops have somewhere to go, prompting if needed."""
+        # Prompt for output folder if not set and images are dragged in
+        if not self.output_folder and not self.folder_path:
+            self.select_output_folder()
+            if not self.output_folder:
+                self.show_info_message("Information", "Please set an Output Folder from the File Menu!")
+                return False
+
+        # Use input folder as output folder if set and output folder is not set
+        if not self.output_folder:
+            self.output_folder = self.folder_path
+        return True
+
+    def get_crop_journal(self, folder):
+        """Return the crop journal for ``folder``, loading it on first use."""
+        if not folder or not os.path.isdir(folder):
+            return None
+        journal = self.crop_journals.get(folder)
+        if journal is None:
+            try:
+                journal = self.crop_journals[folder] = CropJournal(folder)
+            except Exception as e:
+                print(f"Failed to open crop journal in {folder}: {e}")
+                return None
+        return journal
+
+    def resume_crop_session(self):
+        """Pick up crops and the crop counter recorded in the output folder's journal.
+
+        Returns the journal, or ``None`` if there is no usable output folder.
+        """
+        folder = self.output_folder
+        first_use = folder not in self.crop_journals
+        journal = self.get_crop_journal(folder)
+        if journal is None or not first_use:
+            return journal
+        # Continue numbering after earlier sessions so filenames never collide
+        self.crop_counter = max(self.crop_counter, journal.max_counter)
+        restored = [
+            record["output"]
+            for record in journal.live_crops()
+            if record["output"] not in self.cropped_images and os.path.exists(record["output"])
+        ]
+        if restored:
+            # Added oldest first, so the newest crop ends up in front
+            self.cropped_images.extend(restored)
+            self.refresh_crops_canvas()
+            self.update_cropped_images_counter()
+            self.update_status(f"Resumed {len(restored)} crops from {folder}")
+        return journal
+
+    def redo_crop(self):
+        """Bring back the most recently undone crop from the trash."""
+        if not self.redo_crops:
+            messagebox.showinfo("Info", "No crops to redo!")
+            return
+        folder, batch = self.redo_crops.pop()
+        journal = self.get_crop_journal(folder)
+        record = journal.redo() if journal else None
+        if record is None:
+            messagebox.showinfo("Info", "No crops to redo!")
+            return
+        self.trash.restore(batch, on_done=lambda restored: self.master.after(0, self.on_crop_redone, record, restored))
+
+    def on_crop_redone(self, record, restored):
+        path = record["output"]
+        if path not in restored and not os.path.exists(path):
+            # The trashed file is gone (purged or moved); render it again
+            from journal import render_crop
+            try:
+                render_crop(record).save(path, "PNG")
+            except Exception as exc:
+                messagebox.showerror("Error", f"Failed to redo crop from {record['source']}: {exc}")
+                return
+            self.add_crop_caption(record["source"], path)
+        self.image_store.discard(("crop_thumb", path))
+        self.cropped_images.add(path)
+        self.refresh_crops_canvas()
+        self.update_cropped_images_counter()
+        self.update_status(f"Redid crop {os.path.normpath(path)}")
+
+    def forget_redo(self, folder):
+        """Drop pending redos of ``folder``; a new crop clears its redo stack."""
+        folder = os.path.normpath(folder)
+        self.redo_crops = [entry for entry in self.redo_crops if os.path.normpath(entry[0]) != folder]
+
+    def replay_crop_session(self):
+        """Regenerate every crop of the output folder's session at a new scale."""
+        journal = self.resume_crop_session()
+        if journal is None or not journal.live:
+            self.show_info_message("Information", "No recorded crops in the current output folder.")
+            return
+        scale = simpledialog.askfloat(
+            "Replay Crop Session",
+            f"Regenerate {len(journal.live)} crops at what scale of their original size?",
+            initialvalue=2.0,
+            minvalue=0.05,
+            maxvalue=16.0,
+            parent=self.master,
+        )
+        if not scale:
+            return
+        target = filedialog.askdirectory(title="Select Folder for Replayed Crops")
+        if not target:
+            return
+        if os.path.normpath(target) == os.path.normpath(journal.folder):
+            messagebox.showerror("Error", "Choose a different folder so the original crops are kept.")
+            return
+        from journal import replay_session
+        records = journal.live_crops()
+
+        def job(progress_callback, cancel_event):
+            return replay_session(records, target, scale, progress_callback, cancel_event)
+
+        def done(outputs, cancelled):
+            written = len([path for path in outputs or [] if path])
+            state = "cancelled" if cancelled else "finished"
+            self.update_status(f"Replay {state}: {written} crops written to {target} at {scale:g}x")
+
+        self.run_background_job("Replaying crops", job, done)
+
+    def toggle_autocrop(self):
+        self.save_settings()
+        if self.autocrop_var.get():
+            self.schedule_crop_suggestions()
+            self.apply_crop_suggestion()
+
+    def schedule_crop_suggestions(self):
+        """Compute crop suggestions for the current and next few images in the background."""
+        if not self.autocrop_var.get() or not self.images:
+            return
+        if self.suggestion_executor is None:
+            self.suggestion_executor = ThreadPoolExecutor(max_workers=1)
+        size = self.original_size
+        for offset in range(min(SUGGESTION_LOOKAHEAD + 1, len(self.images))):
+            key = (self.images[(self.image_index + offset) % len(self.images)], size)
+            if key in self.crop_suggestions:
+                continue
+            self.crop_suggestions[key] = None
+            self.suggestion_executor.submit(self.compute_crop_suggestion, key)
+
+    def compute_crop_suggestion(self, key):
+        # Runs on the suggestion worker thread
+        from autocrop import suggest_for_path
+        try:
+            box = suggest_for_path(*key)
+        except Exception as exc:
+            print(f"Failed to suggest a crop for {key[0]}: {exc}")
+            box = None
+        self.master.after(0, lambda: self.on_crop_suggestion(key, box))
+
+    def on_crop_suggestion(self, key, box):
+        if box is None:
+            self.crop_suggestions.pop(key, None)
+            return
+        self.crop_suggestions[key] = box
+        while len(self.crop_suggestions) > SUGGESTION_CACHE_SIZE:
+            self.crop_suggestions.popitem(last=False)
+        if key == (self.current_path, self.original_size):
+            self.apply_crop_suggestion()
+
+    def apply_crop_suggestion(self):
+        """Place the crop box on the suggestion for the current image, if one is ready."""
+        if not self.autocrop_var.get() or not self.rect or self.orientation:
+            return
+        box = self.crop_suggestions.get((self.current_path, self.original_size))
+        if not box:
+            return
+        x1, y1, x2, y2 = box
+        self.current_size = (x2 - x1, y2 - y1)
+        self.canvas.coords(
+            self.rect,
+            self.image_offset_x + x1 / self.image_scale,
+            self.image_offset_y + y1 / self.image_scale,
+            self.image_offset_x + x2 / self.image_scale,
+            self.image_offset_y + y2 / self.image_scale,
+        )
+        self.update_status("Suggested crop placed - press Enter to accept")
+
+    def accept_crop_suggestion(self):
+        """Crop at the suggestion for the current image; does nothing without one."""
+        if not self.autocrop_var.get() or not self.rect or self.orientation:
+            return
+        if not self.crop_suggestions.get((self.current_path, self.original_size)):
+            self.update_status("No crop suggestion for this image yet")
+            return
+        # The box may have followed the pointer since it was placed
+        self.apply_crop_suggestion()
+        self.perform_crop()
+
+    def autocrop_all(self):
+        """Crop every loaded image at its suggested box in the background."""
+        if not self.images:
+            self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
+            return
+        if not self.ensure_output_folder():
+            return
+        from autocrop import autocrop_images
+
+        paths = list(self.images)
+        size = self.original_size
+        output_folder = self.output_folder
+        start = self.crop_counter + 1
+        self.crop_counter += len(paths)
+
+        def job(progress_callback, cancel_event):
+            return autocrop_images(paths, size, output_folder, start, progress_callback, cancel_event)
+
+        def done(outputs, cancelled):
+            self.add_batch_crops(outputs, cancelled, "Auto-crop", output_folder, paths, start, size, 0)
+
+        self.run_background_job("Auto-cropping", job, done)
+
+    def save_crop_template(self):
+        """Remember the current crop box, relative to the image, as a template."""
+        from croptemplate import make_template
+        if self.current_image is None or not self.rect:
+            self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
+            return
+        box = self.canvas_box_to_image(*self.canvas.coords(self.rect))
+        image_size = oriented_size(self.source_size, self.orientation)
+        self.crop_template = make_template(box, image_size, self.original_size, self.orientation)
+        self.settings["crop_template"] = self.crop_template
+        self.save_settings()
+        self.update_status("Crop template saved")
+
+    def apply_template_to_all(self):
+        """Crop every loaded image with the saved template in the background."""
+        if not self.images:
+            self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
+            return
+        if not self.crop_template:
+            self.show_info_message("Information", "Save a crop template from the Edit menu first!")
+            return
+        width, height = self.crop_template["size"]
+        if not messagebox.askyesno(
+            "Apply Template",
+            f"Crop all {len(self.images)} images with the saved template at {width}x{height}?",
+        ):
+            return
+        if not self.ensure_output_folder():
+            return
+        from croptemplate import apply_template_to_images
+
+        template = self.crop_template
+        paths = list(self.images)
+        output_folder = self.output_folder
+        start = self.crop_counter + 1
+        self.crop_counter += len(paths)
+
+        def job(progress_callback, cancel_event):
+            return apply_template_to_images(template, paths, output_folder, start, progress_callback, cancel_event)
+
+        def done(outputs, cancelled):
+            self.add_batch_crops(
+                outputs, cancelled, "Template crop", output_folder,
+                paths, start, tuple(template["size"]), template.get("orientation", 0),
+            )
+
+        self.run_background_job("Applying template", job, done)
+
+    def add_batch_crops(self, outputs, cancelled, label, output_folder, sources, start, size, orientation):
+        """Register and journal crops written by a background batch.
+
+        ``outputs`` holds ``(output_path, box)`` per source, numbered from
+        the crop counter ``start``.
+        """
+        journal = self.get_crop_journal(output_folder)
+        created = []
+        for counter, (source, result) in enumerate(zip(sources, outputs or []), start):
+            if not result:
+                continue
+            path, box = result
+            if journal:
+                journal.record_crop(counter, source, box, orientation, size, path)
+                self.forget_redo(journal.folder)
+            self.add_crop_caption(source, path)
+            self.cropped_images.add(path)
+            created.append(path)
+        self.refresh_crops_canvas()
+        self.update_cropped_images_counter()
+        state = "cancelled" if cancelled else "finished"
+        self.update_status(f"{label} {state}: {len(created)} crops saved to {output_folder}")
+
+    def run_background_job(self, title, job, on_done):
+        """Run ``job(progress_callback, cancel_event)`` on a worker thread.
+
+        A progress dialog with a Cancel button is shown while it runs and
+        ``on_done(result, cancelled)`` is called on the UI thread afterwards.
+        """
+        progress = tk.Toplevel(self.master)
+        progress.title(title)
+        tk.Label(progress, text=f"{title}...").pack(padx=20, pady=(10, 5))
+        progress_var = tk.StringVar(value="")
+        tk.Label(progress, textvariable=progress_var).pack(padx=20, pady=(0, 5))
+        cancel_event = threading.Event()
+        tk.Button(progress, text="Cancel", command=cancel_event.set).pack(pady=(0, 10))
+        progress.protocol("WM_DELETE_WINDOW", cancel_event.set)
+
+        progress.update_idletasks()
+        pw = progress.winfo_width()
+        ph = progress.winfo_height()
+        sw = progress.winfo_screenwidth()
+        sh = progress.winfo_screenheight()
+        progress.geometry(f"{pw}x{ph}+{sw//2 - pw//2}+{sh//2 - ph//2}")
+        progress.transient(self.master)
+
+        def progress_callback(idx, total):
+            self.master.after(0, lambda: progress_var.set(f"{idx} of {total}"))
+
+        def worker():
+            try:
+                result = job(progress_callback, cancel_event)
+            except Exception as exc:
+                print(f"{title} failed: {exc}")
+                result = None
+            self.master.after(0, lambda: finish(result))
+
+        def finish(result):
+            progress.destroy()
+            on_done(result, cancel_event.is_set())
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def update_crops_canvas(self, cropped, filepath):
-        cropped.thumbnail((256, 256))  # Create larger thumbnail
-        tkthumbnail = ImageTk.PhotoImage(cropped)
-        self.cropped_thumbnails.insert(0, (tkthumbnail, filepath))  # Insert at the beginning of the list
+        cropped.thumbnail((CROP_THUMB_SIZE, CROP_THUMB_SIZE))  # Create larger thumbnail
+        self.image_store.put(("crop_thumb", filepath), new_photo(cropped))
 
         self.refresh_crops_canvas()
 
+    def get_crop_thumbnail(self, path):
+        """Return the crops pane thumbnail for ``path``, regenerating it if evicted."""
+        def load():
+            try:
+                img = load_image_file(path)
+            except Exception:
+                return None
+            img.thumbnail((CROP_THUMB_SIZE, CROP_THUMB_SIZE))
+            return new_photo(img)
+
+        return self.image_store.get(("crop_thumb", path), load)
+
+    @perf.timed("refresh_crops_canvas")
     def refresh_crops_canvas(self):
         """Rebuild the thumbnail grid in the crops canvas."""
+        if self.crops_canvas is None:
+            return
         self.crops_canvas.delete("all")  # Clear previous thumbnails
-        cols = 2  # Number of columns in the grid
-        spacing = 10  # Space between thumbnails
+        self.crop_items = {}
+        rows = -(-len(self.cropped_images) // CROP_COLUMNS)
+        width = CROP_COLUMNS * (CROP_THUMB_SIZE + GALLERY_SPACING)
+        height = rows * (CROP_THUMB_SIZE + GALLERY_SPACING)
+
+        # The scroll region covers every crop; only visible thumbnails are drawn
+        self.crops_canvas.config(scrollregion=(0, 0, width, height))
+        self.draw_visible_crops()
+
+    def draw_visible_crops(self):
+        """Draw thumbnails in the crops viewport and drop those scrolled away."""
+        if self.crops_canvas is None:
+            return
+        step = CROP_THUMB_SIZE + GALLERY_SPACING
+        visible = self.visible_gallery_range(self.crops_canvas, step, CROP_COLUMNS, len(self.cropped_images))
 
-        for index, (thumbnail, path) in enumerate(self.cropped_thumbnails):
-            row, col = divmod(index, cols)
-            x, y = col * (256 + spacing), row * (256 + spacing)
-            self.crops_canvas.create_image(x, y, anchor="nw", image=thumbnail)
+        for index in [i for i in self.crop_items if i not in visible]:
+            items, _ = self.crop_items.pop(index)
+            for item in items:
+                self.crops_canvas.delete(item)
+
+        for index in visible:
+            if index in self.crop_items:
+                continue
+            path = self.cropped_images[index]
+            thumbnail = self.get_crop_thumbnail(path)
+            if thumbnail is None:
+                continue
+            row, col = divmod(index, CROP_COLUMNS)
+            x, y = col * step, row * step
+            image_item = self.crops_canvas.create_image(x, y, anchor="nw", image=thumbnail)
 
             # Add delete icon at the bottom left corner of each thumbnail
             delete_icon_x = x + 5
-            delete_icon_y = y + 256 - 25
+            delete_icon_y = y + CROP_THUMB_SIZE - 25
             delete_icon = self.crops_canvas.create_image(delete_icon_x, delete_icon_y, anchor="nw", image=self.delete_crop_image)
             self.crops_canvas.tag_bind(delete_icon, "<Button-1>", lambda event, path=path: self.delete_crop(path))
-
-        # Update scroll region to accommodate all thumbnails
-        self.crops_canvas.config(scrollregion=self.crops_canvas.bbox("all"))
+            items = (image_item, delete_icon)
+            rating = self.crop_ratings.get(path)
+            if rating:
+                # Rating badge in the top left corner
+                badge = self.crops_canvas.create_text(x + 8, y + 6, anchor="nw", text=rating, fill="white", font=("Helvetica", 9, "bold"))
+                background = self.crops_canvas.create_rectangle(self.crops_canvas.bbox(badge), fill=RATING_COLORS.get(rating, "gray"), outline="")
+                self.crops_canvas.tag_raise(badge, background)
+                items += (badge, background)
+            self.crop_items[index] = (items, thumbnail)
+
+        self.update_memory_label()
 
     def delete_crop(self, filepath):
         if self.safe_mode_var.get():
             self.show_info_message("Safe Mode", "Safe Mode is enabled. Delete operations are disabled.")
             return
         if messagebox.askyesno("Delete Crop", "Are you sure you want to delete this crop?"):
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            self.cropped_images = [img for img in self.cropped_images if img != filepath]
-            self.cropped_thumbnails = [(thumb, path) for thumb, path in self.cropped_thumbnails if path != filepath]
+            self.trash_files([filepath])
+            journal = self.crop_journals.get(os.path.dirname(filepath))
+            if journal:
+                journal.discard(filepath)
+            self.cropped_images.discard(filepath)
+            self.image_store.discard(("crop_thumb", filepath))
             filepath_forward_slash = filepath.replace("\\", "/")
             self.refresh_crops_canvas()
             self.update_cropped_images_counter()
@@ -719,42 +1425,290 @@ class PixelPruner:
         """Legacy wrapper kept for backward compatibility."""
         self.refresh_crops_canvas()
 
-    def update_source_canvas(self, progress_callback=None):
-        """Generate thumbnails for source images and rebuild the gallery."""
-        self.source_thumbnails = []
-        total = len(self.images)
-        for idx, path in enumerate(self.images, start=1):
+    def update_source_canvas(self):
+        """Reset the gallery for a new image list.
+
+        Thumbnails are generated on demand as they scroll into view.
+        """
+        self.image_store.discard_where(lambda key: key[0] == "thumb")
+        self.source_filter = None
+        self.source_filter_var.set("")
+        self.source_query = ""
+        self.source_shape_var.set(SOURCE_SHAPES[0])
+        self.source_rank = {path: i for i, path in enumerate(self.images)}
+        self.source_headers = {}
+        self.refresh_source_canvas()
+        self.index_headers(list(self.images))
+        # Video frames carry no generation metadata
+        self.index_metadata([path for path in self.images if not archives.is_frame(path)])
+
+    def get_source_thumbnail(self, path):
+        """Return the gallery thumbnail for ``path``, generating it if needed."""
+        def load():
             try:
-                img = Image.open(path)
-                img.thumbnail((128, 128))
-                tkthumb = ImageTk.PhotoImage(img)
-                self.source_thumbnails.append((tkthumb, path))
+                with archives.open_image(path) as img:
+                    img.thumbnail((SOURCE_THUMB_SIZE, SOURCE_THUMB_SIZE))
+                    return new_photo(img)
             except Exception:
-                continue
-            if progress_callback:
-                progress_callback(idx, total)
-        self.refresh_source_canvas()
+                return None
 
+        return self.image_store.get(("thumb", path), load)
+
+    @perf.timed("refresh_source_canvas")
     def refresh_source_canvas(self):
+        if self.source_canvas is None:
+            return
         self.source_canvas.delete("all")
-        self.source_canvas.update_idletasks()
+        self.source_items = {}
         canvas_width = self.source_canvas.winfo_width()
-        cols = 3
-        spacing = 10
-        thumb_w = 128
-        total_width = cols * thumb_w + (cols - 1) * spacing
-        offset_x = max(0, (canvas_width - total_width) // 2)
-        for index, (thumb, path) in enumerate(self.source_thumbnails):
-            row, col = divmod(index, cols)
-            x = offset_x + col * (thumb_w + spacing)
-            y = row * (128 + spacing)
+        total_width = SOURCE_COLUMNS * SOURCE_THUMB_SIZE + (SOURCE_COLUMNS - 1) * GALLERY_SPACING
+        self.source_offset_x = max(0, (canvas_width - total_width) // 2)
+        rows = -(-len(self.gallery_images()) // SOURCE_COLUMNS)
+        height = rows * (SOURCE_THUMB_SIZE + GALLERY_SPACING)
+
+        # The scroll region covers every source; only visible thumbnails are drawn
+        self.source_canvas.config(scrollregion=(0, 0, max(canvas_width, total_width), height))
+        self.draw_visible_sources()
+
+    def draw_visible_sources(self):
+        """Draw thumbnails in the sources viewport and drop those scrolled away."""
+        if self.source_canvas is None:
+            return
+        step = SOURCE_THUMB_SIZE + GALLERY_SPACING
+        images = self.gallery_images()
+        visible = self.visible_gallery_range(self.source_canvas, step, SOURCE_COLUMNS, len(images))
+
+        for index in [i for i in self.source_items if i not in visible]:
+            items, _ = self.source_items.pop(index)
+            for item in items:
+                self.source_canvas.delete(item)
+
+        for index in visible:
+            if index in self.source_items:
+                continue
+            path = images[index]
+            thumb = self.get_source_thumbnail(path)
+            if thumb is None:
+                continue
+            row, col = divmod(index, SOURCE_COLUMNS)
+            x = self.source_offset_x + col * step
+            y = row * step
             img_id = self.source_canvas.create_image(x, y, anchor="nw", image=thumb)
             self.source_canvas.tag_bind(img_id, "<Button-1>", lambda e, p=path: self.load_image_from_gallery(p))
-        self.source_canvas.config(scrollregion=self.source_canvas.bbox("all"))
+            items = (img_id,)
+            if self.source_too_small(path):
+                # Outline and badge sources that would have to be upscaled
+                outline = self.source_canvas.create_rectangle(x, y, x + thumb.width() - 1, y + thumb.height() - 1, outline="red", width=2)
+                badge = self.source_canvas.create_text(x + 6, y + 4, anchor="nw", text="Too small", fill="white", font=("Helvetica", 8, "bold"))
+                background = self.source_canvas.create_rectangle(self.source_canvas.bbox(badge), fill="red", outline="")
+                self.source_canvas.tag_raise(badge, background)
+                items += (outline, badge, background)
+            self.source_items[index] = (items, thumb)
+
+        self.update_memory_label()
+
+    def gallery_images(self):
+        """Return the sources shown in the gallery."""
+        return self.images if self.source_filter is None else self.source_filter
+
+    def get_metadata_index(self):
+        """Return the generation metadata index, opening it on first use."""
+        if self.metadata_index is None:
+            from metaindex import DB_NAME, MetadataIndex
+            try:
+                self.metadata_index = MetadataIndex(os.path.join(app_path(), INDEX_DIR, DB_NAME))
+            except Exception as e:
+                print(f"Failed to open metadata index: {e}")
+                return None
+        return self.metadata_index
+
+    def index_metadata(self, paths):
+        """Read the generation metadata of new or changed ``paths`` in the background."""
+        index = self.get_metadata_index()
+        if index is None or not paths:
+            return
+        if self.metadata_executor is None:
+            self.metadata_executor = ThreadPoolExecutor(max_workers=1)
+
+        def work():
+            try:
+                count = index.update(paths, cancel_event=self.metadata_cancel)
+            except Exception as exc:
+                print(f"Failed to index metadata: {exc}")
+                return
+            if count and not self.metadata_cancel.is_set():
+                self.master.after(0, self.update_status, f"Indexed generation metadata of {count} images")
+
+        self.metadata_executor.submit(work)
+
+    def metadata_matches(self, query, folders=None):
+        """Return the absolute paths whose generation metadata match ``query``."""
+        from metaindex import parse_query
+        index = self.get_metadata_index()
+        if index is None:
+            return set()
+        text, fields = parse_query(query)
+        return index.search(text, folders, **fields)
+
+    def apply_source_filter(self, query):
+        """Show only the sources whose prompt, seed, model or sampler match ``query``."""
+        query = query.strip()
+        self.source_filter_var.set(query)
+        self.source_query = query
+        self.update_source_filter()
+
+    def update_source_filter(self, scroll_to_top=True):
+        """Rebuild the gallery from the metadata query and the shape filter."""
+        query = self.source_query
+        shape = self.source_shape_var.get()
+        if not query and shape == SOURCE_SHAPES[0]:
+            self.source_filter = None
+            self.update_status(f"Showing all {len(self.images)} sources")
+        else:
+            paths = list(self.images)
+            if query:
+                matches = self.metadata_matches(query, {os.path.dirname(path) for path in paths})
+                paths = [path for path in paths if os.path.abspath(path) in matches]
+            if shape != SOURCE_SHAPES[0]:
+                paths = [path for path in paths if self.source_has_shape(path, shape)]
+            self.source_filter = ImageIndex(paths)
+            self.update_status(f"Showing {len(self.source_filter)} of {len(self.images)} sources")
+        if self.source_canvas is not None and scroll_to_top:
+            self.source_canvas.yview_moveto(0)
+        self.refresh_source_canvas()
+
+    def index_headers(self, paths):
+        """Read the dimensions, size and modification time of ``paths`` in the background.
+
+        Headers come from the folder index when the files are unchanged; the
+        gallery is re-sorted and re-filtered once they are known.
+        """
+        if not paths:
+            return
+        if self.header_executor is None:
+            self.header_executor = ThreadPoolExecutor(max_workers=1)
+
+        def work():
+            try:
+                frames = [path for path in paths if archives.is_frame(path)]
+                files = [path for path in paths if not archives.is_frame(path)]
+                headers = self.folder_index.headers(files, cancel_event=self.metadata_cancel)
+                if frames:
+                    # Every frame of a video shares the video's header
+                    from videos import frame_index
+                    for path in frames:
+                        headers[path] = frame_index(archives.split_path(path)[0]).header()
+            except Exception as exc:
+                print(f"Failed to read image headers: {exc}")
+                return
+            if not self.metadata_cancel.is_set():
+                self.master.after(0, self.on_headers_loaded, headers)
+
+        self.header_executor.submit(work)
+
+    def on_headers_loaded(self, headers):
+        self.source_headers.update(headers)
+        if self.source_sort_var.get() != SOURCE_SORTS[0] or self.source_sort_reverse_var.get():
+            self.sort_sources()
+        elif self.source_shape_var.get() != SOURCE_SHAPES[0]:
+            self.update_source_filter(scroll_to_top=False)
+        else:
+            self.renderer.request(SOURCE_LAYOUT)
+
+    def source_sort_key(self, sort):
+        """Return the key function for ``sort``, or ``None`` if it needs no header."""
+        keys = {
+            "Resolution": lambda h: h["width"] * h["height"],
+            "Aspect ratio": lambda h: h["width"] / max(1, h["height"]),
+            "File size": lambda h: h["size"],
+            "Modified": lambda h: h["mtime_ns"],
+        }
+        return keys.get(sort)
+
+    def sort_sources(self):
+        """Reorder the loaded sources by the chosen sort, keeping the current image."""
+        if not self.images:
+            return
+        sort = self.source_sort_var.get()
+        reverse = self.source_sort_reverse_var.get()
+        paths = list(self.images)
+        current = paths[self.image_index] if self.image_index < len(paths) else None
+        if sort == "Name":
+            paths.sort(key=lambda path: archives.basename(path).lower(), reverse=reverse)
+        elif sort == SOURCE_SORTS[0]:
+            end = len(self.source_rank)
+            paths.sort(key=lambda path: self.source_rank.get(path, end), reverse=reverse)
+        else:
+            key = self.source_sort_key(sort)
+            known = [path for path in paths if path in self.source_headers]
+            known.sort(key=lambda path: key(self.source_headers[path]), reverse=reverse)
+            # Sources whose header is still unknown go last
+            paths = known + [path for path in paths if path not in self.source_headers]
+        self.images = ImageIndex(paths)
+        if current is not None:
+            self.image_index = self.images.index(current)
+        self.update_image_counter()
+        self.update_source_filter(scroll_to_top=False)
+
+    def source_has_shape(self, path, shape):
+        """Return whether ``path`` passes the gallery's shape filter ``shape``."""
+        if shape == "Too small":
+            return self.source_too_small(path)
+        header = self.source_headers.get(path)
+        if header is None:
+            return False
+        width, height = header["width"], header["height"]
+        if shape == "Landscape":
+            return width > height
+        if shape == "Portrait":
+            return width < height
+        return width == height
+
+    def source_too_small(self, path):
+        """Return whether ``path`` cannot fill the selected crop size without upscaling."""
+        header = self.source_headers.get(path)
+        if header is None:
+            return False
+        size = (header["width"], header["height"])
+        if self.size_var.get() == self.bucket_option:
+            if not self.buckets:
+                return False
+            from buckets import nearest_bucket
+            target = nearest_bucket(size, self.buckets)
+        else:
+            target = self.selected_crop_size()
+        return min(size[0] / target[0], size[1] / target[1]) < 1
+
+    def on_target_size_changed(self):
+        """Update the "Too small" flags after the crop size changed."""
+        if self.source_shape_var.get() == "Too small":
+            self.update_source_filter(scroll_to_top=False)
+        else:
+            self.renderer.request(SOURCE_LAYOUT)
+
+    def metadata_matching_names(self, query, folder):
+        """Return the filenames in ``folder`` whose generation metadata match ``query``.
+
+        Crops carry no metadata of their own, so they match through the
+        source recorded for them in the crop journal.
+        """
+        matches = self.metadata_matches(query)
+        folder_abs = os.path.abspath(folder)
+        if archives.is_archive(folder):
+            # Results of an archive are named by member
+            members = (archives.split_path(path) for path in matches)
+            return {member for archive, member in members if archive == folder_abs}
+        names = {os.path.basename(path) for path in matches if os.path.dirname(path) == folder_abs}
+        journal = self.get_crop_journal(folder)
+        if journal:
+            for record in journal.live_crops():
+                if os.path.abspath(record["source"]) in matches:
+                    names.add(os.path.basename(record["output"]))
+        return names
 
     def load_image_from_gallery(self, path):
         if path in self.images:
-            self.image_index = self.images.index(path)
+            self.image_index = self.images.index(path)  # O(log n), no list scan
             self.load_image()
 
     def perform_crop(self):
@@ -802,6 +1756,7 @@ class PixelPruner:
         selected_folder = filedialog.askdirectory(title="Select Custom Output Folder", initialdir=self.default_output_folder or None)
         if selected_folder:
             self.output_folder = selected_folder
+            self.resume_crop_session()
         else:
             messagebox.showwarning("Warning", "No output folder selected! Crops can't be saved until one is set!")
 
@@ -810,7 +1765,7 @@ class PixelPruner:
             self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
             return
         if os.path.isdir(self.folder_path):
-            subprocess.Popen(['explorer', self.folder_path.replace("/", "\\")])
+            open_in_explorer(self.folder_path)
 
     def open_output_folder(self):
         folder_to_open = self.output_folder or self.folder_path
@@ -818,13 +1773,17 @@ class PixelPruner:
             self.show_info_message("Information", "Please set an Output Folder from the File Menu!")
             return
         if os.path.isdir(folder_to_open):
-            subprocess.Popen(['explorer', folder_to_open.replace("/", "\\")])
+            open_in_explorer(folder_to_open)
 
+    @perf.timed("zip_crops")
     def zip_crops(self):
         if not self.cropped_images:
             messagebox.showinfo("Info", "No cropped images to zip!")
             return
 
+        import zipfile
+        from datetime import datetime
+
         num_images = len(self.cropped_images)
         current_date = datetime.now().strftime("%Y%m%d")
         zip_filename = os.path.join(self.output_folder or self.folder_path, f"{num_images}_{current_date}.zip").replace("\\", "/")
@@ -854,30 +1813,33 @@ class PixelPruner:
             self.preview_enabled = False
             self.crops_enabled = False
 
+        if pane == "preview" and self.preview_canvas is None:
+            self.build_preview_pane()
+        elif pane == "crops" and self.crops_frame is None:
+            self.build_crops_pane()
+        elif pane == "source" and self.source_frame is None:
+            self.build_source_pane()
+
         if self.preview_enabled:
-            self.master.geometry(f"1550x800")  # Adjusted size to fit the larger preview pane
-            self.preview_canvas.pack(side=tk.RIGHT, padx=5, pady=5, fill=tk.BOTH, expand=False)
-            self.crops_frame.pack_forget()
-            self.source_frame.pack_forget()
+            shown = self.preview_canvas
         elif self.crops_enabled:
-            self.master.geometry(f"1550x800")  # Adjusted size to fit the crops pane
-            self.crops_frame.pack(side=tk.RIGHT, padx=5, pady=5, fill=tk.BOTH, expand=False)
-            self.preview_canvas.pack_forget()
-            self.source_frame.pack_forget()
+            shown = self.crops_frame
         elif self.source_enabled:
-            self.master.geometry(f"1550x800")
-            self.source_frame.pack(side=tk.RIGHT, padx=5, pady=5, fill=tk.BOTH, expand=False)
-            self.preview_canvas.pack_forget()
-            self.crops_frame.pack_forget()
+            shown = self.source_frame
+        else:
+            shown = None
+        for widget in (self.preview_canvas, self.crops_frame, self.source_frame):
+            if widget is not None and widget is not shown:
+                widget.pack_forget()
+        if shown is not None:
+            self.master.geometry(f"1550x800")  # Adjusted size to fit the side pane
+            shown.pack(side=tk.RIGHT, padx=5, pady=5, fill=tk.BOTH, expand=False)
         else:
-            self.preview_canvas.pack_forget()
-            self.crops_frame.pack_forget()
-            self.source_frame.pack_forget()
             self.master.geometry(f"1300x750")  # Resize the window back to normal
-        
-        # Workaround to ensure the main image is centered after toggling panes
-        self.master.after(100, self.load_next_image)
-        self.master.after(200, self.load_previous_image)
+
+        # Recentre once the new layout is applied; the canvas <Configure>
+        # event requests the same repaint, so this costs at most one redraw
+        self.renderer.request(IMAGE)
 
     def undo_last_crop(self):
         if self.safe_mode_var.get():
@@ -888,10 +1850,19 @@ class PixelPruner:
             return
 
         last_cropped_image = self.cropped_images.pop(0)  # Remove the first item in the list
-        if os.path.exists(last_cropped_image):
-            os.remove(last_cropped_image)
-
-        self.cropped_thumbnails.pop(0)
+        batch = self.trash_files([last_cropped_image])
+
+        folder = os.path.dirname(last_cropped_image)
+        journal = self.crop_journals.get(folder)
+        newest = journal.newest_live() if journal else None
+        if newest and newest["output"] == last_cropped_image:
+            journal.undo()
+            # Redo restores the file from the trash
+            self.redo_crops.append((folder, batch))
+        elif journal:
+            journal.discard(last_cropped_image)
+
+        self.image_store.discard(("crop_thumb", last_cropped_image))
         self.refresh_crops_canvas()
         self.update_cropped_images_counter()
         self.update_status("Last crop undone")
@@ -901,80 +1872,86 @@ class PixelPruner:
             messagebox.showwarning("Warning", f"No input folder set! Got: {self.folder_path}")
             return
 
-        self.images = [os.path.join(self.folder_path, img) for img in os.listdir(self.folder_path) if img.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
+        try:
+            self.images = ImageIndex(self.folder_index.list_images(self.folder_path))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to read {self.folder_path}: {e}")
+            return
         if not self.images:
             messagebox.showerror("Error", "No valid images found in the selected directory.")
             return
 
-        progress = None
-        progress_var = None
-        if len(self.images) > 30:
-            progress = tk.Toplevel(self.master)
-            progress.title("Loading")
-            tk.Label(progress, text="Loading images...").pack(padx=20, pady=(10, 5))
-            progress_var = tk.StringVar(value="")
-            tk.Label(progress, textvariable=progress_var).pack(padx=20, pady=(0, 10))
-            progress.update_idletasks()
-            pw = progress.winfo_width()
-            ph = progress.winfo_height()
-            sw = progress.winfo_screenwidth()
-            sh = progress.winfo_screenheight()
-            progress.geometry(f"{pw}x{ph}+{sw//2 - pw//2}+{sh//2 - ph//2}")
-            progress.transient(self.master)
-            progress.grab_set()
-
-            def cb(idx, total):
-                progress_var.set(f"{idx} of {total}")
-                progress.update_idletasks()
-        else:
-            def cb(idx, total):
-                pass
-
         self.image_index = 0
         self.load_image()
         self.update_image_counter()
         self.update_status(f"Loaded {len(self.images)} images from {self.folder_path}")
-        self.update_source_canvas(cb)
-        if progress:
-            progress.destroy()
+        self.update_source_canvas()
 
     def load_images_from_list(self, file_list):
-        self.images = [file for file in file_list if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
+        paths = []
+        videos = []
+        for file in file_list:
+            if archives.is_archive(file):
+                # Only the member table is read; images are decoded on demand
+                try:
+                    paths.extend(archives.list_images(file))
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to read archive {file}: {e}")
+            elif archives.is_video(file):
+                videos.append(file)
+            elif file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
+                paths.append(file)
+        if videos:
+            self.load_video_frames(videos, paths)
+        else:
+            self.show_sources(paths)
+
+    def load_video_frames(self, videos, paths):
+        """Pick the sharpest frame of every window of ``videos`` and load them after ``paths``."""
+        window = self.settings.get("video_window_seconds", 1.0)
+
+        def job(progress_callback, cancel_event):
+            from videos import sharpest_frames
+            frames = []
+            for video in videos:
+                frames.extend(sharpest_frames(video, window, progress_callback=progress_callback, cancel_event=cancel_event))
+            return frames
+
+        def done(frames, cancelled):
+            if frames is None:
+                messagebox.showerror("Error", "Failed to read the dropped videos. Video sources need OpenCV.")
+                frames = []
+            self.show_sources(paths + frames)
+
+        self.run_background_job("Picking sharpest frames", job, done)
+
+    def show_sources(self, paths):
+        self.images = ImageIndex(paths)
         if not self.images:
             messagebox.showerror("Error", "No valid images found in the dropped files.")
             return
 
-        progress = None
-        progress_var = None
-        if len(self.images) > 30:
-            progress = tk.Toplevel(self.master)
-            progress.title("Loading")
-            tk.Label(progress, text="Loading images...").pack(padx=20, pady=(10, 5))
-            progress_var = tk.StringVar(value="")
-            tk.Label(progress, textvariable=progress_var).pack(padx=20, pady=(0, 10))
-            progress.update_idletasks()
-            pw = progress.winfo_width()
-            ph = progress.winfo_height()
-            sw = progress.winfo_screenwidth()
-            sh = progress.winfo_screenheight()
-            progress.geometry(f"{pw}x{ph}+{sw//2 - pw//2}+{sh//2 - ph//2}")
-            progress.transient(self.master)
-            progress.grab_set()
-
-            def cb(idx, total):
-                progress_var.set(f"{idx} of {total}")
-                progress.update_idletasks()
-        else:
-            def cb(idx, total):
-                pass
-
         self.image_index = 0
         self.load_image()
         self.update_image_counter()
         self.update_status(f"Loaded {len(self.images)} images from dropped files")
-        self.update_source_canvas(cb)
-        if progress:
-            progress.destroy()
+        self.update_source_canvas()
+
+    def open_archive(self):
+        path = filedialog.askopenfilename(
+            title="Open Archive",
+            filetypes=[("Archives", "*.zip *.tar *.tar.gz *.tgz"), ("All files", "*.*")],
+        )
+        if path:
+            self.load_images_from_list([path])
+
+    def open_video(self):
+        path = filedialog.askopenfilename(
+            title="Open Video",
+            filetypes=[("Videos", " ".join("*" + ext for ext in archives.VIDEO_EXTS)), ("All files", "*.*")],
+        )
+        if path:
+            self.load_images_from_list([path])
 
     def on_drop(self, event):
         file_list = self.master.tk.splitlist(event.data)
@@ -982,13 +1959,13 @@ class PixelPruner:
 
     def view_image(self, image_path):
         """Display an image on the canvas without altering the loaded list."""
-        if not image_path or not os.path.exists(image_path):
+        if not image_path or not archives.exists(image_path):
             return
         try:
-            self.current_image = Image.open(image_path)
+            self.set_current_image(load_image_file(image_path), image_path)
             self.image_scale = 1
             self.display_image()
-            self.update_status(f"Viewing {os.path.basename(image_path)}")
+            self.update_status(f"Viewing {archives.basename(image_path)}")
         except Exception as exc:
             messagebox.showerror("Error", f"Failed to load {image_path}: {exc}")
 
@@ -1002,20 +1979,416 @@ class PixelPruner:
         if not self.folder_path and not self.images:
             self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
             return
+        if self.images and archives.is_member(self.images[self.image_index]):
+            self.show_info_message("Information", "Images inside an archive or video are read-only and cannot be deleted.")
+            return
         if messagebox.askyesno("Delete Image", "Are you sure you want to delete this image?"):
             image_path = self.images.pop(self.image_index)
-            if os.path.exists(image_path):
-                os.remove(image_path)
+            self.source_headers.pop(image_path, None)
+            if self.source_filter is not None:
+                self.source_filter.discard(image_path)
+            self.trash_files([image_path])
             if self.image_index >= len(self.images):
                 self.image_index = 0
             self.load_image()
             self.update_image_counter()
-            # Remove from source thumbnails and refresh gallery
-            self.source_thumbnails = [(t, p) for t, p in self.source_thumbnails if p != image_path]
+            # Drop its thumbnail and refresh gallery
+            self.image_store.discard(("thumb", image_path))
             self.refresh_source_canvas()
             image_path_forward_slash = image_path.replace("\\", "/")
             self.update_status(f"Deleted image {image_path_forward_slash}")
 
+    def trash_folders(self):
+        """Return the folders whose trash PixelPruner manages."""
+        folders = {self.folder_path, self.output_folder}
+        folders.update(os.path.dirname(path) for path in self.images)
+        return [folder for folder in folders if folder and os.path.isdir(folder)]
+
+    def trash_files(self, paths):
+        """Move ``paths`` and their caption sidecars to the trash."""
+        staged = list(paths)
+        for path in paths:
+            store = self.tag_stores.get(os.path.normpath(os.path.dirname(path)))
+            if store:
+                store.forget(path)
+            sidecar = caption_path(path)
+            if os.path.exists(sidecar):
+                staged.append(sidecar)
+        return self.trash.stage(staged)
+
+    def forget_deleted_crops(self, paths):
+        """Drop deleted files from the crops pane and their journals."""
+        removed = False
+        for path in set(paths):
+            journal = self.crop_journals.get(os.path.dirname(path))
+            if journal:
+                journal.discard(path)
+            self.image_store.discard(("crop_thumb", path))
+            removed = self.cropped_images.discard(path) or removed
+        if removed:
+            self.refresh_crops_canvas()
+            self.update_cropped_images_counter()
+
+    def on_files_restored(self, restored):
+        """Put restored files back in the source list or crops pane."""
+        output = os.path.normpath(self.output_folder) if self.output_folder else None
+        sources = []
+        crops = []
+        for path in restored:
+            store = self.tag_stores.get(os.path.normpath(os.path.dirname(path)))
+            if store:
+                store.refresh(path)
+            if not path.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
+                continue
+            if output and os.path.normpath(os.path.dirname(path)) == output:
+                if path not in self.cropped_images:
+                    crops.append(path)
+            elif path not in self.images:
+                sources.append(path)
+        if crops:
+            self.cropped_images.extend(crops)
+            self.refresh_crops_canvas()
+            self.update_cropped_images_counter()
+        if sources:
+            self.images.extend(sources)
+            if self.current_image is None:
+                self.image_index = 0
+                self.load_image()
+            self.update_image_counter()
+            self.refresh_source_canvas()
+        self.update_status(f"Restored {len(restored)} files from the trash")
+
+    def restore_last_delete(self):
+        if not self.trash.has_session_batches():
+            messagebox.showinfo("Info", "Nothing to restore!")
+            return
+        self.trash.restore(on_done=lambda restored: self.master.after(0, self.on_files_restored, restored))
+
+    def restore_all_deleted(self):
+        folders = self.trash_folders()
+        if not messagebox.askyesno("Restore All Deleted", "Restore every file in the trash of the current folders?"):
+            return
+        self.trash.restore_all(folders, on_done=lambda restored: self.master.after(0, self.on_files_restored, restored))
+
+    def empty_trash(self):
+        if not messagebox.askyesno("Empty Trash", "Permanently delete every file in the trash of the current folders?"):
+            return
+        self.trash.purge(
+            self.trash_folders(),
+            on_done=lambda count: self.master.after(0, self.update_status, f"Permanently deleted {count} files"),
+        )
+
+    def purge_expired_trash(self):
+        """Permanently delete trashed files older than the retention period in the background."""
+        days = self.settings.get("trash_retention_days", 7)
+        if days > 0:
+            self.trash.purge(self.trash_folders(), max_age_days=days)
+
+    def set_trash_retention(self):
+        days = simpledialog.askinteger(
+            "Trash Retention",
+            "Days to keep deleted files before removing them for good (0 keeps them until Empty Trash):",
+            initialvalue=self.settings.get("trash_retention_days", 7),
+            minvalue=0,
+            parent=self.master,
+        )
+        if days is not None:
+            self.settings["trash_retention_days"] = days
+            self.save_settings()
+
+    def get_tag_store(self, folder):
+        """Return the caption store for ``folder``, reading its sidecars on first use."""
+        if not folder or not os.path.isdir(folder):
+            return None
+        folder = os.path.normpath(folder)
+        store = self.tag_stores.get(folder)
+        if store is None:
+            store = self.tag_stores[folder] = TagStore(folder)
+        return store
+
+    def add_crop_caption(self, source_path, crop_path):
+        """Give a new crop the caption of its source when sidecars are enabled."""
+        if not self.captions_var.get():
+            return
+        store = self.get_tag_store(os.path.dirname(crop_path))
+        if store is not None:
+            store.carry_over(source_path, crop_path)
+            self.schedule_caption_flush()
+
+    def schedule_caption_flush(self):
+        """Write pending caption edits once editing pauses."""
+        if self.caption_flush_id is not None:
+            self.master.after_cancel(self.caption_flush_id)
+        self.caption_flush_id = self.master.after(CAPTION_FLUSH_DELAY_MS, self.flush_captions)
+
+    def flush_captions(self):
+        if self.caption_flush_id is not None:
+            self.master.after_cancel(self.caption_flush_id)
+            self.caption_flush_id = None
+        for store in self.tag_stores.values():
+            store.flush()
+
+    def show_captions_dialog(self):
+        folder = self.output_folder or self.folder_path
+        store = self.get_tag_store(folder)
+        if store is None:
+            self.show_info_message("Information", "Please set an Output Folder from the File Menu!")
+            return
+
+        window = tk.Toplevel(self.master)
+        window.title(f"Captions - {folder}")
+        window.geometry("900x520")
+
+        tag_frame = tk.Frame(window)
+        tag_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
+        tag_tree = ttk.Treeview(tag_frame, columns=("tag", "count"), show="headings", height=20)
+        tag_tree.heading("tag", text="Tag")
+        tag_tree.heading("count", text="Images")
+        tag_tree.column("tag", width=200)
+        tag_tree.column("count", width=60, anchor="center")
+        tag_tree.pack(fill=tk.Y, expand=True)
+
+        right = tk.Frame(window)
+        right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        file_list = tk.Listbox(right, height=12)
+        file_list.pack(fill=tk.BOTH, expand=True)
+        caption_text = tk.Text(right, height=6, wrap="word")
+        caption_text.pack(fill=tk.X, pady=5)
+
+        edit_frame = tk.Frame(right)
+        edit_frame.pack(fill=tk.X)
+        tk.Label(edit_frame, text="Find tag").grid(row=0, column=0, sticky="e")
+        find_entry = tk.Entry(edit_frame, width=24)
+        find_entry.grid(row=0, column=1, sticky="w")
+        tk.Label(edit_frame, text="Replace with").grid(row=0, column=2, sticky="e")
+        replace_entry = tk.Entry(edit_frame, width=24)
+        replace_entry.grid(row=0, column=3, sticky="w")
+
+        shown = []
+        selected = {"path": None}
+
+        def refresh_tags():
+            tag_tree.delete(*tag_tree.get_children())
+            for tag, count in store.frequencies():
+                tag_tree.insert("", "end", values=(tag, count))
+
+        def show_files(paths):
+            shown[:] = paths
+            file_list.delete(0, tk.END)
+            for path in paths:
+                file_list.insert(tk.END, os.path.basename(path))
+
+        def on_tag_select(event):
+            selection = tag_tree.selection()
+            if selection:
+                tag = tag_tree.set(selection[0], "tag")
+                find_entry.delete(0, tk.END)
+                find_entry.insert(0, tag)
+                show_files(store.find(tag))
+
+        def on_file_select(event):
+            selection = file_list.curselection()
+            if not selection:
+                return
+            selected["path"] = shown[selection[0]]
+            caption_text.delete("1.0", tk.END)
+            caption_text.insert("1.0", store.get(selected["path"]))
+
+        def on_caption_edit(event):
+            if selected["path"]:
+                store.set(selected["path"], caption_text.get("1.0", tk.END))
+                self.schedule_caption_flush()
+
+        def replace_all():
+            old = find_entry.get().strip()
+            if not old:
+                return
+            changed = store.replace_tag(old, replace_entry.get())
+            self.schedule_caption_flush()
+            refresh_tags()
+            show_files(store.find(replace_entry.get().strip()) if replace_entry.get().strip() else [])
+            self.update_status(f"Updated {changed} captions")
+
+        def add_to_listed():
+            tag = replace_entry.get().strip() or find_entry.get().strip()
+            if not tag or not shown:
+                return
+            changed = store.add_tag(tag, list(shown))
+            self.schedule_caption_flush()
+            refresh_tags()
+            self.update_status(f"Added '{tag}' to {changed} captions")
+
+        def show_all():
+            show_files(sorted(store.captions))
+
+        tk.Button(edit_frame, text="Replace All", command=replace_all).grid(row=0, column=4, padx=5)
+        tk.Button(edit_frame, text="Add to Listed", command=add_to_listed).grid(row=0, column=5, padx=5)
+        tk.Button(edit_frame, text="Show All", command=show_all).grid(row=0, column=6, padx=5)
+
+        tag_tree.bind("<<TreeviewSelect>>", on_tag_select)
+        file_list.bind("<<ListboxSelect>>", on_file_select)
+        caption_text.bind("<KeyRelease>", on_caption_edit)
+        window.protocol("WM_DELETE_WINDOW", lambda: (self.flush_captions(), window.destroy()))
+
+        refresh_tags()
+        show_all()
+
+    def set_buckets(self, buckets):
+        """Use ``buckets`` for "Auto Bucket" and show that option when there are any."""
+        self.buckets = buckets
+        self.settings["aspect_buckets"] = [list(bucket) for bucket in buckets]
+        values = [value for value in self.size_dropdown["values"] if value != self.bucket_option]
+        if buckets:
+            values.insert(-1, self.bucket_option)
+        elif self.size_var.get() == self.bucket_option:
+            self.size_var.set(self.previous_size)
+        self.size_dropdown["values"] = values
+
+    def show_buckets_dialog(self):
+        from buckets import (
+            DEFAULT_BASE,
+            DEFAULT_BUCKET_COUNT,
+            DEFAULT_MAX_RATIO,
+            bucket_crops,
+            plan_buckets,
+            read_sizes,
+        )
+        window = tk.Toplevel(self.master)
+        window.title("Aspect Buckets")
+        window.geometry("420x420")
+
+        options = tk.Frame(window)
+        options.pack(fill=tk.X, padx=5, pady=5)
+        base_var = tk.IntVar(value=DEFAULT_BASE)
+        count_var = tk.IntVar(value=DEFAULT_BUCKET_COUNT)
+        ratio_var = tk.DoubleVar(value=DEFAULT_MAX_RATIO)
+        tk.Label(options, text="Resolution").grid(row=0, column=0, sticky="e")
+        tk.Entry(options, textvariable=base_var, width=6).grid(row=0, column=1, sticky="w")
+        tk.Label(options, text="Buckets").grid(row=0, column=2, sticky="e")
+        tk.Entry(options, textvariable=count_var, width=4).grid(row=0, column=3, sticky="w")
+        tk.Label(options, text="Max ratio").grid(row=0, column=4, sticky="e")
+        tk.Entry(options, textvariable=ratio_var, width=4).grid(row=0, column=5, sticky="w")
+
+        tree = ttk.Treeview(window, columns=("bucket", "aspect", "images"), show="headings")
+        for col, text in (("bucket", "Bucket"), ("aspect", "Aspect"), ("images", "Images")):
+            tree.heading(col, text=text)
+            tree.column(col, anchor="center", width=120)
+        tree.pack(fill=tk.BOTH, expand=True, padx=5)
+
+        planned = list(self.buckets)
+
+        def show(plan):
+            tree.delete(*tree.get_children())
+            for bucket, images in plan:
+                tree.insert("", "end", values=(f"{bucket[0]}x{bucket[1]}", f"{bucket[0] / bucket[1]:.2f}", images))
+
+        def plan_from_sources():
+            if not self.images:
+                self.show_info_message("Information", "Please set an Input Folder from the File Menu!")
+                return
+            try:
+                base, count, ratio = base_var.get(), count_var.get(), ratio_var.get()
+            except tk.TclError:
+                messagebox.showerror("Invalid Input", "Please enter numbers for the bucket options.", parent=window)
+                return
+            paths = list(self.images)
+
+            def job(progress_callback, cancel_event):
+                sizes = read_sizes(paths, progress_callback, cancel_event)
+                return plan_buckets(sizes, count, base, max_ratio=ratio)
+
+            def done(plan, cancelled):
+                if cancelled or not plan:
+                    return
+                planned[:] = [bucket for bucket, _ in plan]
+                show(plan)
+
+            self.run_background_job("Reading image sizes", job, done)
+
+        def use_buckets():
+            if not planned:
+                return
+            self.set_buckets(list(planned))
+            self.size_var.set(self.bucket_option)
+            self.save_settings()
+            if self.current_image is not None:
+                self.update_crop_box_size()
+            self.update_status(f"Cropping into {len(planned)} aspect buckets")
+
+        def bucket_existing():
+            if not planned or not self.cropped_images:
+                self.show_info_message("Information", "Plan buckets and make some crops first.")
+                return
+            target = filedialog.askdirectory(title="Select Folder for Bucketed Crops")
+            if not target:
+                return
+            if self.output_folder and os.path.normpath(target) == os.path.normpath(self.output_folder):
+                messagebox.showerror("Error", "Choose a different folder so the original crops are kept.", parent=window)
+                return
+            paths, buckets = list(self.cropped_images), list(planned)
+
+            def job(progress_callback, cancel_event):
+                return bucket_crops(paths, buckets, target, progress_callback, cancel_event)
+
+            def done(assignments, cancelled):
+                state = "cancelled" if cancelled else "finished"
+                self.update_status(f"Bucketing {state}: {len(assignments or {})} crops written to {target}")
+
+            self.run_background_job("Resizing crops into buckets", job, done)
+
+        button_frame = tk.Frame(window)
+        button_frame.pack(fill=tk.X, pady=5)
+        tk.Button(button_frame, text="Plan from Sources", command=plan_from_sources).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Use for Cropping", command=use_buckets).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Bucket Existing Crops...", command=bucket_existing).pack(side=tk.RIGHT, padx=5)
+
+        show([(bucket, "") for bucket in planned])
+
+    def get_metric_store(self, folder):
+        from metricstore import MetricStore
+        folder = os.path.normpath(folder)
+        store = self.metric_stores.get(folder)
+        if store is None:
+            store = self.metric_stores[folder] = MetricStore(folder)
+        return store
+
+    def score_crop(self, cropped, path):
+        """Run the PrunerIQ metrics on a new crop in the background.
+
+        The crop is scored from memory, so PrunerIQ finds the result in the
+        folder's metric store instead of decoding the file again.
+        """
+        if not self.score_crops_var.get():
+            return
+        import numpy as np
+        # Take the pixels now; the caller shrinks ``cropped`` into a thumbnail
+        pixels = np.asarray(cropped if cropped.mode == "RGB" else cropped.convert("RGB"))
+        folder = os.path.dirname(path)
+        normalise = self.settings.get("normalise_analysis", False)
+        store = self.get_metric_store(folder)
+        if self.scoring_executor is None:
+            self.scoring_executor = ThreadPoolExecutor(max_workers=1)
+
+        def work():
+            from pruneriq import WORKING_SIZE, analyze_array, resize_to_working, resolve_calibration
+            try:
+                calibration, working_size = resolve_calibration(folder, WORKING_SIZE if normalise else None)
+                image = resize_to_working(pixels, working_size)
+                result = analyze_array(image, os.path.basename(path), calibration, rgb=True)
+                store.put(result["filename"], result, working_size)
+                store.flush()
+            except Exception as exc:
+                print(f"Failed to score {path}: {exc}")
+                return
+            self.master.after(0, self.on_crop_scored, path, result["rating"])
+
+        self.scoring_executor.submit(work)
+
+    def on_crop_scored(self, path, rating):
+        self.crop_ratings[path] = rating
+        if path in self.cropped_images:
+            self.refresh_crops_canvas()
+
     def show_about(self):
         about_window = tk.Toplevel(self.master)
         about_window.title("About")
@@ -1049,7 +2422,7 @@ class PixelPruner:
         profile_label.pack(side=tk.LEFT)
         link = tk.Label(link_frame, text="https://github.com/theallyprompts/PixelPruner", fg="blue", cursor="hand2", padx=10)
         link.pack(side=tk.LEFT)
-        link.bind("<Button-1>", lambda e: webbrowser.open_new("https://github.com/theallyprompts/PixelPruner"))
+        link.bind("<Button-1>", lambda e: open_link("https://github.com/theallyprompts/PixelPruner"))
 
     def show_welcome_screen(self):
         welcome = tk.Toplevel(self.master)
@@ -1076,11 +2449,11 @@ class PixelPruner:
 
         link = tk.Label(frame, text="View on GitHub", fg="blue", cursor="hand2")
         link.pack()
-        link.bind("<Button-1>", lambda e: webbrowser.open_new("https://github.com/theallyprompts/PixelPruner"))
+        link.bind("<Button-1>", lambda e: open_link("https://github.com/theallyprompts/PixelPruner"))
 
         donate = tk.Label(frame, text="Buy me a coffee ☕", fg="blue", cursor="hand2")
         donate.pack(pady=(5, 15))
-        donate.bind("<Button-1>", lambda e: webbrowser.open_new("https://ko-fi.com/theallyprompts"))
+        donate.bind("<Button-1>", lambda e: open_link("https://ko-fi.com/theallyprompts"))
 
         # Input Folder
         tk.Label(frame, text="Default Input Folder:").pack(anchor="w")
@@ -1131,6 +2504,7 @@ class PixelPruner:
                 self.load_images_from_folder()
             self.update_status("Ready.")
             self.update_safe_mode_ui()
+            self.resume_crop_session()
             welcome.destroy()
 
         button_frame = tk.Frame(frame)
@@ -1152,6 +2526,15 @@ class PixelPruner:
             "crop_sound": False,
             "show_welcome": True,
             "safe_mode": False,
+            "perf_enabled": False,
+            "autocrop": False,
+            "caption_sidecars": False,
+            "score_crops": False,
+            "aspect_buckets": [],
+            "memory_budget_mb": 1024,
+            "video_window_seconds": 1.0,
+            "normalise_analysis": False,
+            "trash_retention_days": 7,
             "default_input_folder": "",
             "default_output_folder": "",
         }
@@ -1168,6 +2551,14 @@ class PixelPruner:
         self.crop_sound_var.set(self.settings.get("crop_sound", False))
         self.show_welcome_var.set(self.settings.get("show_welcome", True))
         self.safe_mode_var.set(self.settings.get("safe_mode", False))
+        self.perf_enabled_var.set(self.settings.get("perf_enabled", False))
+        perf.enable(self.perf_enabled_var.get())
+        self.autocrop_var.set(self.settings.get("autocrop", False))
+        self.captions_var.set(self.settings.get("caption_sidecars", False))
+        self.score_crops_var.set(self.settings.get("score_crops", False))
+        self.set_buckets([tuple(bucket) for bucket in self.settings.get("aspect_buckets", [])])
+        self.crop_template = self.settings.get("crop_template")
+        self.image_store.set_budget(self.settings.get("memory_budget_mb", 1024))
         self.default_input_folder = self.settings.get("default_input_folder", "")
         self.default_output_folder = self.settings.get("default_output_folder", "")
 
@@ -1182,6 +2573,10 @@ class PixelPruner:
         self.settings["crop_sound"] = self.crop_sound_var.get()
         self.settings["show_welcome"] = self.show_welcome_var.get()
         self.settings["safe_mode"] = self.safe_mode_var.get()
+        self.settings["perf_enabled"] = self.perf_enabled_var.get()
+        self.settings["autocrop"] = self.autocrop_var.get()
+        self.settings["caption_sidecars"] = self.captions_var.get()
+        self.settings["score_crops"] = self.score_crops_var.get()
         self.settings["default_input_folder"] = self.default_input_folder
         self.settings["default_output_folder"] = self.default_output_folder
 
@@ -1192,7 +2587,7 @@ class PixelPruner:
             print(f"Failed to save settings: {e}")
 
     def launch_pruneriq(self):
-        from pruneriq import analyze_folder
+        from pruneriq import analyze_folder, WORKING_SIZE
         if not self.output_folder:
             self.show_info_message("Information", "Please set or create an Output Folder first!")
             return
@@ -1206,9 +2601,12 @@ class PixelPruner:
 
         results = []
 
+        store = self.get_metric_store(folder)
+
         def run_analysis():
             nonlocal results
-            results = analyze_folder(folder, True)
+            working_size = WORKING_SIZE if self.settings.get("normalise_analysis") else None
+            results = analyze_folder(folder, True, working_size=working_size, store=store)
             self.master.after(0, finish)
 
         def finish():
@@ -1217,9 +2615,36 @@ class PixelPruner:
 
         threading.Thread(target=run_analysis, daemon=True).start()
 
+    def open_pruneriq_results(self):
+        """Show previously exported PrunerIQ results without re-analysing."""
+        from pruneriq import load_results
+        path = filedialog.askopenfilename(
+            title="Open PrunerIQ Results",
+            initialdir=self.output_folder or None,
+            filetypes=[("PrunerIQ results", "*.npz *.jsonl *.csv")],
+        )
+        if not path:
+            return
+        try:
+            results = load_results(path)
+        except Exception as exc:
+            messagebox.showerror("Error", f"Failed to load {path}: {exc}")
+            return
+        # Image paths are resolved relative to the folder holding the results
+        self.show_analysis_results(results, os.path.dirname(path))
 
     def show_analysis_results(self, results, folder_path):
-        from pruneriq import analyze_folder
+        from pruneriq import (
+            WORKING_SIZE,
+            analyze_folder,
+            apply_calibration,
+            calibrate,
+            export_results,
+            load_calibration,
+            load_results,
+            results_working_size,
+            save_calibration,
+        )
         if not results:
             self.show_info_message(
                 "Analysis",
@@ -1229,7 +2654,7 @@ class PixelPruner:
 
         window = tk.Toplevel(self.master)
         window.title("PrunerIQ - Dataset Analysis")
-        window.geometry("900x500")
+        window.geometry("1300x550")
 
         window.update_idletasks()
         window_width = window.winfo_width()
@@ -1257,6 +2682,26 @@ class PixelPruner:
             variable=crops_only_var,
         ).pack(side=tk.RIGHT, padx=5)
 
+        normalise_var = tk.BooleanVar(value=self.settings.get("normalise_analysis", False))
+
+        def toggle_normalise():
+            self.settings["normalise_analysis"] = normalise_var.get()
+            self.save_settings()
+
+        tk.Checkbutton(
+            path_frame,
+            text=f"Normalise Size ({WORKING_SIZE}px)",
+            variable=normalise_var,
+            command=toggle_normalise,
+        ).pack(side=tk.RIGHT, padx=5)
+
+        auto_calibrate_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            path_frame,
+            text="Auto-calibrate",
+            variable=auto_calibrate_var,
+        ).pack(side=tk.RIGHT, padx=5)
+
         def run_analysis(path):
             nonlocal all_results, current_folder
             current_folder = path
@@ -1280,8 +2725,18 @@ class PixelPruner:
             def progress_callback(idx, total):
                 window.after(0, lambda: progress_var.set(f"{idx} of {total}"))
 
+            # Share the app's store so one instance writes the folder's metrics
+            store = None if archives.is_archive(path) else self.get_metric_store(path)
+
             def worker():
-                res = analyze_folder(path, crops_only_var.get(), progress_callback)
+                res = analyze_folder(
+                    path,
+                    crops_only_var.get(),
+                    progress_callback,
+                    auto_calibrate=auto_calibrate_var.get(),
+                    working_size=WORKING_SIZE if normalise_var.get() else None,
+                    store=store,
+                )
                 window.after(0, lambda: finish(res))
 
             def finish(res):
@@ -1298,16 +2753,24 @@ class PixelPruner:
             if path:
                 run_analysis(path)
 
+        def change_archive():
+            path = filedialog.askopenfilename(
+                title="Select Archive",
+                filetypes=[("Archives", "*.zip *.tar *.tar.gz *.tgz"), ("All files", "*.*")],
+            )
+            if path:
+                run_analysis(path)
+
         def manual_reanalyze():
             run_analysis(current_folder)
 
         def open_current_folder():
             if os.path.isdir(current_folder):
-                subprocess.Popen([
-                    "explorer",
-                    current_folder.replace("/", "\\"),
-                ])
+                open_in_explorer(current_folder)
 
+        tk.Button(path_frame, text="Change Archive", command=change_archive).pack(
+            side=tk.RIGHT, padx=5
+        )
         tk.Button(path_frame, text="Change Folder", command=change_folder).pack(
             side=tk.RIGHT, padx=5
         )
@@ -1323,6 +2786,11 @@ class PixelPruner:
             "contrast",
             "clarity",
             "noise",
+            "highlight_clip",
+            "shadow_clip",
+            "colorfulness",
+            "saturation",
+            "entropy",
             "rating",
         )
         tree_frame = tk.Frame(window)
@@ -1346,7 +2814,8 @@ class PixelPruner:
             if col in ("filename", "rating"):
                 data.sort(reverse=reverse)
             else:
-                data.sort(key=lambda t: float(t[0]), reverse=reverse)
+                # Cells read "12.34 (56%)"; blanks are results without the metric
+                data.sort(key=lambda t: float(t[0].split()[0]) if t[0] else float("-inf"), reverse=reverse)
             for index, (val, k) in enumerate(data):
                 tree.move(k, "", index)
             tree.heading(col, command=lambda: sort_tree(col, not reverse))
@@ -1356,6 +2825,11 @@ class PixelPruner:
             "contrast": 110,
             "clarity": 110,
             "noise": 110,
+            "highlight_clip": 90,
+            "shadow_clip": 90,
+            "colorfulness": 90,
+            "saturation": 80,
+            "entropy": 70,
             "rating": 80,
         }
 
@@ -1363,8 +2837,15 @@ class PixelPruner:
             "contrast": "Contrast (%)",
             "clarity": "Clarity (%)",
             "noise": "Noise (%)",
+            "highlight_clip": "Highlights %",
+            "shadow_clip": "Shadows %",
+            "colorfulness": "Colorfulness",
         }
 
+        def format_metric(result, metric):
+            value = result.get(metric)
+            return "" if value is None else f"{value:.2f}"
+
         for col in columns:
             text = heading_names.get(col, col.title())
             tree.heading(col, text=text, command=lambda c=col: sort_tree(c, False))
@@ -1384,6 +2865,7 @@ class PixelPruner:
                         f"{result['contrast']:.2f} ({result['contrast_pct']:.0f}%)",
                         f"{result['clarity']:.2f} ({result['clarity_pct']:.0f}%)",
                         f"{result['noise']:.2f} ({result['noise_pct']:.0f}%)",
+                        *(format_metric(result, col) for col in columns[4:-1]),
                         result["rating"],
                     ),
                 )
@@ -1395,9 +2877,9 @@ class PixelPruner:
         filter_frame.pack(fill=tk.X, padx=5, pady=5)
 
         entries = {}
-        metrics = ["contrast", "clarity", "noise"]
+        metrics = list(columns[1:-1])
         for i, metric in enumerate(metrics):
-            tk.Label(filter_frame, text=f"{metric.title()} Min").grid(row=0, column=i*2, sticky="e")
+            tk.Label(filter_frame, text=f"{heading_names.get(metric, metric.title())} Min").grid(row=0, column=i*2, sticky="e")
             e_min = tk.Entry(filter_frame, width=6)
             e_min.grid(row=0, column=i*2+1, sticky="w")
             tk.Label(filter_frame, text=f"Max").grid(row=1, column=i*2, sticky="e")
@@ -1405,23 +2887,37 @@ class PixelPruner:
             e_max.grid(row=1, column=i*2+1, sticky="w")
             entries[metric] = (e_min, e_max)
 
-        tk.Label(filter_frame, text="Rating").grid(row=0, column=6, sticky="e")
+        rating_column = len(metrics) * 2
+        tk.Label(filter_frame, text="Rating").grid(row=0, column=rating_column, sticky="e")
         rating_var = tk.StringVar(value="All")
         rating_box = ttk.Combobox(filter_frame, textvariable=rating_var, state="readonly",
                                  values=["All", "Poor", "Fair", "Good", "Excellent"])
-        rating_box.grid(row=0, column=7, sticky="w")
+        rating_box.grid(row=0, column=rating_column + 1, sticky="w")
+        tk.Label(filter_frame, text="Metadata").grid(row=1, column=rating_column, sticky="e")
+        metadata_entry = tk.Entry(filter_frame, width=20)
+        metadata_entry.grid(row=1, column=rating_column + 1, sticky="w")
+        ToolTip(metadata_entry, "Prompt words, seed:, model: or sampler: of the image or its source")
+        # Images analysed here may not have been loaded as sources yet
+        self.index_metadata([archives.join(current_folder, r["filename"]) for r in all_results])
 
         info_label = tk.Label(window, text="", anchor="w")
         info_label.pack(fill=tk.X, padx=5)
 
         def apply_filter():
             filtered = []
+            query = metadata_entry.get().strip()
+            matching = self.metadata_matching_names(query, current_folder) if query else None
             for r in all_results:
-                passes = True
+                passes = matching is None or r["filename"] in matching
                 for metric in metrics:
                     min_val = entries[metric][0].get()
                     max_val = entries[metric][1].get()
-                    value = r[metric]
+                    value = r.get(metric)
+                    if value is None:
+                        if min_val or max_val:
+                            passes = False
+                            break
+                        continue
                     if min_val:
                         try:
                             if value < float(min_val):
@@ -1447,10 +2943,11 @@ class PixelPruner:
                 entries[metric][0].delete(0, tk.END)
                 entries[metric][1].delete(0, tk.END)
             rating_var.set("All")
+            metadata_entry.delete(0, tk.END)
             populate_tree(all_results)
 
-        tk.Button(filter_frame, text="Apply Filter", command=apply_filter).grid(row=0, column=8, padx=5)
-        tk.Button(filter_frame, text="Reset", command=reset_filter).grid(row=1, column=8, padx=5)
+        tk.Button(filter_frame, text="Apply Filter", command=apply_filter).grid(row=0, column=rating_column + 2, padx=5)
+        tk.Button(filter_frame, text="Reset", command=reset_filter).grid(row=1, column=rating_column + 2, padx=5)
 
         def on_select(event):
             selected = tree.selection()
@@ -1460,33 +2957,140 @@ class PixelPruner:
         tree.bind("<<TreeviewSelect>>", on_select)
 
         def delete_selected():
+            nonlocal all_results
             if self.safe_mode_var.get():
                 self.show_info_message(
                     "Safe Mode",
                     "Safe Mode is enabled. Delete operations are disabled.",
                 )
                 return
-            for item in tree.selection():
-                filename = tree.set(item, "filename")
-                path = os.path.join(current_folder, filename)
-                if os.path.exists(path):
-                    os.remove(path)
-                tree.delete(item)
+            if archives.is_archive(current_folder):
+                self.show_info_message("Information", "Images inside an archive are read-only and cannot be deleted.")
+                return
+            selection = tree.selection()
+            names = {tree.set(item, "filename") for item in selection}
+            paths = [os.path.join(current_folder, name) for name in names]
+            self.trash_files(paths)
+            tree.delete(*selection)
+            # Trashed images must not come back on Reset or reach exports,
+            # reports and calibration
+            all_results = [r for r in all_results if r["filename"] not in names]
+            update_summary()
+            self.forget_deleted_crops(paths)
+            self.update_status(f"Moved {len(paths)} images to the trash")
 
         def on_double_click(event):
             item = tree.focus()
             if item:
                 filename = tree.set(item, "filename")
-                path = os.path.join(current_folder, filename)
+                path = archives.join(current_folder, filename)
                 self.view_image(path)
 
         tree.bind("<Double-1>", on_double_click)
 
+        def export_all():
+            path = filedialog.asksaveasfilename(
+                title="Export Results",
+                initialdir=current_folder,
+                defaultextension=".npz",
+                filetypes=[
+                    ("NumPy columns", "*.npz"),
+                    ("JSON Lines", "*.jsonl"),
+                    ("CSV", "*.csv"),
+                ],
+            )
+            if not path:
+                return
+            try:
+                export_results(all_results, path)
+            except Exception as exc:
+                messagebox.showerror("Error", f"Failed to export results: {exc}", parent=window)
+                return
+            self.update_status(f"Exported {len(all_results)} results to {path}")
+
+        def import_results():
+            nonlocal all_results, current_folder
+            path = filedialog.askopenfilename(
+                title="Load Results",
+                initialdir=current_folder,
+                filetypes=[("PrunerIQ results", "*.npz *.jsonl *.csv")],
+            )
+            if not path:
+                return
+            try:
+                all_results = load_results(path)
+            except Exception as exc:
+                messagebox.showerror("Error", f"Failed to load {path}: {exc}", parent=window)
+                return
+            current_folder = os.path.dirname(path)
+            path_var.set(current_folder)
+            populate_tree(all_results)
+            update_summary()
+
+        def generate_report():
+            if not all_results:
+                return
+            path = filedialog.asksaveasfilename(
+                title="Save Dataset Report",
+                initialdir=current_folder,
+                defaultextension=".html",
+                filetypes=[("HTML", "*.html"), ("Markdown", "*.md")],
+            )
+            if not path:
+                return
+            from report import build_report
+            results, folder = all_results, current_folder
+
+            def job(progress_callback, cancel_event):
+                return build_report(results, folder, path, progress_callback=progress_callback, cancel_event=cancel_event)
+
+            def done(data, cancelled):
+                if cancelled:
+                    self.update_status("Report cancelled")
+                elif data is None:
+                    messagebox.showerror("Error", f"Failed to write report to {path}", parent=window)
+                else:
+                    self.update_status(f"Report on {data['count']} images saved to {path}")
+
+            self.run_background_job("Building report", job, done)
+
+        def calibrate_results():
+            if not all_results:
+                return
+            # The size the results were analysed at, not the current checkbox
+            try:
+                working_size = results_working_size(all_results)
+            except ValueError as exc:
+                messagebox.showerror("Error", f"Cannot calibrate: {exc}", parent=window)
+                return
+            calibration = dict(calibrate(all_results), working_size=working_size)
+            # Archives are read-only; their calibration is only applied in memory
+            if not archives.is_archive(current_folder):
+                try:
+                    save_calibration(current_folder, calibration)
+                except OSError as exc:
+                    messagebox.showerror("Error", f"Failed to save calibration: {exc}", parent=window)
+            apply_calibration(all_results, calibration)
+            populate_tree(all_results)
+            update_summary()
+
         button_frame = tk.Frame(window)
         button_frame.pack(fill=tk.X, pady=5)
         tk.Button(button_frame, text="Delete Selected", command=delete_selected).pack(
             side=tk.RIGHT, padx=5
         )
+        tk.Button(button_frame, text="Calibrate", command=calibrate_results).pack(
+            side=tk.RIGHT, padx=5
+        )
+        tk.Button(button_frame, text="Export Results", command=export_all).pack(
+            side=tk.LEFT, padx=5
+        )
+        tk.Button(button_frame, text="Load Results", command=import_results).pack(
+            side=tk.LEFT, padx=5
+        )
+        tk.Button(button_frame, text="Report...", command=generate_report).pack(
+            side=tk.LEFT, padx=5
+        )
 
         summary_label = tk.Label(
             window, font=("Helvetica", 10), anchor="w", justify="left"
@@ -1509,19 +3113,137 @@ class PixelPruner:
                     f"Avg Clarity: {avg_clarity:.2f} ({avg_clarity_pct:.0f}%)   "
                     f"Avg Noise: {avg_noise:.2f} ({avg_noise_pct:.0f}%)"
                 )
+            calibration = load_calibration(current_folder)
+            if calibration:
+                thresholds = calibration["thresholds"]
+                summary += (
+                    f"\nCalibrated from {calibration.get('count', 0)} images - thresholds: "
+                    f"contrast {thresholds['contrast']:.2f}, clarity {thresholds['clarity']:.2f}, "
+                    f"noise {thresholds['noise']:.2f}"
+                )
             summary_label.config(text=summary)
 
         update_summary()
 
 
+    def toggle_perf_timing(self):
+        perf.enable(self.perf_enabled_var.get())
+        self.save_settings()
+
+    def toggle_profile_capture(self):
+        """Start or stop a cProfile capture, offering to save it when stopped."""
+        if self.profile_var.get():
+            perf.start_profile()
+            self.update_status("cProfile capture started")
+            return
+        profiler = perf.stop_profile()
+        if profiler is None:
+            return
+        path = filedialog.asksaveasfilename(
+            title="Save Profile",
+            defaultextension=".prof",
+            initialfile=f"pixelpruner_{time.strftime('%Y%m%d_%H%M%S')}.prof",
+            filetypes=[("cProfile data", "*.prof")],
+        )
+        if path:
+            profiler.dump_stats(path)
+            self.update_status(f"Profile saved to {path}")
+        else:
+            self.update_status("cProfile capture discarded")
+
+    def show_performance_dialog(self):
+        window = tk.Toplevel(self.master)
+        window.title("Performance")
+        window.geometry("760x360")
+
+        options = tk.Frame(window)
+        options.pack(fill=tk.X, padx=5, pady=5)
+        tk.Checkbutton(options, text="Enable timing", variable=self.perf_enabled_var, command=self.toggle_perf_timing).pack(side=tk.LEFT)
+        tk.Checkbutton(options, text="cProfile capture", variable=self.profile_var, command=self.toggle_profile_capture).pack(side=tk.LEFT, padx=10)
+
+        columns = ("name", "count", "mean", "p50", "p95", "max", "total")
+        tree = ttk.Treeview(window, columns=columns, show="headings")
+        headings = {
+            "name": "Timer",
+            "count": "Calls",
+            "mean": "Mean (ms)",
+            "p50": "p50 (ms)",
+            "p95": "p95 (ms)",
+            "max": "Max (ms)",
+            "total": "Total (ms)",
+        }
+        for col in columns:
+            tree.heading(col, text=headings[col])
+            tree.column(col, anchor="w" if col == "name" else "center", width=160 if col == "name" else 90)
+        tree.pack(fill=tk.BOTH, expand=True, padx=5)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for name, stats in perf.snapshot().items():
+                tree.insert("", "end", values=(
+                    name,
+                    stats["count"],
+                    f"{stats['mean_ms']:.1f}",
+                    f"{stats['p50_ms']:.0f}",
+                    f"{stats['p95_ms']:.0f}",
+                    f"{stats['max_ms']:.1f}",
+                    f"{stats['total_ms']:.0f}",
+                ))
+
+        def reset():
+            perf.reset()
+            refresh()
+
+        def export(kind):
+            path = filedialog.asksaveasfilename(
+                title="Export Timings",
+                defaultextension=f".{kind}",
+                filetypes=[(kind.upper(), f"*.{kind}")],
+            )
+            if not path:
+                return
+            if kind == "json":
+                perf.dump_json(path)
+            else:
+                perf.dump_csv(path)
+            self.update_status(f"Timings exported to {path}")
+
+        button_frame = tk.Frame(window)
+        button_frame.pack(fill=tk.X, pady=5)
+        tk.Button(button_frame, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Reset", command=reset).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Benchmark Display", command=lambda: self.benchmark_display(window)).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Export CSV", command=lambda: export("csv")).pack(side=tk.RIGHT, padx=5)
+        tk.Button(button_frame, text="Export JSON", command=lambda: export("json")).pack(side=tk.RIGHT, padx=5)
+
+        refresh()
+
+    def benchmark_display(self, parent=None):
+        """Compare the ways of putting an image on screen and show the timings."""
+        self.update_status("Benchmarking display transfer...")
+        self.master.update_idletasks()
+        results = benchmark(self.master)
+        lines = [f"{name}: {ms:.2f} ms per 800x600 frame" for name, ms in results.items()]
+        lines.append(f"In use: {transfer_method()}")
+        messagebox.showinfo("Display Benchmark", "\n".join(lines), parent=parent)
+        self.update_status("Display benchmark finished")
+
     def on_close(self):
         """Handle application close."""
         self.save_settings()
+        self.flush_captions()
+        self.metadata_cancel.set()
+        # Let queued moves to the trash finish before exiting
+        self.trash.wait()
+        archives.close_all()
         self.master.destroy()
 
 def main():
+    start = time.perf_counter()
     root = TkinterDnD.Tk()
     app = PixelPruner(root)
+    # Time until the window is drawn and handling events
+    root.after_idle(lambda: perf.record("startup", (time.perf_counter() - start) * 1000))
     root.mainloop()
 
 if __name__ == "__main__":
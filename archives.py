@@ -0,0 +1,213 @@
+"""Images read straight from zip and tar archives.
+
+A dataset shipped as one large archive can be curated without extracting
+it.  Every image inside an archive gets a virtual path made of the
+archive's path and the member name, joined by :data:`SEPARATOR`::
+
+    D:/datasets/faces.zip::portraits/0001.png
+
+The member table of an archive is read once, when it is first opened, and
+kept by an :class:`ArchiveReader`.  Members are then read on demand by
+seeking to their data: zip members are stored independently, and members
+of an uncompressed tar lie at known offsets.  Compressed tars
+(``.tar.gz``) are supported, but reading a member there decompresses the
+archive up to it, so they are much slower.
+
+:func:`open_file`, :func:`open_image` and :func:`stat` accept both virtual
+and ordinary paths, so code reading sources only has to go through them.
+Archives are read-only: crops are written to the output folder as usual.
+
+Frames of video files are addressed the same way, ``clip.mp4::clip_f000120.png``,
+and decoded by :mod:`videos`, which is only imported once a frame is read.
+"""
+
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+from PIL import Image
+
+SEPARATOR = "::"
+
+ARCHIVE_EXTS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Frames of videos use the same virtual paths; see :mod:`videos`
+VIDEO_EXTS = (".mp4", ".mov", ".mkv", ".avi", ".webm")
+
+_readers = {}  # Absolute archive path -> ArchiveReader
+_readers_lock = threading.Lock()
+
+
+class MemberStat:
+    """The parts of ``os.stat_result`` known for an archive member."""
+
+    __slots__ = ("st_size", "st_mtime_ns")
+
+    def __init__(self, size, mtime_ns):
+        self.st_size = size
+        self.st_mtime_ns = mtime_ns
+
+
+def is_archive(path):
+    """Return whether ``path`` names a supported archive file."""
+    return path.lower().endswith(ARCHIVE_EXTS) and os.path.isfile(path)
+
+
+def is_video(path):
+    """Return whether ``path`` names a supported video file."""
+    return path.lower().endswith(VIDEO_EXTS) and os.path.isfile(path)
+
+
+def is_frame(path):
+    """Return whether ``path`` is a virtual path of a video frame."""
+    archive, member = split_path(path)
+    return member is not None and archive.lower().endswith(VIDEO_EXTS)
+
+
+def is_member(path):
+    """Return whether ``path`` is a virtual path inside an archive."""
+    return SEPARATOR in path
+
+
+def split_path(path):
+    """Return ``(archive, member)``; ``member`` is ``None`` for ordinary paths."""
+    archive, sep, member = path.partition(SEPARATOR)
+    return (archive, member) if sep else (path, None)
+
+
+def member_path(archive, member):
+    return f"{archive}{SEPARATOR}{member}"
+
+
+def basename(path):
+    """Return the file name of ``path``; for members, without the archive."""
+    archive, member = split_path(path)
+    return os.path.basename(member if member is not None else path)
+
+
+def join(folder, name):
+    """Like ``os.path.join``, but ``folder`` may also be an archive."""
+    return member_path(folder, name) if is_archive(folder) else os.path.join(folder, name)
+
+
+class ArchiveReader:
+    """Random access to the members of one zip or tar archive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        self._lock = threading.Lock()  # Archive handles are not thread safe
+        if zipfile.is_zipfile(path):
+            self._zip = zipfile.ZipFile(path)
+            self._tar = None
+            infos = [info for info in self._zip.infolist() if not info.is_dir()]
+            self.members = {info.filename: (info.file_size, _zip_mtime_ns(info)) for info in infos}
+        else:
+            self._zip = None
+            self._tar = tarfile.open(path)
+            self._tar_infos = {info.name: info for info in self._tar.getmembers() if info.isfile()}
+            self.members = {
+                name: (info.size, int(info.mtime * 1_000_000_000)) for name, info in self._tar_infos.items()
+            }
+
+    def images(self):
+        """Return the names of the image members, in archive order."""
+        return [name for name in self.members if name.lower().endswith(IMAGE_EXTS)]
+
+    def read(self, member):
+        """Return the bytes of ``member``."""
+        with self._lock:
+            if self._zip is not None:
+                return self._zip.read(member)
+            f = self._tar.extractfile(self._tar_infos[member])
+            return f.read()
+
+    def close(self):
+        with self._lock:
+            (self._zip or self._tar).close()
+
+
+def _zip_mtime_ns(info):
+    return int(time.mktime(info.date_time + (0, 0, -1))) * 1_000_000_000
+
+
+def reader(archive):
+    """Return the shared reader of ``archive``, reopening it if the file changed."""
+    key = os.path.abspath(archive)
+    with _readers_lock:
+        current = _readers.get(key)
+        if current is not None and current.mtime_ns != os.stat(key).st_mtime_ns:
+            current.close()
+            current = None
+        if current is None:
+            current = _readers[key] = ArchiveReader(key)
+        return current
+
+
+def list_images(archive):
+    """Return the virtual paths of the images in ``archive``."""
+    return [member_path(archive, name) for name in reader(archive).images()]
+
+
+def open_file(path):
+    """Open ``path`` for binary reading, whether it is a file or a member."""
+    archive, member = split_path(path)
+    if member is None:
+        return open(path, "rb")
+    if is_frame(path):
+        data = io.BytesIO()
+        open_image(path).save(data, "PNG")
+        data.seek(0)
+        return data
+    return io.BytesIO(reader(archive).read(member))
+
+
+def open_image(path):
+    """Open ``path`` with Pillow; members are read into memory first."""
+    if not is_member(path):
+        return Image.open(path)
+    if is_frame(path):
+        from videos import read_frame
+        return read_frame(path)
+    return Image.open(open_file(path))
+
+
+def read_bytes(path):
+    with open_file(path) as f:
+        return f.read()
+
+
+def stat(path):
+    """Return the size and modification time of ``path``; raises ``OSError``."""
+    archive, member = split_path(path)
+    if member is None:
+        return os.stat(path)
+    if is_frame(path):
+        # Frames change only with their video
+        return MemberStat(0, os.stat(archive).st_mtime_ns)
+    try:
+        size, mtime_ns = reader(archive).members[member]
+    except (KeyError, tarfile.TarError, zipfile.BadZipFile) as e:
+        raise FileNotFoundError(path) from e
+    return MemberStat(size, mtime_ns)
+
+
+def exists(path):
+    try:
+        stat(path)
+    except OSError:
+        return False
+    return True
+
+
+def close_all():
+    """Close every open archive."""
+    with _readers_lock:
+        for current in _readers.values():
+            current.close()
+        _readers.clear()
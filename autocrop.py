@@ -0,0 +1,199 @@
+"""Automatic crop box suggestions.
+
+Suggestions are centred on the most important part of an image:
+
+``faces``
+    OpenCV's bundled frontal face cascade (LBP when available, Haar
+    otherwise).  When faces are found the box is centred on all of them and
+    grown if needed so none are cut off.
+``saliency``
+    Without faces, a spectral-residual saliency map is used and the box is
+    centred on its weighted centre of mass.  ``cv2.saliency`` from
+    opencv-contrib is used when installed; otherwise an equivalent NumPy
+    implementation runs.
+
+Detection runs on a copy whose longest side is at most ``DETECT_MAX_SIDE``
+pixels, so the cost per image is small and independent of the source
+resolution.  Boxes are always returned in full-resolution source
+coordinates with the aspect ratio of the requested crop size.
+"""
+
+import os
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from archives import open_image
+from imageops import read_region
+from jobs import crop_output_path, run_parallel
+
+# Longest side of the image the detectors work on
+DETECT_MAX_SIDE = 512
+
+# Extra space kept around detected faces, as a fraction of their size
+FACE_PADDING = 0.35
+
+_cascade_lock = threading.Lock()
+_cascade = None
+
+
+def _face_cascade():
+    """Return the shared face detector, preferring the faster LBP cascade."""
+    global _cascade
+    with _cascade_lock:
+        if _cascade is None:
+            data_dir = cv2.data.haarcascades
+            for name in ("lbpcascade_frontalface_improved.xml", "haarcascade_frontalface_default.xml"):
+                path = os.path.join(data_dir, name)
+                if os.path.exists(path):
+                    _cascade = cv2.CascadeClassifier(path)
+                    break
+        return _cascade
+
+
+def detect_faces(gray):
+    """Return face rectangles ``(x, y, w, h)`` found in a greyscale array."""
+    cascade = _face_cascade()
+    if cascade is None or cascade.empty():
+        return []
+    min_side = max(24, min(gray.shape) // 12)
+    faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+    return [tuple(int(v) for v in face) for face in faces]
+
+
+def saliency_map(gray):
+    """Return a float32 saliency map the same size as ``gray``, scaled 0-1."""
+    saliency = getattr(cv2, "saliency", None)
+    if saliency is not None:
+        ok, sal = saliency.StaticSaliencySpectralResidual_create().computeSaliency(gray)
+        if ok:
+            return cv2.normalize(sal.astype(np.float32), None, 0, 1, cv2.NORM_MINMAX)
+
+    # Spectral residual (Hou & Zhang 2007) on a 64x64 copy
+    small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA).astype(np.float32)
+    spectrum = np.fft.fft2(small)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8)
+    phase = np.angle(spectrum)
+    residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+    sal = np.abs(np.fft.ifft2(np.exp(residual + 1j * phase))) ** 2
+    sal = cv2.GaussianBlur(sal.astype(np.float32), (9, 9), 2.5)
+    sal = cv2.resize(sal, (gray.shape[1], gray.shape[0]), interpolation=cv2.INTER_LINEAR)
+    return cv2.normalize(sal, None, 0, 1, cv2.NORM_MINMAX)
+
+
+def _fit_box(cx, cy, need_w, need_h, aspect, image_size):
+    """Return the box of ``aspect`` covering ``need_w`` x ``need_h`` centred at (cx, cy)."""
+    width, height = image_size
+    box_w = max(need_w, need_h * aspect)
+    box_h = box_w / aspect
+    # Shrink to fit inside the image while keeping the aspect ratio
+    if box_w > width:
+        box_w, box_h = width, width / aspect
+    if box_h > height:
+        box_w, box_h = height * aspect, height
+    x1 = min(max(0, cx - box_w / 2), width - box_w)
+    y1 = min(max(0, cy - box_h / 2), height - box_h)
+    return (int(x1), int(y1), int(x1 + box_w), int(y1 + box_h))
+
+
+def suggest_box(gray, crop_size, scale=1.0):
+    """Suggest a crop box for a detection-sized greyscale array.
+
+    Parameters
+    ----------
+    gray : numpy.ndarray
+        Greyscale image, at most ``DETECT_MAX_SIDE`` on its longest side.
+    crop_size : tuple[int, int]
+        Target (width, height) in source pixels.  The box has this aspect
+        ratio and is at least this large unless the source is smaller.
+    scale : float, optional
+        Source pixels per ``gray`` pixel.
+
+    Returns
+    -------
+    tuple[int, int, int, int]
+        Box in source coordinates.
+    """
+    height, width = gray.shape[:2]
+    source_size = (width * scale, height * scale)
+    aspect = crop_size[0] / crop_size[1]
+    need_w, need_h = crop_size
+
+    faces = detect_faces(gray)
+    if faces:
+        x1 = min(x for x, y, w, h in faces)
+        y1 = min(y for x, y, w, h in faces)
+        x2 = max(x + w for x, y, w, h in faces)
+        y2 = max(y + h for x, y, w, h in faces)
+        pad_x, pad_y = (x2 - x1) * FACE_PADDING, (y2 - y1) * FACE_PADDING
+        cx, cy = (x1 + x2) / 2 * scale, (y1 + y2) / 2 * scale
+        need_w = max(need_w, (x2 - x1 + 2 * pad_x) * scale)
+        need_h = max(need_h, (y2 - y1 + 2 * pad_y) * scale)
+    else:
+        sal = saliency_map(gray)
+        total = float(sal.sum())
+        if total > 0:
+            ys, xs = np.indices(sal.shape)
+            cx = float((xs * sal).sum() / total) * scale
+            cy = float((ys * sal).sum() / total) * scale
+        else:
+            cx, cy = source_size[0] / 2, source_size[1] / 2
+    return _fit_box(cx, cy, need_w, need_h, aspect, source_size)
+
+
+def detection_image(image):
+    """Return ``(gray_array, scale)`` for a PIL image, downscaled for detection."""
+    scale = max(1.0, max(image.size) / DETECT_MAX_SIDE)
+    small = image.convert("L")
+    if scale > 1:
+        small = small.resize((int(image.width / scale), int(image.height / scale)), Image.BOX)
+    return np.asarray(small), scale
+
+
+def suggest_for_path(path, crop_size):
+    """Open ``path`` and return a suggested crop box in source coordinates."""
+    with open_image(path) as img:
+        full_size = img.size
+        # JPEGs can be decoded directly at a reduced scale
+        img.draft("L", (DETECT_MAX_SIDE, DETECT_MAX_SIDE))
+        gray, _ = detection_image(img)
+    scale = full_size[0] / gray.shape[1]
+    return suggest_box(gray, crop_size, scale)
+
+
+def autocrop_image(path, crop_size, output_path):
+    """Crop ``path`` at its suggested box, resize to ``crop_size`` and save.
+
+    Returns ``(output_path, box)``.
+    """
+    box = suggest_for_path(path, crop_size)
+    cropped = read_region(path, box).resize(crop_size)
+    cropped.save(output_path, "PNG")
+    return output_path, box
+
+
+def autocrop_images(paths, crop_size, output_folder, start_counter=1,
+                    progress_callback=None, cancel_event=None, workers=None):
+    """Auto-crop every image in ``paths`` into ``output_folder``.
+
+    Output files use the ``cropped_{counter}_{name}.png`` naming, numbered
+    from ``start_counter`` in the order of ``paths``.
+
+    Returns
+    -------
+    list
+        ``(output_path, box)`` for each input, or ``None`` where cropping
+        failed or was cancelled.
+    """
+    jobs = [
+        (path, crop_output_path(output_folder, counter, path))
+        for counter, path in enumerate(paths, start_counter)
+    ]
+
+    def work(job):
+        source, output = job
+        return autocrop_image(source, crop_size, output)
+
+    return run_parallel(work, jobs, workers, progress_callback, cancel_event)
@@ -0,0 +1,150 @@
+"""Reusable Tk surfaces for showing PIL images.
+
+Creating an ``ImageTk.PhotoImage`` allocates a new Tk image every time,
+which adds up when the preview is redrawn on every mouse move.  A
+:class:`PhotoSurface` keeps one Tk image and overwrites its pixels in place,
+so canvas items that show it update without being recreated.  A new Tk
+image is only allocated when the size or mode changes.
+
+Pixels are transferred with the fastest path that works:
+
+``"paste"``
+    ``ImageTk.PhotoImage.paste``, which copies straight from Pillow's memory
+    into the Tk image through Pillow's Tk extension.
+``"ppm"``
+    Encodes the image as binary PPM and loads it with ``tk.PhotoImage``.
+    Slower, but needs nothing beyond Tk itself.
+
+The first failure of ``"paste"`` switches the whole module to ``"ppm"``.
+:func:`benchmark` times both paths against allocating a new
+``ImageTk.PhotoImage`` per frame.
+"""
+
+import time
+import tkinter as tk
+
+from PIL import Image, ImageTk
+
+_method = "paste"
+
+
+def transfer_method():
+    """Return the pixel transfer path currently in use."""
+    return _method
+
+
+def _surface_mode(image):
+    if image.mode in ("1", "L", "RGB", "RGBA"):
+        return image.mode
+    return "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+
+
+def _ppm_bytes(image):
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    kind = b"P5" if image.mode == "L" else b"P6"
+    return b"%s %d %d 255\n" % (kind, image.width, image.height) + image.tobytes()
+
+
+def new_photo(image, master=None):
+    """Return a Tk image showing ``image`` using the current transfer path."""
+    global _method
+    if _method == "paste":
+        try:
+            return ImageTk.PhotoImage(image, master=master)
+        except Exception:
+            _method = "ppm"
+    return tk.PhotoImage(master=master, data=_ppm_bytes(image), format="PPM")
+
+
+class PhotoSurface:
+    """A Tk image whose pixels are replaced in place by :meth:`show`.
+
+    The ``photo`` attribute can be passed to canvas items as their image;
+    items keep showing the surface across calls that keep its size.
+    """
+
+    def __init__(self, master=None):
+        self.master = master
+        self.photo = None
+        self.size = (0, 0)
+        self.mode = None
+        self.method = None
+
+    def show(self, image):
+        """Display ``image``; returns ``True`` if a new Tk image was allocated."""
+        global _method
+        mode = _surface_mode(image)
+        if self.photo is not None and (image.size, mode, _method) == (self.size, self.mode, self.method):
+            if _method == "paste":
+                try:
+                    self.photo.paste(image)
+                    return False
+                except Exception:
+                    _method = "ppm"
+            else:
+                self.photo.configure(data=_ppm_bytes(image), format="PPM")
+                return False
+        self.photo = new_photo(image, self.master)
+        self.size = image.size
+        self.mode = mode
+        self.method = _method
+        return True
+
+    def clear(self):
+        self.photo = None
+        self.size = (0, 0)
+        self.mode = None
+        self.method = None
+
+
+def benchmark(master=None, size=(800, 600), frames=30):
+    """Time the ways of showing ``frames`` images of ``size``.
+
+    Returns ``{name: milliseconds per frame}`` for allocating a new
+    ``ImageTk.PhotoImage`` per frame and for a :class:`PhotoSurface` using
+    each transfer path that works here.  A hidden root window is created
+    when ``master`` is not given.
+    """
+    global _method
+    root = master
+    if root is None:
+        root = tk.Tk()
+        root.withdraw()
+    # Alternate two frames so every transfer really changes pixels
+    images = [Image.new("RGB", size, (40, 80, 120)), Image.new("RGB", size, (200, 160, 90))]
+    results = {}
+
+    def run(name, show):
+        start = time.perf_counter()
+        for i in range(frames):
+            show(images[i % 2])
+        root.update_idletasks()
+        results[name] = (time.perf_counter() - start) * 1000 / frames
+
+    previous = _method
+    try:
+        try:
+            run("new PhotoImage", lambda image: ImageTk.PhotoImage(image, master=root))
+        except Exception:
+            pass
+        for method in ("paste", "ppm"):
+            _method = method
+            surface = PhotoSurface(root)
+            try:
+                surface.show(images[0])
+                if _method != method:
+                    continue
+                run(f"surface ({method})", surface.show)
+            except Exception:
+                continue
+    finally:
+        _method = previous
+        if master is None:
+            root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    for name, ms in benchmark().items():
+        print(f"{name:20} {ms:8.2f} ms/frame")
@@ -0,0 +1,182 @@
+"""Aspect-ratio buckets for trainer-ready crops.
+
+Trainers such as kohya-ss group images into resolution buckets of roughly
+equal area and different aspect ratios instead of forcing one size.
+:func:`plan_buckets` reads the dimensions of a source set and picks the
+bucket list that fits its aspect ratios best.  Crops can then be snapped to
+the nearest bucket, and existing crops resized into buckets with
+:func:`bucket_crops`, which also writes a ``buckets.json`` manifest.
+
+Candidate buckets have sides that are multiples of ``step`` and an area
+close to ``base * base``.  Choosing ``count`` of them is a one-dimensional
+k-median problem over log aspect ratios.  The sources are first binned to
+their nearest candidate; dynamic programming then finds the subset that
+minimises the total aspect error exactly.
+"""
+
+import json
+import math
+import os
+import shutil
+
+from PIL import Image
+
+from archives import basename, open_image
+from captions import caption_path
+from jobs import run_parallel
+
+# For Pillow >= 10
+try:
+    Resampling = Image.Resampling
+except AttributeError:
+    Resampling = Image
+
+MANIFEST_NAME = "buckets.json"
+
+DEFAULT_BASE = 1024
+DEFAULT_STEP = 64
+DEFAULT_MAX_RATIO = 2.0
+DEFAULT_BUCKET_COUNT = 8
+
+
+def candidate_buckets(base=DEFAULT_BASE, step=DEFAULT_STEP, max_ratio=DEFAULT_MAX_RATIO):
+    """Return ``(width, height)`` buckets of at most ``base``² pixels, widest last."""
+    area = base * base
+    buckets = set()
+    width = base
+    while width <= base * max_ratio:
+        height = area // width // step * step
+        if height >= step and width / height <= max_ratio:
+            # Portrait buckets mirror the landscape ones
+            buckets.add((width, height))
+            buckets.add((height, width))
+        width += step
+    return sorted(buckets, key=lambda b: b[0] / b[1])
+
+
+def nearest_bucket(size, buckets):
+    """Return the bucket whose aspect ratio is closest to ``size``."""
+    aspect = math.log(size[0] / size[1])
+    return min(buckets, key=lambda b: abs(math.log(b[0] / b[1]) - aspect))
+
+
+def read_size(path):
+    """Return the (width, height) of ``path`` from its header."""
+    with open_image(path) as img:
+        return img.size
+
+
+def read_sizes(paths, progress_callback=None, cancel_event=None, workers=None):
+    """Return the sizes of ``paths`` read in parallel, ``None`` for failures."""
+    return run_parallel(read_size, paths, workers, progress_callback, cancel_event)
+
+
+def plan_buckets(sizes, count=DEFAULT_BUCKET_COUNT, base=DEFAULT_BASE, step=DEFAULT_STEP,
+                 max_ratio=DEFAULT_MAX_RATIO):
+    """Choose ``count`` buckets that best fit the aspect ratios of ``sizes``.
+
+    Returns
+    -------
+    list[tuple[tuple[int, int], int]]
+        ``(bucket, images)`` pairs ordered by aspect ratio, where ``images``
+        is how many of ``sizes`` fall in that bucket.
+    """
+    candidates = candidate_buckets(base, step, max_ratio)
+    logs = [math.log(w / h) for w, h in candidates]
+    weights = [0] * len(candidates)
+    for size in sizes:
+        if size:
+            bucket = nearest_bucket(size, candidates)
+            weights[candidates.index(bucket)] += 1
+    used = [i for i, weight in enumerate(weights) if weight]
+    if not used:
+        return [((base, base), 0)]
+
+    points = [logs[i] for i in used]
+    mass = [weights[i] for i in used]
+    m = len(used)
+    count = max(1, min(count, m))
+
+    # seg[a][b] = (cost, median) of serving points a..b from one bucket
+    seg = [[None] * m for _ in range(m)]
+    for a in range(m):
+        for b in range(a, m):
+            seg[a][b] = min(
+                (sum(mass[i] * abs(points[i] - points[c]) for i in range(a, b + 1)), c)
+                for c in range(a, b + 1)
+            )
+
+    # best[k][b] = (cost, choices) covering points 0..b with k + 1 buckets
+    best = [[(seg[0][b][0], [seg[0][b][1]]) for b in range(m)]]
+    for k in range(1, count):
+        row = []
+        for b in range(m):
+            options = [
+                (best[k - 1][a - 1][0] + seg[a][b][0], best[k - 1][a - 1][1] + [seg[a][b][1]])
+                for a in range(k, b + 1)
+            ]
+            row.append(min(options, key=lambda option: option[0]) if options else (math.inf, []))
+        best.append(row)
+    chosen = [candidates[used[c]] for c in best[count - 1][m - 1][1]]
+
+    counts = {bucket: 0 for bucket in chosen}
+    for size in sizes:
+        if size:
+            counts[nearest_bucket(size, chosen)] += 1
+    return [(bucket, counts[bucket]) for bucket in chosen]
+
+
+def fit_to_bucket(image, bucket):
+    """Centre-crop ``image`` to the aspect ratio of ``bucket`` and resize to it."""
+    width, height = image.size
+    aspect = bucket[0] / bucket[1]
+    if width / height > aspect:
+        new_width = round(height * aspect)
+        left = (width - new_width) // 2
+        box = (left, 0, left + new_width, height)
+    else:
+        new_height = round(width / aspect)
+        top = (height - new_height) // 2
+        box = (0, top, width, top + new_height)
+    return image.resize(bucket, Resampling.LANCZOS, box=box)
+
+
+def write_manifest(folder, buckets, assignments):
+    """Write ``buckets.json`` describing the buckets and the bucket of each image."""
+    counts = {}
+    for bucket in assignments.values():
+        key = f"{bucket[0]}x{bucket[1]}"
+        counts[key] = counts.get(key, 0) + 1
+    manifest = {
+        "buckets": [list(bucket) for bucket in buckets],
+        "counts": counts,
+        "images": {name: list(bucket) for name, bucket in sorted(assignments.items())},
+    }
+    with open(os.path.join(folder, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def bucket_crops(paths, buckets, output_folder, progress_callback=None, cancel_event=None,
+                 workers=None):
+    """Resize every image in ``paths`` into its nearest bucket.
+
+    Results are saved as PNG under their original names in
+    ``output_folder``, caption sidecars are copied alongside, and the
+    manifest is written.  Returns ``{filename: bucket}`` for the images
+    written.
+    """
+    def work(path):
+        with open_image(path) as img:
+            bucket = nearest_bucket(img.size, buckets)
+            resized = fit_to_bucket(img, bucket)
+        name = os.path.splitext(basename(path))[0] + ".png"
+        resized.save(os.path.join(output_folder, name), "PNG")
+        sidecar = caption_path(path)
+        if os.path.exists(sidecar):
+            shutil.copyfile(sidecar, caption_path(os.path.join(output_folder, name)))
+        return name, bucket
+
+    results = run_parallel(work, paths, workers, progress_callback, cancel_event)
+    assignments = dict(result for result in results if result)
+    write_manifest(output_folder, buckets, assignments)
+    return assignments
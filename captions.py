@@ -0,0 +1,188 @@
+"""Caption sidecars for training datasets.
+
+LoRA trainers read the caption of ``image.png`` from ``image.txt`` next to
+it.  Captions are treated as comma-separated tag lists, the format used by
+most booru-style taggers.
+
+:class:`TagStore` reads every caption of a folder once and keeps an inverted
+index from tag to images.  Tag counts, finding images by tag and bulk
+find/replace therefore never rescan the disk.  Edits only mark captions as
+dirty; :meth:`TagStore.flush` writes them out in one batch, each file
+replaced atomically.
+"""
+
+import os
+from collections import Counter
+
+CAPTION_EXT = ".txt"
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def caption_path(image_path):
+    """Return the sidecar caption path for ``image_path``."""
+    return os.path.splitext(image_path)[0] + CAPTION_EXT
+
+
+def parse_tags(text):
+    """Split a caption into its tags, dropping blanks."""
+    return [tag.strip() for tag in text.split(",") if tag.strip()]
+
+
+def format_tags(tags):
+    return ", ".join(tags)
+
+
+def read_caption(image_path):
+    """Return the caption text of ``image_path``, or ``None`` without a sidecar."""
+    try:
+        with open(caption_path(image_path), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_caption(image_path, text):
+    """Write the caption of ``image_path`` atomically."""
+    path = caption_path(image_path)
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp, path)
+
+
+class TagStore:
+    """In-memory captions of one folder with a tag index."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.captions = {}  # image path -> list of tags
+        self.index = {}  # tag -> set of image paths
+        self.counts = Counter()
+        self.dirty = set()
+        self._load()
+
+    def _load(self):
+        if not self.folder or not os.path.isdir(self.folder):
+            return
+        for name in os.listdir(self.folder):
+            if not name.lower().endswith(IMAGE_EXTS):
+                continue
+            path = os.path.join(self.folder, name)
+            text = read_caption(path)
+            if text is not None:
+                self._index(path, parse_tags(text))
+
+    def _index(self, path, tags):
+        self._unindex(path)
+        self.captions[path] = tags
+        for tag in tags:
+            self.index.setdefault(tag, set()).add(path)
+        self.counts.update(tags)
+
+    def _unindex(self, path):
+        for tag in self.captions.pop(path, ()):
+            paths = self.index.get(tag)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.index[tag]
+            self.counts[tag] -= 1
+            if self.counts[tag] <= 0:
+                del self.counts[tag]
+
+    def __contains__(self, path):
+        return path in self.captions
+
+    def __len__(self):
+        return len(self.captions)
+
+    def get(self, path):
+        """Return the caption text of ``path``, or ``""`` without one."""
+        return format_tags(self.captions.get(path, []))
+
+    def set(self, path, text):
+        """Replace the caption of ``path``; written on the next flush."""
+        tags = parse_tags(text)
+        if self.captions.get(path) == tags and path in self.captions:
+            return
+        self._index(path, tags)
+        self.dirty.add(path)
+
+    def forget(self, path):
+        """Drop ``path`` from the store without touching its sidecar."""
+        self._unindex(path)
+        self.dirty.discard(path)
+
+    def refresh(self, path):
+        """Re-read the sidecar of ``path``, e.g. after it was restored."""
+        text = read_caption(path)
+        if text is None:
+            self.forget(path)
+        else:
+            self._index(path, parse_tags(text))
+            self.dirty.discard(path)
+
+    def carry_over(self, source_path, crop_path):
+        """Give ``crop_path`` the caption of ``source_path``, or an empty one."""
+        text = read_caption(source_path)
+        self._index(crop_path, parse_tags(text or ""))
+        self.dirty.add(crop_path)
+
+    def find(self, tag):
+        """Return the images tagged ``tag``."""
+        return sorted(self.index.get(tag, ()))
+
+    def frequencies(self, limit=None):
+        """Return ``(tag, count)`` pairs, most frequent first."""
+        return self.counts.most_common(limit)
+
+    def replace_tag(self, old, new, paths=None):
+        """Rename tag ``old`` to ``new`` (or remove it if ``new`` is empty).
+
+        Only ``paths`` are changed when given.  Returns the number of
+        captions changed.
+        """
+        targets = set(self.index.get(old, ()))
+        if paths is not None:
+            targets = targets & set(paths)
+        new_tags = parse_tags(new)
+        for path in list(targets):
+            tags = []
+            for tag in self.captions[path]:
+                for replacement in (new_tags if tag == old else [tag]):
+                    if replacement not in tags:
+                        tags.append(replacement)
+            self._index(path, tags)
+            self.dirty.add(path)
+        return len(targets)
+
+    def add_tag(self, tag, paths, first=False):
+        """Add ``tag`` to every image in ``paths``; returns the number changed."""
+        changed = 0
+        for path in paths:
+            tags = list(self.captions.get(path, []))
+            if tag in tags:
+                continue
+            if first:
+                tags.insert(0, tag)
+            else:
+                tags.append(tag)
+            self._index(path, tags)
+            self.dirty.add(path)
+            changed += 1
+        return changed
+
+    def flush(self):
+        """Write every dirty caption; returns the number of files written."""
+        written = 0
+        for path in list(self.dirty):
+            if path in self.captions and os.path.exists(path):
+                try:
+                    write_caption(path, self.get(path))
+                    written += 1
+                except OSError as e:
+                    print(f"Failed to write caption for {path}: {e}")
+                    continue
+            self.dirty.discard(path)
+        return written
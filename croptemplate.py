@@ -0,0 +1,93 @@
+"""Crop templates for applying one framing to a whole folder.
+
+A template records a crop box relative to the (rotated) image it was drawn
+on, together with the output size and rotation.  Applying it to another
+image keeps the relative centre and width of the box; the height follows
+from the output aspect ratio so crops are never stretched, and the box is
+shrunk and shifted as needed to stay inside the image.
+
+Templates are plain dictionaries so they can be stored in the settings
+file::
+
+    {"box": [x1, y1, x2, y2], "size": [width, height], "orientation": 0}
+
+where ``box`` values are fractions of the image width and height.
+"""
+
+from archives import open_image
+from imageops import apply_orientation, box_to_source, oriented_size, read_region
+from jobs import crop_output_path, run_parallel
+
+
+def make_template(box, image_size, crop_size, orientation=0):
+    """Create a template from ``box`` drawn on an image of ``image_size``.
+
+    Both ``box`` and ``image_size`` are in the rotated view's coordinates.
+    """
+    width, height = image_size
+    x1, y1, x2, y2 = box
+    return {
+        "box": [x1 / width, y1 / height, x2 / width, y2 / height],
+        "size": list(crop_size),
+        "orientation": orientation,
+    }
+
+
+def template_box(template, source_size):
+    """Return the template's crop box in the coordinates of an unrotated source."""
+    orientation = template.get("orientation", 0)
+    width, height = oriented_size(source_size, orientation)
+    rx1, ry1, rx2, ry2 = template["box"]
+    out_w, out_h = template["size"]
+    aspect = out_w / out_h
+
+    cx, cy = (rx1 + rx2) / 2 * width, (ry1 + ry2) / 2 * height
+    box_w = (rx2 - rx1) * width
+    box_h = box_w / aspect
+    if box_w > width:
+        box_w, box_h = width, width / aspect
+    if box_h > height:
+        box_w, box_h = height * aspect, height
+    x1 = min(max(0, cx - box_w / 2), width - box_w)
+    y1 = min(max(0, cy - box_h / 2), height - box_h)
+    box = (int(x1), int(y1), int(x1 + box_w), int(y1 + box_h))
+    return box_to_source(box, source_size, orientation)
+
+
+def apply_template(template, path, output_path):
+    """Crop ``path`` with ``template`` and save the result as PNG.
+
+    Returns ``(output_path, box)`` with ``box`` in source coordinates.
+    """
+    with open_image(path) as img:
+        source_size = img.size  # header only, no pixels decoded
+    box = template_box(template, source_size)
+    cropped = apply_orientation(read_region(path, box), template.get("orientation", 0))
+    cropped = cropped.resize(tuple(template["size"]))
+    cropped.save(output_path, "PNG")
+    return output_path, box
+
+
+def apply_template_to_images(template, paths, output_folder, start_counter=1,
+                             progress_callback=None, cancel_event=None, workers=None):
+    """Apply ``template`` to every image in ``paths`` on a thread pool.
+
+    Output files use the ``cropped_{counter}_{name}.png`` naming, numbered
+    from ``start_counter`` in the order of ``paths``.
+
+    Returns
+    -------
+    list
+        ``(output_path, box)`` for each input, or ``None`` where cropping
+        failed or was cancelled.
+    """
+    jobs = [
+        (path, crop_output_path(output_folder, counter, path))
+        for counter, path in enumerate(paths, start_counter)
+    ]
+
+    def work(job):
+        source, output = job
+        return apply_template(template, source, output)
+
+    return run_parallel(work, jobs, workers, progress_callback, cancel_event)
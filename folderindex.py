@@ -0,0 +1,138 @@
+"""Cached listings of image folders.
+
+Listing a large folder, especially on a network drive, can take longer
+than building the whole window.  :class:`FolderIndex` stores the image
+names of each folder in a small JSON file under the application's cache
+directory, together with the folder's modification time.  Adding, removing
+or renaming a file updates that time, so a listing is served from the cache
+exactly as long as the folder's entries are unchanged.
+
+The index is kept outside the folder itself: writing it there would change
+the very modification time it is keyed on.
+
+:meth:`FolderIndex.headers` adds the dimensions, mode, format, file size and
+modification time of each image, read from the file headers in parallel
+without decoding any pixels.  Headers are cached in the same entry and only
+re-read for files whose size or modification time changed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import archives
+from jobs import run_parallel
+
+INDEX_DIR = "folder_index"
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Order of the values cached for each header
+HEADER_FIELDS = ("width", "height", "mode", "format", "size", "mtime_ns")
+
+
+def read_header(path):
+    """Return the header fields of ``path``; Pillow reads no pixel data here."""
+    st = archives.stat(path)
+    with archives.open_image(path) as img:
+        return {
+            "width": img.width,
+            "height": img.height,
+            "mode": img.mode,
+            "format": img.format,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+
+
+class FolderIndex:
+    """Image listings of folders cached in ``cache_dir``."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()  # Listings and header scans share index files
+
+    def _index_path(self, folder):
+        key = os.path.normcase(os.path.abspath(folder))
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, folder):
+        """Return the cached entry of ``folder``, or ``None``."""
+        try:
+            with open(self._index_path(folder), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("folder") == os.path.abspath(folder) else None
+
+    def save(self, folder, entry):
+        path = self._index_path(folder)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = path + ".tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"Failed to save folder index for {folder}: {e}")
+
+    def list_images(self, folder):
+        """Return the paths of the images in ``folder``, using the cache if current."""
+        with self._lock:
+            mtime_ns = os.stat(folder).st_mtime_ns
+            entry = self.load(folder)
+            if entry is None or entry.get("mtime_ns") != mtime_ns:
+                names = [
+                    e.name for e in os.scandir(folder)
+                    if e.name.lower().endswith(IMAGE_EXTS) and e.is_file()
+                ]
+                # Headers of files that are still there stay cached
+                headers = (entry or {}).get("headers", {})
+                entry = {
+                    "folder": os.path.abspath(folder),
+                    "mtime_ns": mtime_ns,
+                    "files": names,
+                    "headers": {name: headers[name] for name in names if name in headers},
+                }
+                self.save(folder, entry)
+        return [os.path.join(folder, name) for name in entry["files"]]
+
+    def headers(self, paths, progress_callback=None, cancel_event=None, workers=None):
+        """Return ``{path: header}`` for ``paths``, reading only uncached headers.
+
+        Files that cannot be read are left out.
+        """
+        by_folder = {}
+        for path in paths:
+            by_folder.setdefault(os.path.dirname(path), []).append(path)
+        result = {}
+        for folder, folder_paths in by_folder.items():
+            with self._lock:
+                entry = self.load(folder) or {"folder": os.path.abspath(folder), "mtime_ns": None, "files": []}
+            cached = entry.get("headers", {})
+            todo = []
+            for path in folder_paths:
+                try:
+                    st = archives.stat(path)
+                except OSError:
+                    continue
+                row = cached.get(os.path.basename(path))
+                if row and row[4] == st.st_size and row[5] == st.st_mtime_ns:
+                    result[path] = dict(zip(HEADER_FIELDS, row))
+                else:
+                    todo.append(path)
+            if not todo:
+                continue
+            read = run_parallel(read_header, todo, workers, progress_callback, cancel_event)
+            fresh = {}
+            for path, header in zip(todo, read):
+                if header:
+                    result[path] = header
+                    fresh[os.path.basename(path)] = [header[field] for field in HEADER_FIELDS]
+            with self._lock:
+                # Reload in case the listing changed while headers were read
+                entry = self.load(folder) or entry
+                entry.setdefault("headers", {}).update(fresh)
+                self.save(folder, entry)
+        return result
@@ -0,0 +1,162 @@
+"""Ordered image list with fast lookup and delete.
+
+:class:`ImageIndex` replaces plain lists of paths.  Every path gets an
+integer id on insertion:
+
+* a dict maps path to id, so membership tests are O(1);
+* a ``bytearray`` marks which ids are still alive, so deletes are O(1)
+  plus an O(log n) tree update;
+* a Fenwick tree over the alive flags turns positions into ids and back in
+  O(log n).
+
+Galleries can therefore fetch the n-th item, find an item's position and
+delete it without scanning the list, even with millions of files.  Deleted
+slots are reclaimed by rebuilding once they outnumber the live ones.
+"""
+
+from array import array
+
+
+class ImageIndex:
+    """List-like sequence of unique paths.
+
+    With ``newest_first`` the most recently added path is at position 0,
+    which suits the crops pane.
+    """
+
+    def __init__(self, paths=(), newest_first=False):
+        self.newest_first = newest_first
+        self._build(list(dict.fromkeys(paths)))
+
+    def _build(self, paths):
+        self._paths = paths
+        self._ids = {path: i for i, path in enumerate(paths)}
+        self._alive = bytearray(b"\x01") * len(paths)
+        self._count = len(paths)
+        self._capacity = 1
+        while self._capacity < max(1, len(paths)):
+            self._capacity *= 2
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        # O(n) Fenwick construction from the alive flags
+        tree = array("l", [0]) * (self._capacity + 1)
+        tree[1:len(self._alive) + 1] = array("l", list(self._alive))
+        for i in range(1, self._capacity + 1):
+            parent = i + (i & -i)
+            if parent <= self._capacity:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update(self, i, delta):
+        i += 1
+        while i <= self._capacity:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        """Return the number of alive ids below ``i``."""
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _select(self, k):
+        """Return the id of the ``k``-th alive entry in insertion order."""
+        pos = 0
+        step = self._capacity
+        while step:
+            nxt = pos + step
+            if nxt <= self._capacity and self._tree[nxt] <= k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step //= 2
+        return pos
+
+    def _order(self, rank):
+        return self._count - 1 - rank if self.newest_first else rank
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, path):
+        return path in self._ids
+
+    def __iter__(self):
+        ids = range(len(self._paths) - 1, -1, -1) if self.newest_first else range(len(self._paths))
+        for i in ids:
+            if self._alive[i]:
+                yield self._paths[i]
+
+    def __getitem__(self, rank):
+        if rank < 0:
+            rank += self._count
+        if not 0 <= rank < self._count:
+            raise IndexError("image index out of range")
+        return self._paths[self._select(self._order(rank))]
+
+    def index(self, path):
+        """Return the position of ``path``."""
+        i = self._ids.get(path)
+        if i is None:
+            raise ValueError(f"{path!r} is not in the index")
+        return self._order(self._prefix(i))
+
+    def add(self, path):
+        """Add ``path`` at the end (or the front with ``newest_first``).
+
+        Returns ``False`` if it was already present.
+        """
+        if path in self._ids:
+            return False
+        i = len(self._paths)
+        self._paths.append(path)
+        self._ids[path] = i
+        self._alive.append(1)
+        self._count += 1
+        if i < self._capacity:
+            self._update(i, 1)
+        else:
+            # Double the tree; amortised O(1) per add
+            self._capacity *= 2
+            self._rebuild_tree()
+        return True
+
+    def extend(self, paths):
+        for path in paths:
+            self.add(path)
+
+    def remove(self, path):
+        """Remove ``path``; raises ``ValueError`` if absent."""
+        if not self.discard(path):
+            raise ValueError(f"{path!r} is not in the index")
+
+    def discard(self, path):
+        """Remove ``path`` if present and return whether it was."""
+        i = self._ids.pop(path, None)
+        if i is None:
+            return False
+        self._alive[i] = 0
+        self._count -= 1
+        self._update(i, -1)
+        if len(self._paths) > 1024 and len(self._paths) > 2 * self._count:
+            self._build(list(self._iter_insertion()))
+        return True
+
+    def _iter_insertion(self):
+        for i, path in enumerate(self._paths):
+            if self._alive[i]:
+                yield path
+
+    def pop(self, rank=-1):
+        """Remove and return the path at ``rank``."""
+        path = self[rank]
+        self.discard(path)
+        return path
+
+    def clear(self):
+        self._build([])
+
+    def __repr__(self):
+        return f"ImageIndex({len(self)} paths)"
@@ -0,0 +1,295 @@
+"""Image geometry helpers shared by the canvas, preview and crop paths.
+
+Orientation
+-----------
+Rotations made with the A/D keys are kept as a lazy ``orientation`` (0, 90,
+180 or 270 degrees counter-clockwise) instead of resampling the source
+bitmap.  Boxes drawn on the oriented image are mapped back to source
+coordinates with :func:`box_to_source`, the region is cut from the untouched
+source and only that region is transposed.  Transposes are exact, so the
+result matches rotating the whole image first.
+
+Pyramid
+-------
+:func:`pyramid_factor` picks the largest power-of-two reduction of an image
+that is still at least as large as a requested size.  Displaying and
+previewing from that reduced level avoids resampling the full-resolution
+source for every redraw.
+
+Region decode
+-------------
+Formats that store pixels as independent tiles or strips (TIFF, for
+example) or as uncompressed rows can be read piecemeal.
+:func:`decode_region` decodes each tile overlapping a box into an image of
+the tile's size, and reads only the rows under the box from uncompressed
+data, so cropping from a huge source needs memory proportional to the crop
+rather than the whole image.  :func:`read_region` falls back to a full
+decode for formats stored as a single compressed stream.
+"""
+
+import math
+import threading
+
+from PIL import Image
+
+from archives import is_member, open_image
+
+# For Pillow >= 9.1
+try:
+    Transpose = Image.Transpose
+except AttributeError:
+    Transpose = Image
+
+# Counter-clockwise rotation in degrees -> lossless transpose
+ROTATIONS = {
+    90: Transpose.ROTATE_90,
+    180: Transpose.ROTATE_180,
+    270: Transpose.ROTATE_270,
+}
+
+
+def oriented_size(size, orientation):
+    """Return ``size`` as seen after rotating by ``orientation`` degrees."""
+    width, height = size
+    if orientation in (90, 270):
+        return height, width
+    return width, height
+
+
+def apply_orientation(image, orientation):
+    """Rotate ``image`` counter-clockwise by a multiple of 90 degrees."""
+    if not orientation:
+        return image
+    return image.transpose(ROTATIONS[orientation])
+
+
+def box_to_source(box, size, orientation):
+    """Map ``box`` on the oriented image back to source image coordinates.
+
+    ``size`` is the (width, height) of the unrotated source.
+    """
+    x1, y1, x2, y2 = box
+    width, height = size
+    if orientation == 90:
+        return (width - y2, x1, width - y1, x2)
+    if orientation == 180:
+        return (width - x2, height - y2, width - x1, height - y1)
+    if orientation == 270:
+        return (y1, height - x2, y2, height - x1)
+    return (x1, y1, x2, y2)
+
+
+# Sources above this many pixels are opened as a reduced working copy when
+# their format allows region decoding.  This stays below Pillow's
+# decompression bomb limit (``Image.MAX_IMAGE_PIXELS``), above which opening
+# an image warns, and at twice the limit raises DecompressionBombError.
+# Region-decodable sources never need the full bitmap, so they are opened
+# without that check; every other source still goes through it.
+LARGE_IMAGE_PIXELS = 64_000_000
+
+# Guards the temporary lifting of Image.MAX_IMAGE_PIXELS
+_bomb_limit_lock = threading.Lock()
+
+# Long side of the reduced working copy of a large source
+REDUCED_MAX_SIDE = 4096
+
+
+def pyramid_factor(size, target):
+    """Return the largest power-of-two reduction keeping ``size`` >= ``target``."""
+    factor = 1
+    while size[0] // (factor * 2) >= target[0] and size[1] // (factor * 2) >= target[1]:
+        factor *= 2
+    return factor
+
+
+def reduce_image(image, factor):
+    """Shrink ``image`` by an integer ``factor`` using a box filter."""
+    if factor == 1:
+        return image
+    if image.mode in ("1", "P"):
+        # reduce() has no palette or bilevel support
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    return image.reduce(factor)
+
+
+def _tile_parts(tile):
+    codec, extents, offset, args = tuple(tile)[:4]
+    return codec, extents, offset, args
+
+
+def _row_stride(mode, tile):
+    """Return the bytes per row of an uncompressed, top-down ``tile``, or ``None``.
+
+    Rows of such a tile can be read individually by seeking to them.
+    """
+    codec, (x1, _, x2, _), _, args = _tile_parts(tile)
+    if codec != "raw":
+        return None
+    rawmode, stride, orientation = ((args if isinstance(args, tuple) else (args,)) + (0, 1))[:3]
+    if orientation != 1:
+        return None
+    if stride:
+        return stride
+    try:
+        return len(Image.new(mode, (x2 - x1, 1)).tobytes("raw", rawmode))
+    except ValueError:
+        # No packer for this raw mode
+        return None
+
+
+def supports_region_decode(image):
+    """Return True if ``image`` (opened, not loaded) can be decoded piecewise.
+
+    That is the case for several independent tiles or strips, and for a
+    single uncompressed block of rows.
+    """
+    tiles = getattr(image, "tile", None) or []
+    # libtiff decodes the whole image in one call regardless of the tile list
+    if not tiles or any(_tile_parts(tile)[0] == "libtiff" for tile in tiles):
+        return False
+    return len(tiles) > 1 or _row_stride(image.mode, tiles[0]) is not None
+
+
+def _open_unchecked(path):
+    """Open ``path`` without Pillow's decompression bomb check.
+
+    Only the header is read; callers decide whether the image is safe to
+    decode.
+    """
+    with _bomb_limit_lock:
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            return Image.open(path)
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+
+def _decode_tile(fp, mode, codec, size, offset, args, config=()):
+    """Decode ``size`` pixels starting at ``offset`` into an image of that size."""
+    decoder = Image._getdecoder(mode, codec, args, config)
+    part = Image.new(mode, size)
+    decoder.setimage(part.im, (0, 0) + size)
+    fp.seek(offset)
+    buffer = b""
+    try:
+        while True:
+            data = fp.read(65536)
+            buffer += data
+            consumed, err = decoder.decode(buffer)
+            if consumed < 0:
+                break
+            if not data:
+                raise OSError("image file is truncated")
+            buffer = buffer[consumed:]
+    finally:
+        decoder.cleanup()
+    if err < 0:
+        raise OSError(f"decoder error {err}")
+    return part
+
+
+def decode_region(path, box):
+    """Decode only the tiles (or rows) of ``path`` overlapping ``box``.
+
+    Each tile is decoded into an image of its own size, so memory stays
+    proportional to the region.  Returns ``None`` when the format does not
+    allow piecewise decoding; archive members are always decoded whole.
+    """
+    if is_member(path):
+        return None
+    with _open_unchecked(path) as img:
+        if not supports_region_decode(img):
+            return None
+        mode = img.mode
+        width, height = img.size
+        x1, y1, x2, y2 = (int(round(v)) for v in box)
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(width, x2), min(height, y2)
+        region = Image.new(mode, (max(1, x2 - x1), max(1, y2 - y1)))
+        if mode == "P" and img.palette:
+            region.putpalette(img.palette)
+        config = getattr(img, "decoderconfig", ())
+        for tile in list(img.tile):
+            codec, (tx1, ty1, tx2, ty2), offset, args = _tile_parts(tile)
+            if tx2 <= x1 or tx1 >= x2 or ty2 <= y1 or ty1 >= y2:
+                continue
+            stride = _row_stride(mode, tile)
+            if stride is not None:
+                # Uncompressed rows: read only the rows under the box
+                top, bottom = max(ty1, y1), min(ty2, y2)
+                part = _decode_tile(img.fp, mode, codec, (tx2 - tx1, bottom - top), offset + (top - ty1) * stride, args, config)
+                region.paste(part, (tx1 - x1, top - y1))
+            else:
+                part = _decode_tile(img.fp, mode, codec, (tx2 - tx1, ty2 - ty1), offset, args, config)
+                region.paste(part, (tx1 - x1, ty1 - y1))
+    return region
+
+
+def read_region(path, box, cached=None):
+    """Return the pixels of ``box`` from the source at ``path``.
+
+    ``cached`` is an already decoded copy of the source; when given it is
+    cropped directly.  Otherwise only the overlapping tiles are decoded if
+    the format allows it, falling back to a full decode.
+    """
+    if cached is not None:
+        return cached.crop(box)
+    region = decode_region(path, box)
+    if region is not None:
+        return region
+    with open_image(path) as img:
+        return img.crop(box)
+
+
+def decode_reduced(path, factor):
+    """Decode ``path`` reduced by ``factor`` one band of rows at a time.
+
+    Peak memory is one band of full-resolution rows plus the reduced result.
+    Returns ``None`` when the format does not allow piecewise decoding.
+    """
+    with _open_unchecked(path) as probe:
+        if not supports_region_decode(probe):
+            return None
+        width, height = probe.size
+        tiles = [_tile_parts(tile)[1] for tile in probe.tile]
+    band = factor * 16
+    if len(tiles) > 1:
+        # Bands cover whole rows of tiles, so no tile is decoded twice
+        step = math.lcm(min(y2 - y1 for _, y1, _, y2 in tiles), factor)
+        band = step * -(-band // step)
+    reduced = None
+    for top in range(0, height, band):
+        rows = decode_region(path, (0, top, width, min(height, top + band)))
+        rows = reduce_image(rows, factor)
+        if reduced is None:
+            reduced = Image.new(rows.mode, (rows.width, -(-height // factor)))
+        reduced.paste(rows, (0, top // factor))
+    return reduced
+
+
+def open_working_image(path):
+    """Open ``path`` for cropping.
+
+    Returns ``(image, source_size)``.  Normally ``image`` is the full decode.
+    Very large sources in a region-decodable format are returned as a
+    reduced copy instead, whatever their size; crops are then read from the
+    file with :func:`read_region`.  Other sources raise
+    ``DecompressionBombError`` above Pillow's limit, as usual.
+    """
+    with (open_image(path) if is_member(path) else _open_unchecked(path)) as img:
+        size = img.size
+        reducible = size[0] * size[1] > LARGE_IMAGE_PIXELS and supports_region_decode(img) and not is_member(path)
+        if not reducible:
+            Image._decompression_bomb_check(size)
+            img.load()
+            return img, size
+    factor = 1
+    while max(size) // factor > REDUCED_MAX_SIDE:
+        factor *= 2
+    reduced = decode_reduced(path, factor)
+    if reduced is None:
+        with Image.open(path) as img:
+            img.load()
+        return img, size
+    return reduced, size
@@ -0,0 +1,138 @@
+"""Memory-bounded storage for decoded images and Tk thumbnails.
+
+Every decoded image the application keeps around (the working image, its
+display copy, gallery thumbnails) is registered in an :class:`ImageStore`
+together with an estimate of the bytes it holds.  Entries are kept in
+least-recently-used order and evicted once the total exceeds the configured
+budget.  Pinned entries, such as the image currently being cropped, count
+towards the total but are never evicted; they are released explicitly when
+they are replaced.
+
+File handles are never left open by the store: :func:`load_image_file`
+decodes an image fully and closes its file before returning it.
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from archives import open_image
+
+MB = 1024 * 1024
+
+
+def image_nbytes(obj):
+    """Return an estimate of the memory held by a PIL image or PhotoImage."""
+    if isinstance(obj, Image.Image):
+        if obj.mode in ("1", "L", "P"):
+            pixel = 1
+        elif obj.mode.startswith("I;16"):
+            pixel = 2
+        else:
+            # Pillow stores RGB and most multi-band modes as 4 bytes per pixel
+            pixel = 4
+        return obj.width * obj.height * pixel
+    try:
+        # Tk keeps PhotoImage pixels as 32-bit RGBA
+        return obj.width() * obj.height() * 4
+    except Exception:
+        return 0
+
+
+def load_image_file(path):
+    """Decode the image at ``path`` and close its file handle."""
+    with open_image(path) as img:
+        img.load()
+    return img
+
+
+class ImageStore:
+    """LRU cache of images bounded by an approximate byte budget."""
+
+    def __init__(self, budget_mb=1024):
+        self.budget_bytes = int(budget_mb * MB)
+        self._entries = OrderedDict()  # key -> (obj, nbytes)
+        self._pinned = set()
+        self._used = 0
+        self._lock = threading.RLock()
+
+    @property
+    def used_bytes(self):
+        return self._used
+
+    def set_budget(self, budget_mb):
+        with self._lock:
+            self.budget_bytes = int(budget_mb * MB)
+            self._evict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader=None):
+        """Return the entry for ``key``, creating it with ``loader`` if missing.
+
+        ``loader`` is called outside the lock so a slow decode does not block
+        other threads.  If it returns ``None`` nothing is stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        if loader is None:
+            return None
+        obj = loader()
+        if obj is not None:
+            self.put(key, obj)
+        return obj
+
+    def put(self, key, obj, nbytes=None, pinned=False):
+        """Store ``obj`` under ``key`` and evict older entries if over budget."""
+        if nbytes is None:
+            nbytes = image_nbytes(obj)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (obj, nbytes)
+            self._used += nbytes
+            if pinned:
+                self._pinned.add(key)
+            self._evict()
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def discard_where(self, predicate):
+        """Remove every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self._used = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._used -= entry[1]
+        self._pinned.discard(key)
+
+    def _evict(self):
+        # The newest entry is always kept so a lookup can't evict its own result
+        if self._used <= self.budget_bytes or not self._entries:
+            return
+        newest = next(reversed(self._entries))
+        while self._used > self.budget_bytes:
+            for key in self._entries:
+                if key not in self._pinned and key != newest:
+                    break
+            else:
+                return
+            self._remove(key)
@@ -0,0 +1,72 @@
+"""Helpers for running batch work on a pool of background threads.
+
+Decoding, resizing and PNG encoding in Pillow and OpenCV release the GIL, so
+a thread pool keeps several cores busy without the cost of moving pixels
+between processes.  Jobs report progress through a callback and stop early
+when their ``cancel_event`` is set.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from archives import basename
+
+
+def default_workers():
+    """Return a worker count that leaves one core free for the UI."""
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+def crop_output_path(output_folder, counter, source_path):
+    """Return the ``cropped_{counter}_{name}.png`` path for a crop of ``source_path``."""
+    name = os.path.splitext(basename(source_path))[0]
+    return os.path.join(output_folder, f"cropped_{counter}_{name}.png")
+
+
+def run_parallel(func, items, workers=None, progress_callback=None, cancel_event=None):
+    """Call ``func(item)`` for every item on a thread pool.
+
+    Parameters
+    ----------
+    func : callable
+        Function applied to each item.
+    items : sequence
+        Work items.
+    workers : int, optional
+        Pool size.  Defaults to :func:`default_workers`.
+    progress_callback : callable, optional
+        Called with the number of finished items and the total after each
+        item completes.  It runs on a worker thread.
+    cancel_event : threading.Event, optional
+        When set, items that have not started yet are skipped.
+
+    Returns
+    -------
+    list
+        Results in the order of ``items``.  Items that failed or were
+        skipped because of cancellation have ``None``.
+    """
+    items = list(items)
+    total = len(items)
+    results = [None] * total
+    cancel_event = cancel_event or threading.Event()
+
+    def run(item):
+        if cancel_event.is_set():
+            return None
+        return func(item)
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        futures = {pool.submit(run, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as exc:
+                print(f"Failed to process {items[index]}: {exc}")
+            done += 1
+            if progress_callback:
+                progress_callback(done, total)
+    return results
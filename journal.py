@@ -0,0 +1,161 @@
+"""Append-only journal of crop operations.
+
+Every crop made in an output folder is recorded in
+``.pixelpruner_journal.jsonl`` inside that folder, one JSON object per line:
+
+``{"op": "crop", "id": 12, "source": ..., "box": [x1, y1, x2, y2], "orientation": 90, "size": [512, 512], "output": ...}``
+    A crop of ``box`` (unrotated source coordinates) rotated by
+    ``orientation`` degrees and resized to ``size``.  ``id`` is the crop
+    counter used in the output filename.
+``{"op": "undo", "id": 12}`` / ``{"op": "redo", "id": 12}``
+    The most recent crop was undone or redone.
+``{"op": "delete", "id": 12}``
+    A crop was deleted from the crops pane.
+
+Entries are only ever appended and each line is flushed to disk, so a crash
+loses at most the operation in progress.  Reading the journal back replays
+the operations to rebuild the undo and redo stacks, the set of live crops
+and the highest crop counter used, which keeps new filenames from
+colliding with earlier sessions.
+"""
+
+import json
+import os
+
+from imageops import apply_orientation, read_region
+from jobs import run_parallel
+
+JOURNAL_NAME = ".pixelpruner_journal.jsonl"
+
+
+class CropJournal:
+    """Crop history for one output folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, JOURNAL_NAME)
+        self.records = {}  # id -> crop record
+        self.live = {}  # ids of crops that currently exist, oldest first
+        self.redo_stack = []
+        self.by_output = {}  # output path -> id
+        self.max_counter = 0
+        self._torn_tail = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        line = ""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+                self._apply(entry)
+            self._torn_tail = bool(line) and not line.endswith("\n")
+
+    def _append(self, entry):
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._torn_tail:
+                # Start a fresh line after a torn write
+                f.write("\n")
+                self._torn_tail = False
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(entry)
+
+    def _apply(self, entry):
+        op = entry.get("op")
+        crop_id = entry.get("id")
+        if op == "crop":
+            self.records[crop_id] = entry
+            self.live[crop_id] = None
+            self.by_output[entry["output"]] = crop_id
+            self.redo_stack.clear()
+            self.max_counter = max(self.max_counter, crop_id)
+        elif op == "undo":
+            self.live.pop(crop_id, None)
+            self.redo_stack.append(crop_id)
+        elif op == "redo":
+            if self.redo_stack and self.redo_stack[-1] == crop_id:
+                self.redo_stack.pop()
+            self.live[crop_id] = None
+        elif op == "delete":
+            self.live.pop(crop_id, None)
+            if crop_id in self.redo_stack:
+                self.redo_stack.remove(crop_id)
+
+    def record_crop(self, crop_id, source, box, orientation, size, output):
+        """Append a crop and return its record."""
+        self._append({
+            "op": "crop",
+            "id": crop_id,
+            "source": source,
+            "box": [float(v) for v in box],
+            "orientation": orientation,
+            "size": list(size),
+            "output": output,
+        })
+        return self.records[crop_id]
+
+    def newest_live(self):
+        """Return the record of the newest crop that still exists, or ``None``."""
+        if not self.live:
+            return None
+        return self.records[next(reversed(self.live))]
+
+    def undo(self):
+        """Mark the newest live crop as undone and return its record."""
+        record = self.newest_live()
+        if record is None:
+            return None
+        self._append({"op": "undo", "id": record["id"]})
+        return record
+
+    def redo(self):
+        """Restore the most recently undone crop and return its record."""
+        if not self.redo_stack:
+            return None
+        crop_id = self.redo_stack[-1]
+        self._append({"op": "redo", "id": crop_id})
+        return self.records[crop_id]
+
+    def discard(self, output):
+        """Record that the crop written to ``output`` was deleted."""
+        crop_id = self.by_output.get(output)
+        if crop_id is not None and crop_id in self.live:
+            self._append({"op": "delete", "id": crop_id})
+
+    def live_crops(self):
+        """Return the records of crops that currently exist, oldest first."""
+        return [self.records[crop_id] for crop_id in self.live]
+
+
+def render_crop(record, size=None):
+    """Regenerate the crop described by ``record`` from its source.
+
+    ``size`` overrides the recorded output size.
+    """
+    cropped = read_region(record["source"], tuple(record["box"]))
+    cropped = apply_orientation(cropped, record.get("orientation", 0))
+    return cropped.resize(tuple(size or record["size"]))
+
+
+def replay_session(records, output_folder, scale=1.0, progress_callback=None,
+                   cancel_event=None, workers=None):
+    """Regenerate ``records`` into ``output_folder`` at ``scale`` times their size.
+
+    Output files keep their original names.  Returns the written paths, with
+    ``None`` for crops whose source is missing or that were cancelled.
+    """
+    def work(record):
+        width, height = record["size"]
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        output = os.path.join(output_folder, os.path.basename(record["output"]))
+        render_crop(record, size).save(output, "PNG")
+        return output
+
+    return run_parallel(work, records, workers, progress_callback, cancel_event)
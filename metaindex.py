@@ -0,0 +1,382 @@
+"""Searchable index of AI-generation metadata.
+
+Many sources are renders that carry their generation settings:
+
+* AUTOMATIC1111 and Forge write a ``parameters`` text chunk (or an EXIF
+  user comment in JPEG and WebP) holding the prompt, the negative prompt
+  and a ``Steps: ..., Sampler: ..., Seed: ...`` line.
+* ComfyUI writes its node graph as JSON in a ``prompt`` text chunk.
+
+:func:`read_metadata` reads only the text chunks of a PNG, stopping at the
+first pixel data chunk, so indexing never decodes an image.  Other formats
+are opened with Pillow, which reads the header without the pixels.
+
+:class:`MetadataIndex` keeps the parsed fields in a SQLite database next to
+the folder index, with an FTS5 full-text table over the prompts.  Entries
+are keyed on path, size and modification time, so :meth:`~MetadataIndex.update`
+only re-reads files that changed.  :meth:`~MetadataIndex.search` answers
+prompt, seed, model and sampler queries from the database alone.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+
+import archives
+from jobs import run_parallel
+
+DB_NAME = "metadata.sqlite"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+FIELDS = ("prompt", "negative", "seed", "model", "sampler", "steps", "cfg", "generator")
+
+# Fields that can be searched with ``field:value`` in a query
+QUERY_FIELDS = ("seed", "model", "sampler")
+
+# "Steps: 20, Sampler: Euler a, Seed: 1" pairs; values may be quoted
+_SETTING_RE = re.compile(r'\s*(\w[\w \-/]+):\s*("(?:\\.|[^\\"])+"|[^,]*)(?:,|$)')
+
+# Files read per batch before the results are written
+UPDATE_BATCH = 500
+
+
+def read_png_text(path):
+    """Return the text chunks of a PNG as ``{keyword: text}``, or ``None``."""
+    chunks = {}
+    with archives.open_file(path) as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, kind = struct.unpack(">I4s", header)
+            if kind in (b"IDAT", b"IEND"):
+                break
+            if kind not in (b"tEXt", b"zTXt", b"iTXt"):
+                f.seek(length + 4, os.SEEK_CUR)
+                continue
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)  # CRC
+            keyword, _, rest = data.partition(b"\0")
+            try:
+                if kind == b"tEXt":
+                    text = rest.decode("latin-1")
+                elif kind == b"zTXt":
+                    text = zlib.decompress(rest[1:]).decode("latin-1")
+                else:
+                    compressed, rest = rest[0], rest[2:]
+                    _, _, rest = rest.partition(b"\0")  # language tag
+                    _, _, rest = rest.partition(b"\0")  # translated keyword
+                    text = (zlib.decompress(rest) if compressed else rest).decode("utf-8")
+            except (zlib.error, UnicodeDecodeError, IndexError):
+                continue
+            chunks[keyword.decode("latin-1")] = text
+    return chunks
+
+
+def _decode_user_comment(value):
+    if isinstance(value, str):
+        return value
+    prefix, payload = value[:8], value[8:]
+    if prefix == b"UNICODE\0":
+        return payload.decode("utf-16-be", errors="ignore")
+    if prefix in (b"ASCII\0\0\0", b"\0" * 8):
+        return payload.decode("latin-1")
+    return value.decode("utf-8", errors="ignore")
+
+
+def read_text(path):
+    """Return the text metadata of any supported image as ``{keyword: text}``."""
+    if path.lower().endswith(".png"):
+        chunks = read_png_text(path)
+        if chunks is not None:
+            return chunks
+    with archives.open_image(path) as img:
+        chunks = {key: value for key, value in img.info.items() if isinstance(value, str)}
+        comment = img.getexif().get_ifd(0x8769).get(0x9286)  # Exif UserComment
+    if comment and "parameters" not in chunks:
+        chunks["parameters"] = _decode_user_comment(comment).strip("\0")
+    return chunks
+
+
+def _number(value, kind):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_parameters(text):
+    """Parse an AUTOMATIC1111 ``parameters`` block."""
+    lines = text.strip().split("\n")
+    settings = {}
+    if lines and lines[-1].lstrip().startswith("Steps:"):
+        for key, value in _SETTING_RE.findall(lines.pop()):
+            settings[key.strip()] = value.strip().strip('"')
+    prompt, negative = [], []
+    target = prompt
+    for line in lines:
+        if line.startswith("Negative prompt:"):
+            target = negative
+            line = line[len("Negative prompt:"):]
+        target.append(line)
+    return {
+        "generator": "a1111",
+        "prompt": "\n".join(prompt).strip(),
+        "negative": "\n".join(negative).strip(),
+        "seed": settings.get("Seed"),
+        "model": settings.get("Model") or settings.get("Model hash"),
+        "sampler": settings.get("Sampler"),
+        "steps": _number(settings.get("Steps"), int),
+        "cfg": _number(settings.get("CFG scale"), float),
+    }
+
+
+def _linked_text(nodes, link, depth=0):
+    """Collect the prompt text feeding a ComfyUI input ``link``."""
+    if not isinstance(link, list) or not link or depth > 8:
+        return []
+    node = nodes.get(str(link[0]))
+    if not isinstance(node, dict):
+        return []
+    texts = []
+    for name, value in node.get("inputs", {}).items():
+        if name.startswith("text") and isinstance(value, str):
+            texts.append(value)
+        elif isinstance(value, list):
+            texts += _linked_text(nodes, value, depth + 1)
+    return texts
+
+
+def parse_comfyui(text):
+    """Parse the node graph of a ComfyUI ``prompt`` chunk."""
+    nodes = json.loads(text)
+    if not isinstance(nodes, dict):
+        return None
+    sampler = model = None
+    for node in nodes.values():
+        if not isinstance(node, dict):
+            continue
+        kind = node.get("class_type", "")
+        if sampler is None and "Sampler" in kind and "positive" in node.get("inputs", {}):
+            sampler = node["inputs"]
+        elif model is None and ("CheckpointLoader" in kind or kind == "UNETLoader"):
+            inputs = node.get("inputs", {})
+            model = inputs.get("ckpt_name") or inputs.get("unet_name")
+    if sampler is None:
+        prompts = [
+            node["inputs"]["text"] for node in nodes.values()
+            if isinstance(node, dict) and isinstance(node.get("inputs", {}).get("text"), str)
+        ]
+        return {"generator": "comfyui", "prompt": "\n".join(prompts), "model": model}
+    seed = sampler.get("seed", sampler.get("noise_seed"))
+    return {
+        "generator": "comfyui",
+        "prompt": "\n".join(_linked_text(nodes, sampler.get("positive"))),
+        "negative": "\n".join(_linked_text(nodes, sampler.get("negative"))),
+        "seed": None if isinstance(seed, list) else seed,
+        "model": model,
+        "sampler": sampler.get("sampler_name") if isinstance(sampler.get("sampler_name"), str) else None,
+        "steps": _number(sampler.get("steps"), int),
+        "cfg": _number(sampler.get("cfg"), float),
+    }
+
+
+def read_metadata(path):
+    """Return the generation metadata of ``path``, or ``None`` if it has none."""
+    chunks = read_text(path)
+    try:
+        if chunks.get("parameters"):
+            return parse_parameters(chunks["parameters"])
+        if chunks.get("prompt"):
+            return parse_comfyui(chunks["prompt"])
+    except ValueError:
+        return None
+    return None
+
+
+def parse_query(query):
+    """Split ``"seed:42 model:sdxl red dress"`` into text and field filters."""
+    fields = {}
+    words = []
+    for word in query.split():
+        key, sep, value = word.partition(":")
+        if sep and key.lower() in QUERY_FIELDS and value:
+            fields[key.lower()] = value
+        else:
+            words.append(word)
+    return " ".join(words), fields
+
+
+def _fts_query(text):
+    # Quote every word so punctuation in prompts is never FTS syntax;
+    # a trailing * keeps its prefix meaning
+    terms = []
+    for word in re.findall(r"[^\s,()]+", text):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', "")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return "prompt : (" + " ".join(terms) + ")" if terms else None
+
+
+class MetadataIndex:
+    """Generation metadata of scanned images in a SQLite database."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS images (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                folder TEXT NOT NULL,
+                size INTEGER,
+                mtime_ns INTEGER,
+                generator TEXT,
+                prompt TEXT,
+                negative TEXT,
+                seed TEXT,
+                model TEXT,
+                sampler TEXT,
+                steps INTEGER,
+                cfg REAL
+            );
+            CREATE INDEX IF NOT EXISTS images_folder ON images(folder);
+            CREATE INDEX IF NOT EXISTS images_seed ON images(seed);
+            """
+        )
+        try:
+            self._conn.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS prompts
+                    USING fts5(prompt, negative, content='images', content_rowid='id');
+                CREATE TRIGGER IF NOT EXISTS images_ai AFTER INSERT ON images BEGIN
+                    INSERT INTO prompts(rowid, prompt, negative) VALUES (new.id, new.prompt, new.negative);
+                END;
+                CREATE TRIGGER IF NOT EXISTS images_ad AFTER DELETE ON images BEGIN
+                    INSERT INTO prompts(prompts, rowid, prompt, negative) VALUES ('delete', old.id, old.prompt, old.negative);
+                END;
+                """
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; prompt searches fall back to LIKE
+            self.fts = False
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _stale(self, paths):
+        """Return the entries of ``paths`` whose file changed since it was indexed."""
+        with self._lock:
+            known = {}
+            for folder in {os.path.dirname(path) for path in paths}:
+                for path, size, mtime_ns in self._conn.execute(
+                    "SELECT path, size, mtime_ns FROM images WHERE folder = ?", (folder,)
+                ):
+                    known[path] = (size, mtime_ns)
+        stale = []
+        for path in paths:
+            try:
+                st = archives.stat(path)
+            except OSError:
+                continue
+            key = (st.st_size, st.st_mtime_ns)
+            if known.get(path) != key:
+                stale.append((path, key))
+        return stale
+
+    def update(self, paths, progress_callback=None, cancel_event=None, workers=None):
+        """Index every new or changed file in ``paths``; returns how many were read."""
+        paths = [os.path.abspath(path) for path in paths]
+        stale = self._stale(paths)
+
+        def read(entry):
+            try:
+                meta = read_metadata(entry[0]) or {}
+            except Exception:
+                return {}
+            if meta.get("seed") is not None:
+                meta["seed"] = str(meta["seed"])
+            return meta
+
+        done = 0
+        for start in range(0, len(stale), UPDATE_BATCH):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            batch = stale[start:start + UPDATE_BATCH]
+            results = run_parallel(read, batch, workers, cancel_event=cancel_event)
+            rows = []
+            for (path, (size, mtime_ns)), meta in zip(batch, results):
+                if meta is None:
+                    continue
+                rows.append((path, os.path.dirname(path), size, mtime_ns, *(meta.get(f) for f in FIELDS)))
+            with self._lock:
+                self._conn.executemany("DELETE FROM images WHERE path = ?", [(row[0],) for row in rows])
+                self._conn.executemany(
+                    "INSERT INTO images (path, folder, size, mtime_ns, " + ", ".join(FIELDS) + ") "
+                    "VALUES (" + ", ".join("?" * (4 + len(FIELDS))) + ")",
+                    rows,
+                )
+                self._conn.commit()
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, len(stale))
+        return done
+
+    def get(self, path):
+        """Return the indexed metadata of ``path``, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT " + ", ".join(FIELDS) + " FROM images WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        if row is None or not any(row):
+            return None
+        return dict(zip(FIELDS, row))
+
+    def search(self, text="", folders=None, seed=None, model=None, sampler=None):
+        """Return the set of indexed paths matching every given filter.
+
+        ``text`` matches words of the prompt, ``seed`` matches exactly, and
+        ``model`` and ``sampler`` match case-insensitive substrings.
+        """
+        sql = "SELECT path FROM images"
+        clauses, params = [], []
+        query = _fts_query(text) if text else None
+        if query and self.fts:
+            # A subquery keeps SQLite from scanning the table per FTS match
+            clauses.append("id IN (SELECT rowid FROM prompts WHERE prompts MATCH ?)")
+            params.append(query)
+        elif text:
+            for word in text.split():
+                clauses.append("prompt LIKE ?")
+                params.append(f"%{word.strip('*')}%")
+        if folders:
+            folders = [os.path.abspath(folder) for folder in folders]
+            clauses.append(f"folder IN ({', '.join('?' * len(folders))})")
+            params += folders
+        if seed:
+            clauses.append("seed = ?")
+            params.append(str(seed))
+        if model:
+            clauses.append("model LIKE ?")
+            params.append(f"%{model}%")
+        if sampler:
+            clauses.append("sampler LIKE ?")
+            params.append(f"%{sampler}%")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(sql, params)}
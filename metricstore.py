@@ -0,0 +1,104 @@
+"""Per-folder cache of PrunerIQ metrics.
+
+Metrics are appended to ``.pruneriq_metrics.jsonl`` in the analysed folder,
+one JSON object per image.  Each entry records the file size and
+modification time it was computed from, plus the working size used.
+:func:`pruneriq.analyze_folder` only decodes images whose entry is missing
+or stale.  Crops scored in memory when they are made are therefore already
+analysed when PrunerIQ opens.
+
+Only the raw metrics matter: ratings and percentages are re-derived under
+the current calibration when an entry is read.  Later entries for a file
+replace earlier ones, and the file is compacted once superseded lines
+outnumber live ones.
+"""
+
+import json
+import os
+import threading
+
+STORE_NAME = ".pruneriq_metrics.jsonl"
+
+# Bookkeeping fields stored with every entry
+_KEY_FIELDS = ("_size", "_mtime_ns", "_working_size")
+
+
+def file_key(path):
+    """Return ``(size, mtime_ns)`` identifying the current contents of ``path``."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class MetricStore:
+    """Cached metrics of the images in one folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, STORE_NAME)
+        self._lock = threading.Lock()
+        self._entries = {}  # filename -> entry
+        self._pending = []
+        self._lines = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._entries[entry.get("filename")] = entry
+                self._lines += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, filename, working_size=None):
+        """Return cached metrics for ``filename`` if they are still current."""
+        with self._lock:
+            entry = self._entries.get(filename)
+        if entry is None or entry.get("_working_size") != working_size:
+            return None
+        try:
+            size, mtime_ns = file_key(os.path.join(self.folder, filename))
+        except OSError:
+            return None
+        if entry.get("_size") != size or entry.get("_mtime_ns") != mtime_ns:
+            return None
+        return {key: value for key, value in entry.items() if key not in _KEY_FIELDS}
+
+    def put(self, filename, result, working_size=None):
+        """Record ``result`` for the current contents of ``filename``."""
+        try:
+            size, mtime_ns = file_key(os.path.join(self.folder, filename))
+        except OSError:
+            return
+        entry = dict(result, filename=filename, _size=size, _mtime_ns=mtime_ns, _working_size=working_size)
+        with self._lock:
+            self._entries[filename] = entry
+            self._pending.append(entry)
+
+    def flush(self):
+        """Append pending entries, compacting the file when it has grown stale."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                if self._lines + len(pending) > 2 * len(self._entries) + 100:
+                    temp = self.path + ".tmp"
+                    with open(temp, "w", encoding="utf-8") as f:
+                        for entry in self._entries.values():
+                            f.write(json.dumps(entry) + "\n")
+                    os.replace(temp, self.path)
+                    self._lines = len(self._entries)
+                else:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        for entry in pending:
+                            f.write(json.dumps(entry) + "\n")
+                    self._lines += len(pending)
+            except OSError as e:
+                print(f"Failed to save metrics in {self.folder}: {e}")
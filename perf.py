@@ -0,0 +1,199 @@
+"""Opt-in timing instrumentation for PixelPruner.
+
+Timers
+------
+Functions wrapped with :func:`timed` (or code inside a :class:`timer` block)
+record their wall-clock duration under a name such as ``"load_image"``.
+Each name keeps a call count, total/min/max and a fixed-bucket histogram, so
+recording is O(1) and the memory used does not grow with the length of a
+session.  While instrumentation is disabled the wrappers only perform a
+single flag check.
+
+Profiling
+---------
+:func:`start_profile` and :func:`stop_profile` wrap :mod:`cProfile` so that a
+slow session can be captured and written to a ``.prof`` file for later
+inspection with ``pstats`` or snakeviz.
+"""
+
+import csv
+import json
+import threading
+import time
+import cProfile
+import functools
+
+# Upper bounds (in milliseconds) of the histogram buckets.  Anything slower
+# than the last bound falls into a final open ended bucket.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+_profiler = None
+
+
+class TimerStats:
+    """Running statistics and histogram for a single timer name."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, q):
+        """Return an estimate of the ``q`` quantile (0-1) from the histogram."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                bound = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "min_ms": self.min if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": dict(zip(_bucket_labels(), self.buckets)),
+        }
+
+
+def _bucket_labels():
+    return [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+
+
+def enable(flag=True):
+    """Turn timing collection on or off."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(name, ms):
+    """Add a duration in milliseconds to the timer called ``name``."""
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = TimerStats()
+        stats.add(ms)
+
+
+def reset():
+    """Discard all recorded timings."""
+    with _lock:
+        _stats.clear()
+
+
+def snapshot():
+    """Return ``{name: stats_dict}`` for every timer, sorted by name."""
+    with _lock:
+        return {name: _stats[name].as_dict() for name in sorted(_stats)}
+
+
+class timer:
+    """Context manager timing the enclosed block under ``name``."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+def timed(name=None):
+    """Decorator recording the duration of every call to the wrapped function."""
+
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, (time.perf_counter() - start) * 1000.0)
+
+        return wrapper
+
+    return decorator
+
+
+def dump_json(path):
+    """Write the current statistics, including histograms, as JSON."""
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=4)
+
+
+def dump_csv(path):
+    """Write the current statistics as CSV with one row per timer."""
+    labels = _bucket_labels()
+    fields = ["name", "count", "total_ms", "mean_ms", "min_ms", "max_ms", "p50_ms", "p95_ms"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields + labels)
+        for name, stats in snapshot().items():
+            row = [name] + [stats[k] for k in fields[1:]]
+            row += [stats["histogram"][label] for label in labels]
+            writer.writerow(row)
+
+
+def start_profile():
+    """Start a cProfile capture of the calling (UI) thread."""
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile():
+    """Stop the active capture and return the ``cProfile.Profile`` object."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.disable()
+    return profiler
+
+
+def is_profiling():
+    return _profiler is not None
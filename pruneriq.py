@@ -14,21 +14,73 @@ Metrics explained
 ``aesthetic``
     Placeholder score for a future aesthetic model.
 
+Colour and exposure metrics come from one greyscale histogram and a few
+vectorised channel statistics of the same decoded array:
+
+``highlight_clip`` / ``shadow_clip``
+    Percentage of pixels at or above ``HIGHLIGHT_LEVEL`` (blown highlights)
+    or at or below ``SHADOW_LEVEL`` (crushed blacks).
+``colorfulness``
+    Hasler and Suesstrunk's colourfulness measure.  Around 0 is greyscale,
+    above roughly 100 is very vivid.
+``saturation``
+    Mean HSV saturation on a 0-255 scale.  Strong colour casts in generated
+    images push it up.
+``entropy``
+    Shannon entropy of the greyscale histogram in bits (0-8).  Low values
+    mean flat, low-detail images.
+``dhash``
+    64-bit difference hash as 16 hex digits, used to find near-duplicates.
+
 Each image is also given a simple rating (``Poor`` through ``Excellent``)
 derived from threshold values of the above metrics.  In addition to the
 raw values, each metric is converted to a 0-100 ``*_pct`` score using the
 thresholds as reference points.  These scores provide an easy-to-read
 percentage indicating how close a metric is to the desired range.  The
 ``reason`` field in the returned dictionary briefly explains why a
-particular rating was chosen.
+particular rating was chosen.  Clipping and oversaturation do not change
+the rating but are noted in the reason.
+
+Thresholds and calibration
+--------------------------
+The default thresholds suit crops of around 512-1024 pixels, but the scale
+of every metric depends on resolution.  :func:`calibrate` derives
+thresholds and ``*_pct`` reference points from the distribution of a
+dataset instead, using streaming quantile estimates so memory use does not
+grow with the number of images.  A calibration is saved per folder in
+``.pruneriq_calibration.json`` and :func:`analyze_folder` reuses it
+automatically on later runs; :func:`apply_calibration` re-rates existing
+results without opening any images.
+
+Working size
+------------
+Clarity and noise both depend on how many pixels an image has.  Passing a
+``working_size`` to :func:`analyze_image` or :func:`analyze_folder` first
+resizes every image so its longest side is that many pixels.  Larger images
+are shrunk with an area filter and smaller ones enlarged, so scores from
+different resolutions become comparable.  JPEGs much larger than the
+working size are decoded at a reduced scale, which also caps the cost of
+analysing huge sources.  Each result of :func:`analyze_folder` records
+the size in its ``working_size`` field (absent for the native resolution).
+A calibration remembers the working size it was made at, and later
+analyses of the folder use the same size.
+
+Results can be written with :func:`export_results` to CSV, JSON Lines or a
+compressed NumPy ``.npz`` file holding one array per column, and read back
+with :func:`load_results` without re-analysing any images.
 """
 
 import os
+import csv
 import json
-from PIL import Image
+from bisect import bisect_right, insort
 import cv2
 import numpy as np
 
+import archives
+import perf
+from metricstore import MetricStore
+
 # Empirically tuned thresholds for a "good" image
 # Typical high‑quality crops have a contrast standard deviation
 # around 60–80 on the 0‑255 intensity scale.
@@ -43,6 +95,56 @@ CLARITY_THRESHOLD = 200
 # obvious grain.
 NOISE_THRESHOLD = 15000
 
+# Grey levels at or beyond which pixels count as clipped
+HIGHLIGHT_LEVEL = 250
+SHADOW_LEVEL = 5
+
+# Percentage of clipped pixels noted in the rating reason
+CLIP_WARNING_PCT = 5.0
+
+# Mean HSV saturation noted as oversaturated in the rating reason
+SATURATION_WARNING = 170
+
+# Quantiles of a dataset used by :func:`calibrate` for each metric, as
+# (rating threshold, 100% reference point).  Contrast and clarity below the
+# lower quartile and noise above the upper quartile count against the
+# rating.
+CALIBRATION_QUANTILES = {
+    "contrast": (0.25, 0.90),
+    "clarity": (0.25, 0.90),
+    "noise": (0.75, 0.90),
+}
+
+CALIBRATION_NAME = ".pruneriq_calibration.json"
+
+# Longest side, in pixels, of the canonical size used by "Normalise Size"
+WORKING_SIZE = 1024
+
+# JPEG decode reductions supported by OpenCV, largest first
+_REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+DEFAULT_CALIBRATION = {
+    "count": 0,
+    "thresholds": {
+        "contrast": CONTRAST_THRESHOLD,
+        "clarity": CLARITY_THRESHOLD,
+        "noise": NOISE_THRESHOLD,
+    },
+    "scales": {
+        "contrast": CONTRAST_THRESHOLD,
+        "clarity": CLARITY_THRESHOLD,
+        "noise": NOISE_THRESHOLD,
+    },
+}
+
+# Result fields holding text.  Every other field is numeric and is stored as
+# a float column when exported.
+TEXT_FIELDS = ("filename", "rating", "reason", "dhash")
+
 def _scale_score(value: float, threshold: float, reverse: bool = False) -> float:
     """Return a 0-100 score relative to the given threshold."""
     ratio = value / threshold
@@ -50,19 +152,20 @@ def _scale_score(value: float, threshold: float, reverse: bool = False) -> float
     score = (1.0 - ratio) if reverse else ratio
     return score * 100
 
-def _rate_image(contrast: float, clarity: float, noise: float):
+def _rate_image(contrast: float, clarity: float, noise: float, thresholds=None):
     """Return a textual rating and explanation for the given metrics."""
+    thresholds = thresholds or DEFAULT_CALIBRATION["thresholds"]
     score = 0
     reasons = []
-    if contrast >= CONTRAST_THRESHOLD:
+    if contrast >= thresholds["contrast"]:
         score += 1
     else:
         reasons.append("low contrast")
-    if clarity >= CLARITY_THRESHOLD:
+    if clarity >= thresholds["clarity"]:
         score += 1
     else:
         reasons.append("low clarity")
-    if noise <= NOISE_THRESHOLD:
+    if noise <= thresholds["noise"]:
         score += 1
     else:
         reasons.append("high noise")
@@ -73,15 +176,294 @@ def _rate_image(contrast: float, clarity: float, noise: float):
         reasons.append("meets all thresholds")
     return rating, ", ".join(reasons)
 
-def analyze_image(image_path):
-    image = cv2.imread(image_path)
+def score_result(result, calibration=None):
+    """Fill in the ``*_pct`` scores, rating and reason of ``result`` in place.
+
+    Only the raw ``contrast``, ``clarity`` and ``noise`` values are read, so
+    results can be re-scored under a different calibration at no cost.
+    """
+    calibration = calibration or DEFAULT_CALIBRATION
+    scales = calibration["scales"]
+    result["contrast_pct"] = _scale_score(result["contrast"], scales["contrast"])
+    result["clarity_pct"] = _scale_score(result["clarity"], scales["clarity"])
+    result["noise_pct"] = _scale_score(result["noise"], scales["noise"], reverse=True)
+    result["rating"], result["reason"] = _rate_image(
+        result["contrast"], result["clarity"], result["noise"], calibration["thresholds"]
+    )
+    notes = []
+    if result.get("highlight_clip", 0) >= CLIP_WARNING_PCT:
+        notes.append("clipped highlights")
+    if result.get("shadow_clip", 0) >= CLIP_WARNING_PCT:
+        notes.append("crushed blacks")
+    if result.get("saturation", 0) >= SATURATION_WARNING:
+        notes.append("oversaturated")
+    if notes:
+        result["reason"] += "; " + ", ".join(notes)
+    return result
+
+
+def color_metrics(image, gray, rgb=False):
+    """Return exposure and colour metrics for a BGR ``image`` and its ``gray`` copy.
+
+    ``rgb`` marks ``image`` as RGB ordered instead.
+    """
+    total = gray.size
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    highlight_clip = float(hist[HIGHLIGHT_LEVEL:].sum()) / total * 100
+    shadow_clip = float(hist[:SHADOW_LEVEL + 1].sum()) / total * 100
+    probabilities = hist[hist > 0] / total
+    entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+    channels = cv2.split(image.astype(np.float32))
+    r, g, b = channels if rgb else channels[::-1]
+    rg_mean, rg_std = cv2.meanStdDev(r - g)
+    yb_mean, yb_std = cv2.meanStdDev(0.5 * (r + g) - b)
+    colorfulness = float(
+        np.hypot(rg_std[0, 0], yb_std[0, 0]) + 0.3 * np.hypot(rg_mean[0, 0], yb_mean[0, 0])
+    )
+    to_hsv = cv2.COLOR_RGB2HSV if rgb else cv2.COLOR_BGR2HSV
+    saturation = float(cv2.mean(cv2.cvtColor(image, to_hsv))[1])
+
+    return {
+        "highlight_clip": highlight_clip,
+        "shadow_clip": shadow_clip,
+        "colorfulness": colorfulness,
+        "saturation": saturation,
+        "entropy": entropy,
+    }
+
+
+# Values kept exactly by StreamingQuantile before it switches to P-squared
+EXACT_QUANTILE_SAMPLES = 500
+
+
+class StreamingQuantile:
+    """Estimate one quantile of a stream in constant memory.
+
+    The first ``EXACT_QUANTILE_SAMPLES`` values are kept, and the quantile
+    is computed exactly from them (linear interpolation, as ``np.quantile``
+    does).  Past that, the P-squared algorithm (Jain & Chlamtac, 1985) takes
+    over, seeded from the kept values: five markers whose heights are
+    adjusted with piecewise-parabolic interpolation as values arrive.
+    """
+
+    __slots__ = ("p", "count", "_samples", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self._samples = []  # Sorted; dropped once P-squared takes over
+        self._heights = None
+        self._positions = None
+        self._desired = None
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def _start_markers(self):
+        """Seed the P-squared markers from the sorted exact samples."""
+        samples = self._samples
+        last = len(samples) - 1
+        positions = [int(round(f * last)) for f in self._increments]
+        # Markers need distinct positions
+        for i in range(1, 4):
+            positions[i] = min(max(positions[i], positions[i - 1] + 1), last - (4 - i))
+        self._heights = [float(samples[i]) for i in positions]
+        self._positions = [i + 1 for i in positions]
+        self._desired = [1 + f * last for f in self._increments]
+        self._samples = None
+
+    def add(self, value):
+        self.count += 1
+        if self._samples is not None:
+            insort(self._samples, value)
+            if len(self._samples) > EXACT_QUANTILE_SAMPLES:
+                self._start_markers()
+            return
+        q = self._heights
+        n = self._positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = bisect_right(q, value) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    # Parabolic step left the bracket; use a linear one
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def value(self):
+        """Return the current estimate, or ``None`` before any values."""
+        if self._samples is None:
+            return self._heights[2]
+        samples = self._samples
+        if not samples:
+            return None
+        position = self.p * (len(samples) - 1)
+        low = int(position)
+        high = min(low + 1, len(samples) - 1)
+        return samples[low] + (samples[high] - samples[low]) * (position - low)
+
+
+class Calibrator:
+    """Collect streaming metric quantiles and derive a calibration."""
+
+    def __init__(self):
+        self.count = 0
+        self._estimators = {
+            metric: [StreamingQuantile(p) for p in quantiles]
+            for metric, quantiles in CALIBRATION_QUANTILES.items()
+        }
+
+    def add(self, result):
+        self.count += 1
+        for metric, estimators in self._estimators.items():
+            for estimator in estimators:
+                estimator.add(result[metric])
+
+    def calibration(self):
+        """Return the calibration, falling back to defaults with no data."""
+        if not self.count:
+            return DEFAULT_CALIBRATION
+        thresholds = {}
+        scales = {}
+        for metric, (threshold, scale) in self._estimators.items():
+            # Guard against degenerate datasets such as all-flat images
+            thresholds[metric] = max(threshold.value(), 1e-6)
+            scales[metric] = max(scale.value(), thresholds[metric])
+        return {"count": self.count, "thresholds": thresholds, "scales": scales}
+
+
+def calibrate(results):
+    """Return a calibration derived from the metric distribution of ``results``."""
+    calibrator = Calibrator()
+    for result in results:
+        calibrator.add(result)
+    return calibrator.calibration()
+
+
+def apply_calibration(results, calibration):
+    """Re-score ``results`` in place under ``calibration`` and return them."""
+    for result in results:
+        score_result(result, calibration)
+    return results
+
 
+def save_calibration(folder_path, calibration):
+    """Store ``calibration`` for ``folder_path``."""
+    with open(os.path.join(folder_path, CALIBRATION_NAME), "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=4)
+
+
+def load_calibration(folder_path):
+    """Return the calibration saved for ``folder_path``, or ``None``."""
+    path = os.path.join(folder_path, CALIBRATION_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            calibration = json.load(f)
+        if {"thresholds", "scales"} <= calibration.keys():
+            return calibration
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def imread(image_path, flags=cv2.IMREAD_COLOR):
+    """``cv2.imread`` that also reads images inside archives."""
+    if not archives.is_member(image_path):
+        return cv2.imread(image_path, flags)
+    data = np.frombuffer(archives.read_bytes(image_path), np.uint8)
+    return cv2.imdecode(data, flags)
+
+
+def read_for_analysis(image_path, working_size=None):
+    """Return the BGR array of ``image_path``, resized to ``working_size``.
+
+    With ``working_size`` set the longest side of the result is exactly that
+    many pixels.  The image is decoded at the largest reduced scale that
+    still covers the working size, then shrunk with ``INTER_AREA`` (or
+    enlarged with ``INTER_CUBIC`` when it is smaller).
+    """
+    if not working_size:
+        return imread(image_path)
+    with archives.open_image(image_path) as img:
+        longest = max(img.size)
+    flags = cv2.IMREAD_COLOR
+    for factor, reduced_flag in _REDUCED_READ_FLAGS:
+        if longest // factor >= working_size:
+            flags = reduced_flag
+            break
+    return resize_to_working(imread(image_path, flags), working_size)
+
+
+def resize_to_working(image, working_size=None):
+    """Resize an array so its longest side is ``working_size`` pixels."""
+    if not working_size:
+        return image
+    height, width = image.shape[:2]
+    scale = working_size / max(width, height)
+    if scale == 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(image, size, interpolation=interpolation)
+
+
+def dhash(gray):
+    """Return the 64-bit difference hash of a greyscale array."""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def image_dhash(image_path):
+    """Return the difference hash of the image at ``image_path``, or ``None``."""
+    gray = imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None:
+        return None
+    return dhash(gray)
+
+
+def laplacian_clarity(gray):
+    """Return the clarity metric: the variance of the Laplacian of ``gray``."""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+@perf.timed("analyze_image")
+def analyze_image(image_path, calibration=None, working_size=None):
+    image = read_for_analysis(image_path, working_size)
+    return analyze_array(image, os.path.basename(image_path), calibration)
+
+
+def analyze_array(image, filename, calibration=None, rgb=False):
+    """Score an already decoded 8-bit colour array.
+
+    ``image`` is BGR as returned by ``cv2.imread``, or RGB with ``rgb=True``
+    (for example ``np.asarray`` of a PIL image), so in-memory images can be
+    scored without a channel-swapping copy.
+    """
     # Contrast: Standard deviation of intensity
     contrast = float(np.std(image))
 
     # Clarity: Variance of Laplacian
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    clarity = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY)
+    clarity = laplacian_clarity(gray)
 
     # Noise: Estimate via FFT residuals or pixel variance
     noise = float(np.var(cv2.GaussianBlur(gray, (3,3), 0) - gray))
@@ -89,32 +471,48 @@ def analyze_image(image_path):
     # Placeholder: Aesthetic score stub
     aesthetic = 0.0  # Will replace with actual model output later
 
-    contrast_pct = _scale_score(contrast, CONTRAST_THRESHOLD)
-    clarity_pct = _scale_score(clarity, CLARITY_THRESHOLD)
-    noise_pct = _scale_score(noise, NOISE_THRESHOLD, reverse=True)
-
-    rating, reason = _rate_image(contrast, clarity, noise)
-
-    return {
-        "filename": os.path.basename(image_path),
+    result = {
+        "filename": filename,
         "contrast": contrast,
-        "contrast_pct": contrast_pct,
+        "contrast_pct": 0.0,
         "clarity": clarity,
-        "clarity_pct": clarity_pct,
+        "clarity_pct": 0.0,
         "noise": noise,
-        "noise_pct": noise_pct,
+        "noise_pct": 0.0,
         "aesthetic": aesthetic,
-        "rating": rating,
-        "reason": reason
+        **color_metrics(image, gray, rgb),
+        "dhash": f"{dhash(gray):016x}",
+        "rating": "",
+        "reason": ""
     }
+    return score_result(result, calibration)
+
+def resolve_calibration(folder_path, working_size=None):
+    """Return ``(calibration, working_size)`` to analyse ``folder_path`` with.
+
+    The folder's saved calibration is used, with its working size when none
+    is given.  A calibration made at a different working size is ignored.
+    """
+    calibration = load_calibration(folder_path)
+    if calibration is not None:
+        if working_size is None:
+            working_size = calibration.get("working_size")
+        elif calibration.get("working_size") != working_size:
+            # Thresholds measured at another scale do not apply
+            calibration = None
+    return calibration, working_size
+
 
-def analyze_folder(folder_path, crops_only=True, progress_callback=None):
+def analyze_folder(folder_path, crops_only=True, progress_callback=None, auto_calibrate=False,
+                   working_size=None, use_store=True, store=None):
     """Analyze images in ``folder_path``.
 
     Parameters
     ----------
     folder_path : str
-        Directory containing images to analyze.
+        Directory containing images to analyze, or a zip or tar archive.
+        Results of an archive are named by member and neither cached nor
+        calibrated to disk.
     crops_only : bool, optional
         If ``True`` only files whose names start with ``"cropped_"`` will be
         processed.  When ``False`` all supported image files are analyzed.
@@ -122,6 +520,22 @@ def analyze_folder(folder_path, crops_only=True, progress_callback=None):
     progress_callback : callable, optional
         Function called with the current index and total count after each image
         is processed.  This can be used to update a progress indicator.
+    auto_calibrate : bool, optional
+        If ``True`` thresholds are derived from this dataset and saved for
+        the folder.  Otherwise a calibration saved earlier for the folder is
+        used when present, and the default thresholds when not.
+    working_size : int, optional
+        Analyse every image resized so its longest side is this many
+        pixels.  Defaults to the working size of the folder's saved
+        calibration, or the native resolution without one.  A saved
+        calibration made at a different working size is ignored.
+    use_store : bool, optional
+        Reuse metrics cached in the folder's :class:`MetricStore` for
+        unchanged files, and cache newly computed ones.
+    store : MetricStore, optional
+        The folder's store to use instead of opening a new one.  Pass the
+        store shared with other writers of the folder, so that only one
+        instance appends to and compacts its file.
 
     Returns
     -------
@@ -130,17 +544,137 @@ def analyze_folder(folder_path, crops_only=True, progress_callback=None):
     """
 
     results = []
+    is_archive = archives.is_archive(folder_path)
+    if is_archive:
+        names = archives.reader(folder_path).images()
+        use_store = False
+    else:
+        names = os.listdir(folder_path)
     files = [
         f
-        for f in os.listdir(folder_path)
-        if (not crops_only or f.lower().startswith("cropped_"))
+        for f in names
+        if (not crops_only or os.path.basename(f).lower().startswith("cropped_"))
         and f.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
     ]
     total = len(files)
+    if auto_calibrate:
+        calibration = None
+    else:
+        calibration, working_size = resolve_calibration(folder_path, working_size)
+    if not use_store:
+        store = None
+    elif store is None:
+        store = MetricStore(folder_path)
     for idx, file in enumerate(files, 1):
-        image_path = os.path.join(folder_path, file)
-        result = analyze_image(image_path)
+        cached = store.get(file, working_size) if store is not None else None
+        if cached is not None:
+            result = score_result(cached, calibration)
+        else:
+            result = analyze_image(archives.join(folder_path, file), calibration, working_size)
+            if is_archive:
+                result["filename"] = file
+            if store is not None:
+                store.put(file, result, working_size)
+        if working_size:
+            result["working_size"] = working_size
         results.append(result)
         if progress_callback:
             progress_callback(idx, total)
+    if store is not None:
+        store.flush()
+    if auto_calibrate and results:
+        calibration = dict(calibrate(results), working_size=working_size)
+        if not is_archive:
+            save_calibration(folder_path, calibration)
+        apply_calibration(results, calibration)
+    return results
+
+
+def results_working_size(results):
+    """Return the working size ``results`` were analysed at, ``None`` for native.
+
+    Raises ``ValueError`` when the results mix working sizes.
+    """
+    sizes = {result.get("working_size") for result in results}
+    if len(sizes) > 1:
+        raise ValueError("Results were analysed at different working sizes")
+    size = sizes.pop() if sizes else None
+    # Sizes read back from CSV and .npz are floats
+    return int(size) if size else None
+
+
+def _result_fields(results):
+    """Return every field name used in ``results`` in first-seen order."""
+    fields = []
+    for result in results:
+        for key in result:
+            if key not in fields:
+                fields.append(key)
+    return fields
+
+
+def export_results(results, path):
+    """Write analysis ``results`` to ``path``.
+
+    The format is chosen from the file extension: ``.csv``, ``.jsonl`` or
+    ``.npz``.  The ``.npz`` format stores each field as a separate array,
+    which keeps large result sets compact and quick to reload.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    fields = _result_fields(results)
+    if ext == ".csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    elif ext == ".jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    elif ext == ".npz":
+        columns = {}
+        for field in fields:
+            values = [result.get(field) for result in results]
+            if field in TEXT_FIELDS:
+                columns[field] = np.array(["" if v is None else str(v) for v in values], dtype=str)
+            else:
+                columns[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        np.savez_compressed(path, **columns)
+    else:
+        raise ValueError(f"Unsupported results format: {ext}")
+
+
+def load_results(path):
+    """Load results previously written by :func:`export_results`."""
+    ext = os.path.splitext(path)[1].lower()
+    results = []
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                result = {}
+                for key, value in row.items():
+                    if key in TEXT_FIELDS:
+                        result[key] = value
+                    elif value not in ("", None):
+                        result[key] = float(value)
+                results.append(result)
+    elif ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    results.append(json.loads(line))
+    elif ext == ".npz":
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files}
+        count = len(next(iter(columns.values()))) if columns else 0
+        for i in range(count):
+            result = {}
+            for name, column in columns.items():
+                if name in TEXT_FIELDS:
+                    result[name] = str(column[i])
+                elif not np.isnan(column[i]):
+                    result[name] = float(column[i])
+            results.append(result)
+    else:
+        raise ValueError(f"Unsupported results format: {ext}")
     return results
@@ -0,0 +1,79 @@
+"""Coalesced redraws for the main window.
+
+Event handlers do not draw directly.  They mark parts of the window as dirty
+with :meth:`RenderScheduler.request`, and the scheduler paints every dirty
+part once, at most once per frame.  A burst of ``<Configure>`` or
+``<Motion>`` events therefore costs a single repaint with the latest state
+instead of one per event.
+
+Parts are painted in the order they were registered.  A part can *cover*
+others: painting the image also redraws the crop box, so a pending crop
+box repaint is dropped once the image has been painted.
+"""
+
+import time
+
+IMAGE = "image"
+CROP_BOX = "crop_box"
+PREVIEW = "preview"
+SOURCE_LAYOUT = "source_layout"
+SOURCES = "sources"
+CROPS = "crops"
+
+# Minimum time between two paints, about one frame at 60 Hz
+FRAME_MS = 16
+
+
+class RenderScheduler:
+    """Collects redraw requests and paints them on the Tk event loop."""
+
+    def __init__(self, widget, frame_ms=FRAME_MS):
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.handlers = {}  # part -> (paint function, parts it covers)
+        self.dirty = set()
+        self.paints = 0
+        self._after_id = None
+        self._last_paint = 0.0
+
+    def register(self, part, handler, covers=()):
+        self.handlers[part] = (handler, tuple(covers))
+
+    def request(self, *parts):
+        """Mark ``parts`` dirty and schedule a paint if none is pending."""
+        self.dirty.update(parts)
+        if self._after_id is None and self.dirty:
+            elapsed = (time.perf_counter() - self._last_paint) * 1000
+            delay = max(0, int(self.frame_ms - elapsed))
+            self._after_id = self.widget.after(delay, self._run)
+
+    def discard(self, *parts):
+        """Drop pending repaints of ``parts``, e.g. after drawing them directly."""
+        self.dirty.difference_update(parts)
+
+    def _run(self):
+        self._after_id = None
+        self.paint()
+
+    def paint(self):
+        """Paint every dirty part now."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._last_paint = time.perf_counter()
+        self.paints += 1
+        for part, (handler, covers) in self.handlers.items():
+            if part not in self.dirty:
+                continue
+            self.dirty.discard(part)
+            self.dirty.difference_update(covers)
+            try:
+                handler()
+            except Exception as e:
+                print(f"Failed to redraw {part}: {e}")
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self.dirty.clear()
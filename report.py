@@ -0,0 +1,296 @@
+"""Dataset reports for PrunerIQ results.
+
+:func:`build_report` makes one pass over a sequence of analysis results and
+writes a self-contained HTML or Markdown file.  The file contains:
+
+* a histogram for every metric,
+* the distribution of ratings,
+* the worst images for each metric, with inline thumbnails, and
+* clusters of near-duplicate images.
+
+Memory does not grow with the images themselves.  Histograms use fixed
+bins, the worst lists are bounded heaps, and duplicate detection keeps one
+64-bit hash per image.  Thumbnails are only decoded for the few images that
+end up in the worst lists, and are embedded as base64 JPEG data URIs so the
+report can be attached to a review without its image folder.
+"""
+
+import base64
+import heapq
+import html
+import io
+import os
+from collections import Counter
+from datetime import datetime
+
+from archives import join, open_image
+from pruneriq import image_dhash
+
+# (field, label, low, high, lower_is_worse).  Values outside the range are
+# counted in the first or last bin.
+REPORT_METRICS = (
+    ("contrast_pct", "Contrast (%)", 0, 100, True),
+    ("clarity_pct", "Clarity (%)", 0, 100, True),
+    ("noise_pct", "Noise (%)", 0, 100, True),
+    ("highlight_clip", "Highlights clipped (%)", 0, 100, False),
+    ("shadow_clip", "Shadows clipped (%)", 0, 100, False),
+    ("colorfulness", "Colorfulness", 0, 150, True),
+    ("saturation", "Saturation", 0, 255, False),
+    ("entropy", "Entropy (bits)", 0, 8, True),
+)
+
+HISTOGRAM_BINS = 20
+
+RATINGS = ("Excellent", "Good", "Fair", "Poor")
+
+# Number of images listed per metric
+WORST_COUNT = 12
+
+REPORT_THUMB_SIZE = 96
+
+# Hashes this many bits apart or closer are treated as duplicates.  The
+# hash is split into DUPLICATE_DISTANCE + 1 bands, so any such pair shares
+# at least one band exactly.
+DUPLICATE_DISTANCE = 3
+
+# Members of a band bucket each new hash is compared with, which bounds the
+# work for buckets filled by many near-identical images
+BUCKET_COMPARE_LIMIT = 256
+
+
+class Histogram:
+    """Fixed-range histogram."""
+
+    __slots__ = ("low", "high", "counts")
+
+    def __init__(self, low, high, bins=HISTOGRAM_BINS):
+        self.low = low
+        self.high = high
+        self.counts = [0] * bins
+
+    def add(self, value):
+        bins = len(self.counts)
+        index = int((value - self.low) / (self.high - self.low) * bins)
+        self.counts[min(max(index, 0), bins - 1)] += 1
+
+    def edges(self):
+        step = (self.high - self.low) / len(self.counts)
+        return [(self.low + i * step, self.low + (i + 1) * step) for i in range(len(self.counts))]
+
+
+class DuplicateFinder:
+    """Group 64-bit perceptual hashes that differ by few bits."""
+
+    def __init__(self, distance=DUPLICATE_DISTANCE):
+        self.distance = distance
+        self.band_bits = 64 // (distance + 1)
+        self.names = []
+        self.hashes = []
+        self.parent = []
+        self.bands = [{} for _ in range(distance + 1)]
+
+    def _find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def add(self, name, value):
+        index = len(self.hashes)
+        self.names.append(name)
+        self.hashes.append(value)
+        self.parent.append(index)
+        mask = (1 << self.band_bits) - 1
+        for band, buckets in enumerate(self.bands):
+            key = (value >> (band * self.band_bits)) & mask
+            bucket = buckets.setdefault(key, [])
+            for other in bucket[-BUCKET_COMPARE_LIMIT:]:
+                if bin(value ^ self.hashes[other]).count("1") <= self.distance:
+                    root, other_root = self._find(index), self._find(other)
+                    if root != other_root:
+                        self.parent[max(root, other_root)] = min(root, other_root)
+            bucket.append(index)
+
+    def clusters(self):
+        """Return lists of names with more than one member, largest first."""
+        groups = {}
+        for i in range(len(self.hashes)):
+            groups.setdefault(self._find(i), []).append(self.names[i])
+        return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def thumbnail_uri(path, size=REPORT_THUMB_SIZE):
+    """Return a base64 JPEG data URI of a small thumbnail, or ``None``."""
+    try:
+        with open_image(path) as img:
+            img.draft("RGB", (size, size))
+            img = img.convert("RGB")
+            img.thumbnail((size, size))
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=80)
+    except Exception:
+        return None
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def collect(results, folder, worst_count=WORST_COUNT, duplicates=True,
+            progress_callback=None, cancel_event=None, total=None):
+    """Stream over ``results`` and return the aggregated report data.
+
+    Filenames are resolved against ``folder`` when a hash has to be
+    computed for results that lack a ``dhash`` field.
+    """
+    histograms = {field: Histogram(low, high) for field, _, low, high, _ in REPORT_METRICS}
+    worst = {field: [] for field, *_ in REPORT_METRICS}
+    ratings = Counter()
+    finder = DuplicateFinder() if duplicates else None
+    count = 0
+    for index, result in enumerate(results):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        count += 1
+        ratings[result.get("rating", "")] += 1
+        filename = result.get("filename", "")
+        for field, _, _, _, lower_is_worse in REPORT_METRICS:
+            value = result.get(field)
+            if value is None:
+                continue
+            histograms[field].add(value)
+            # Keep the worst values in a bounded heap whose root is the
+            # least bad of them
+            badness = -value if lower_is_worse else value
+            entry = (badness, index, filename, value)
+            if len(worst[field]) < worst_count:
+                heapq.heappush(worst[field], entry)
+            elif entry > worst[field][0]:
+                heapq.heapreplace(worst[field], entry)
+        if finder is not None:
+            value = result.get("dhash")
+            if value:
+                finder.add(filename, int(value, 16))
+            else:
+                value = image_dhash(join(folder, filename))
+                if value is not None:
+                    finder.add(filename, value)
+        if progress_callback and (index + 1) % 100 == 0:
+            progress_callback(index + 1, total or index + 1)
+    return {
+        "count": count,
+        "histograms": histograms,
+        "worst": {field: sorted(entries, reverse=True) for field, entries in worst.items()},
+        "ratings": ratings,
+        "duplicates": finder.clusters() if finder is not None else [],
+    }
+
+
+def _bar(count, largest, width=30):
+    return "█" * (round(count / largest * width) if largest else 0)
+
+
+def render_markdown(data, folder):
+    lines = [
+        "# PrunerIQ Dataset Report",
+        "",
+        f"Folder: `{folder}`  ",
+        f"Images: {data['count']}  ",
+        f"Generated: {datetime.now():%Y-%m-%d %H:%M}",
+        "",
+        "## Ratings",
+        "",
+        "| Rating | Images |",
+        "| --- | --- |",
+    ]
+    for rating in RATINGS:
+        lines.append(f"| {rating} | {data['ratings'].get(rating, 0)} |")
+    lines.append("")
+    for field, label, *_ in REPORT_METRICS:
+        histogram = data["histograms"][field]
+        if not any(histogram.counts):
+            continue
+        largest = max(histogram.counts)
+        lines += [f"## {label}", "", "```"]
+        for (low, high), count in zip(histogram.edges(), histogram.counts):
+            lines.append(f"{low:7.1f} - {high:7.1f} | {_bar(count, largest)} {count}")
+        lines += ["```", "", "Worst images:", ""]
+        for _, _, filename, value in data["worst"][field]:
+            uri = thumbnail_uri(join(folder, filename))
+            thumb = f"![]({uri}) " if uri else ""
+            lines.append(f"- {thumb}`{filename}` - {value:.2f}")
+        lines.append("")
+    lines += ["## Duplicate clusters", ""]
+    if not data["duplicates"]:
+        lines.append("No near-duplicates found.")
+    for number, cluster in enumerate(data["duplicates"], 1):
+        lines.append(f"{number}. " + ", ".join(f"`{name}`" for name in cluster))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_html(data, folder):
+    esc = html.escape
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>PrunerIQ Dataset Report</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{padding:2px 8px;text-align:left}.bar{background:#4a7ebb;height:12px}"
+        ".thumbs{display:flex;flex-wrap:wrap;gap:8px}.thumbs figure{margin:0;width:110px;font-size:11px}"
+        "figcaption{word-break:break-all}</style></head><body>",
+        "<h1>PrunerIQ Dataset Report</h1>",
+        f"<p>Folder: <code>{esc(folder)}</code><br>Images: {data['count']}<br>"
+        f"Generated: {datetime.now():%Y-%m-%d %H:%M}</p>",
+        "<h2>Ratings</h2><table>",
+    ]
+    largest = max(data["ratings"].values(), default=0)
+    for rating in RATINGS:
+        count = data["ratings"].get(rating, 0)
+        width = round(count / largest * 300) if largest else 0
+        parts.append(f"<tr><td>{rating}</td><td>{count}</td><td><div class='bar' style='width:{width}px'></div></td></tr>")
+    parts.append("</table>")
+    for field, label, *_ in REPORT_METRICS:
+        histogram = data["histograms"][field]
+        if not any(histogram.counts):
+            continue
+        largest = max(histogram.counts)
+        parts.append(f"<h2>{esc(label)}</h2><table>")
+        for (low, high), count in zip(histogram.edges(), histogram.counts):
+            width = round(count / largest * 300)
+            parts.append(
+                f"<tr><td>{low:.1f} - {high:.1f}</td><td>{count}</td>"
+                f"<td><div class='bar' style='width:{width}px'></div></td></tr>"
+            )
+        parts.append("</table><h3>Worst images</h3><div class='thumbs'>")
+        for _, _, filename, value in data["worst"][field]:
+            uri = thumbnail_uri(join(folder, filename))
+            image = f"<img src='{uri}' alt=''>" if uri else ""
+            parts.append(f"<figure>{image}<figcaption>{esc(filename)}<br>{value:.2f}</figcaption></figure>")
+        parts.append("</div>")
+    parts.append("<h2>Duplicate clusters</h2>")
+    if not data["duplicates"]:
+        parts.append("<p>No near-duplicates found.</p>")
+    else:
+        parts.append("<ol>")
+        for cluster in data["duplicates"]:
+            parts.append("<li>" + ", ".join(f"<code>{esc(name)}</code>" for name in cluster) + "</li>")
+        parts.append("</ol>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def build_report(results, folder, path, worst_count=WORST_COUNT, duplicates=True,
+                 progress_callback=None, cancel_event=None):
+    """Write a report on ``results`` to ``path``.
+
+    The format follows the extension: ``.html`` or ``.md``.  ``results`` can
+    be any iterable, so large result files can be streamed through.  Returns
+    the aggregated data, or ``None`` if cancelled.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".html", ".htm", ".md"):
+        raise ValueError(f"Unsupported report format: {ext}")
+    total = len(results) if hasattr(results, "__len__") else None
+    data = collect(results, folder, worst_count, duplicates, progress_callback, cancel_event, total)
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    text = render_markdown(data, folder) if ext == ".md" else render_html(data, folder)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return data
@@ -0,0 +1,292 @@
+"""Shared-memory transport of decoded pixels between processes.
+
+PixelPruner's batch jobs run on threads (see :mod:`jobs`), so pixels never
+leave the process.  Work that has to run in worker processes would
+otherwise pickle every decoded array back to the UI, which costs about as
+much as the decode.  This module moves pixels through
+:mod:`multiprocessing.shared_memory` instead:
+
+* :class:`PixelRing` owns a fixed ring of equally sized shared blocks
+  (slots).  The parent process hands a free slot to a worker, the worker
+  writes the pixels into it and returns only the shape and mode.
+* The parent wraps the filled slot in a :class:`Lease`.  A lease maps the
+  slot as a NumPy array without copying, and as a PIL image (which shares
+  memory for ``L`` and ``RGBA`` data).
+* Slots are reference counted.  :meth:`Lease.retain` hands out another
+  reference, and a slot is only reused once every lease on it has been
+  released.  :func:`decode_parallel` waits for a free slot before
+  submitting more work, so memory stays bounded by the ring size.
+
+Arrays and images obtained from a lease must not be used after the lease is
+released.  :func:`benchmark` compares the transport with pickling.
+"""
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from PIL import Image
+
+from jobs import default_workers
+
+MB = 1024 * 1024
+
+DEFAULT_SLOTS = 8
+DEFAULT_SLOT_BYTES = 64 * MB
+
+_CHANNELS = {"L": 1, "RGB": 3, "RGBA": 4}
+
+# Blocks attached by this worker process, by name
+_attached = {}
+
+
+def _attach(name):
+    block = _attached.get(name)
+    if block is None:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 has no ``track`` and registers the block with
+            # the resource tracker again, which then reports it as leaked
+            # and unlinks it a second time at exit.  The ring owns it.
+            block = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(block._name, "shared_memory")
+        _attached[name] = block
+    return block
+
+
+def _slot_array(buffer, shape):
+    return np.ndarray(shape, dtype=np.uint8, buffer=buffer)
+
+
+class Lease:
+    """One reference to a filled slot of a :class:`PixelRing`."""
+
+    __slots__ = ("ring", "slot", "shape", "mode", "_released")
+
+    def __init__(self, ring, slot, shape, mode):
+        self.ring = ring
+        self.slot = slot
+        self.shape = tuple(shape)
+        self.mode = mode
+        self._released = False
+
+    @property
+    def size(self):
+        return self.shape[1], self.shape[0]
+
+    def array(self):
+        """Return the pixels as a NumPy array backed by the shared slot."""
+        if self._released:
+            raise ValueError("lease already released")
+        return _slot_array(self.ring.blocks[self.slot].buf, self.shape)
+
+    def image(self):
+        """Return the pixels as a PIL image.
+
+        ``L`` and ``RGBA`` images share the slot; Pillow keeps ``RGB`` as
+        four bytes per pixel, so those are copied once.
+        """
+        if self.mode == "RGB":
+            return Image.fromarray(self.array(), "RGB")
+        return Image.frombuffer(self.mode, self.size, self.ring.blocks[self.slot].buf, "raw", self.mode, 0, 1)
+
+    def retain(self):
+        """Return another lease on the same slot."""
+        if self._released:
+            raise ValueError("lease already released")
+        self.ring._retain(self.slot)
+        return Lease(self.ring, self.slot, self.shape, self.mode)
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.ring._release(self.slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class PixelRing:
+    """A ring of shared-memory slots with reference-counted reuse."""
+
+    def __init__(self, slots=DEFAULT_SLOTS, slot_bytes=DEFAULT_SLOT_BYTES):
+        self.slot_bytes = slot_bytes
+        self.blocks = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(slots)]
+        self.refcounts = [0] * slots
+        self._next = 0
+        self._cond = threading.Condition()
+
+    @property
+    def names(self):
+        """Block names to pass to worker processes."""
+        return [block.name for block in self.blocks]
+
+    def acquire(self, timeout=None):
+        """Reserve a free slot and return its index, or ``None`` on timeout.
+
+        The reservation counts as one reference, which :meth:`lease` hands
+        over to the returned lease and :meth:`_release` drops.
+        """
+        with self._cond:
+            end = None if timeout is None else time.monotonic() + timeout
+            while True:
+                for offset in range(len(self.blocks)):
+                    slot = (self._next + offset) % len(self.blocks)
+                    if self.refcounts[slot] == 0:
+                        self.refcounts[slot] = 1
+                        self._next = slot + 1
+                        return slot
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def lease(self, slot, shape, mode):
+        """Wrap a reserved slot that a worker has filled."""
+        return Lease(self, slot, shape, mode)
+
+    def _retain(self, slot):
+        with self._cond:
+            self.refcounts[slot] += 1
+
+    def _release(self, slot):
+        with self._cond:
+            self.refcounts[slot] -= 1
+            if self.refcounts[slot] == 0:
+                self._cond.notify_all()
+
+    def in_use(self):
+        with self._cond:
+            return sum(1 for count in self.refcounts if count)
+
+    def close(self):
+        """Free the shared blocks; outstanding leases become invalid."""
+        for block in self.blocks:
+            try:
+                block.close()
+            except BufferError:
+                # Arrays from leases are still alive; the mapping goes away
+                # with them, and unlinking below still frees the name
+                pass
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def decode_into(name, slot_bytes, path, max_size=None):
+    """Decode ``path`` into the shared block ``name``; runs in a worker.
+
+    Returns ``(shape, mode)``.  Images larger than ``max_size`` are reduced
+    first, and images that do not fit in a slot raise ``ValueError``.
+    """
+    with Image.open(path) as img:
+        if max_size:
+            img.draft("RGB", (max_size, max_size))
+        mode = img.mode if img.mode in _CHANNELS else ("RGBA" if "A" in img.getbands() else "RGB")
+        img = img.convert(mode)
+        if max_size:
+            img.thumbnail((max_size, max_size))
+    shape = (img.height, img.width, _CHANNELS[mode]) if mode != "L" else (img.height, img.width)
+    if img.width * img.height * _CHANNELS[mode] > slot_bytes:
+        raise ValueError(f"{path} does not fit in a {slot_bytes // MB} MB slot")
+    block = _attach(name)
+    _slot_array(block.buf, shape)[...] = np.asarray(img)
+    return shape, mode
+
+
+def decode_parallel(paths, ring, workers=None, max_size=None, cancel_event=None):
+    """Decode ``paths`` in worker processes through ``ring``.
+
+    Yields ``(path, lease)`` pairs in the order of ``paths``, with ``None``
+    for images that failed.  At most one image per slot is in flight, so
+    the caller must release leases to let decoding continue; holding every
+    slot's lease while asking for the next image blocks forever.
+    """
+    paths = list(paths)
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        index = 0
+        while index < len(paths) or pending:
+            while index < len(paths) and not (cancel_event and cancel_event.is_set()):
+                slot = ring.acquire(timeout=0 if pending else None)
+                if slot is None:
+                    break
+                future = pool.submit(decode_into, ring.blocks[slot].name, ring.slot_bytes, paths[index], max_size)
+                pending[future] = (paths[index], slot)
+                index += 1
+            if cancel_event and cancel_event.is_set():
+                index = len(paths)
+            if not pending:
+                break
+            future = next(iter(pending))
+            path, slot = pending.pop(future)
+            try:
+                shape, mode = future.result()
+            except Exception as exc:
+                print(f"Failed to decode {path}: {exc}")
+                ring._release(slot)
+                yield path, None
+                continue
+            yield path, ring.lease(slot, shape, mode)
+
+
+def _fill_pickled(shape):
+    return np.full(shape, 127, dtype=np.uint8)
+
+
+def _fill_shared(name, shape):
+    _slot_array(_attach(name).buf, shape)[...] = 127
+    return shape
+
+
+def benchmark(size=(4096, 4096), frames=16, workers=2):
+    """Compare returning ``frames`` RGB arrays of ``size`` by pickling and by the ring.
+
+    Returns ``{name: milliseconds per frame}``.  Workers fill the pixels
+    without decoding, so only the transfer differs.
+    """
+    shape = (size[1], size[0], 3)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers before timing
+        list(pool.map(_fill_pickled, [(1, 1, 3)] * workers))
+
+        start = time.perf_counter()
+        for array in pool.map(_fill_pickled, [shape] * frames):
+            array.sum(dtype=np.uint64)
+        results["pickle"] = (time.perf_counter() - start) * 1000 / frames
+
+        with PixelRing(slots=workers * 2, slot_bytes=shape[0] * shape[1] * shape[2]) as ring:
+            start = time.perf_counter()
+            pending = []
+            for _ in range(frames):
+                slot = ring.acquire()
+                pending.append((slot, pool.submit(_fill_shared, ring.blocks[slot].name, shape)))
+                if len(pending) == len(ring.blocks):
+                    slot, future = pending.pop(0)
+                    with ring.lease(slot, future.result(), "RGB") as lease:
+                        lease.array().sum(dtype=np.uint64)
+            for slot, future in pending:
+                with ring.lease(slot, future.result(), "RGB") as lease:
+                    lease.array().sum(dtype=np.uint64)
+            results["shared memory"] = (time.perf_counter() - start) * 1000 / frames
+    return results
+
+
+if __name__ == "__main__":
+    for name, ms in benchmark().items():
+        print(f"{name:14} {ms:8.2f} ms/frame")
@@ -0,0 +1,148 @@
+import os
+import struct
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image, features
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from imageops import (  # noqa: E402
+    REDUCED_MAX_SIDE,
+    decode_reduced,
+    decode_region,
+    open_working_image,
+    read_region,
+    supports_region_decode,
+)
+
+
+def pixels(width=300, height=200):
+    return (np.arange(width * height * 3) % 251).astype(np.uint8).reshape(height, width, 3)
+
+
+def write_tiff(path, size, tile_size, data, offsets, compression=1):
+    """Write an RGB TIFF of tiles stored at ``offsets`` into ``data``."""
+    (width, height), (tile_width, tile_height) = size, tile_size
+    count = len(offsets)
+    offsets_at = 8 + len(data)
+    counts_at = offsets_at + 4 * count
+    bits_at = counts_at + 4 * count
+    ifd_at = bits_at + 6
+    entries = [
+        (256, 4, 1, width), (257, 4, 1, height), (258, 3, 3, bits_at), (259, 3, 1, compression),
+        (262, 3, 1, 2), (277, 3, 1, 3), (284, 3, 1, 1), (322, 3, 1, tile_width),
+        (323, 3, 1, tile_height), (324, 4, count, offsets_at), (325, 4, count, counts_at),
+    ]
+    ifd = struct.pack("<H", len(entries))
+    for tag, kind, n, value in entries:
+        if kind == 3 and n == 1:
+            ifd += struct.pack("<HHIHH", tag, kind, n, value, 0)
+        else:
+            ifd += struct.pack("<HHII", tag, kind, n, value)
+    with open(path, "wb") as f:
+        f.write(b"II*\0" + struct.pack("<I", ifd_at))
+        f.write(data)
+        f.write(struct.pack(f"<{count}I", *(8 + offset for offset in offsets)))
+        f.write(struct.pack(f"<{count}I", *([tile_width * tile_height * 3] * count)))
+        f.write(struct.pack("<3H", 8, 8, 8))
+        f.write(ifd + struct.pack("<I", 0))
+
+
+def write_tiled_tiff(path, array, tile_width, tile_height):
+    """Write ``array`` as an uncompressed RGB TIFF made of tiles."""
+    height, width, _ = array.shape
+    tiles = []
+    for ty in range(0, height, tile_height):
+        for tx in range(0, width, tile_width):
+            tile = np.zeros((tile_height, tile_width, 3), np.uint8)
+            part = array[ty:ty + tile_height, tx:tx + tile_width]
+            tile[:part.shape[0], :part.shape[1]] = part
+            tiles.append(tile.tobytes())
+    offsets = [i * len(tiles[0]) for i in range(len(tiles))]
+    write_tiff(path, (width, height), (tile_width, tile_height), b"".join(tiles), offsets)
+
+
+def write_huge_tiff(path, tile, size, compression=1):
+    """Write a TIFF of ``size`` whose tiles all share the data of ``tile``.
+
+    The file stays small however many pixels it declares.
+    """
+    tile_height, tile_width, _ = tile.shape
+    count = -(-size[0] // tile_width) * -(-size[1] // tile_height)
+    write_tiff(path, size, (tile_width, tile_height), tile.tobytes(), [0] * count, compression)
+
+
+@pytest.fixture
+def tiled(tmp_path):
+    path = str(tmp_path / "tiled.tif")
+    write_tiled_tiff(path, pixels(), 64, 64)
+    return path
+
+
+@pytest.fixture
+def striped(tmp_path):
+    path = str(tmp_path / "striped.tif")
+    Image.fromarray(pixels()).save(path, compression="raw")
+    return path
+
+
+@pytest.mark.parametrize("box", [(10, 20, 150, 90), (250, 150, 300, 200), (0, 0, 64, 64)])
+def test_decode_region_of_tiled_tiff(tiled, box):
+    with Image.open(tiled) as img:
+        assert supports_region_decode(img)
+    region = decode_region(tiled, box)
+    x1, y1, x2, y2 = box
+    assert np.array_equal(np.asarray(region), pixels()[y1:y2, x1:x2])
+
+
+def test_decode_region_of_striped_tiff(striped):
+    with Image.open(striped) as img:
+        assert supports_region_decode(img)
+    region = decode_region(striped, (35, 70, 210, 133))
+    assert np.array_equal(np.asarray(region), pixels()[70:133, 35:210])
+
+
+def test_read_region_falls_back_for_compressed(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.fromarray(pixels()).save(path)
+    assert decode_region(path, (0, 0, 10, 10)) is None
+    assert np.array_equal(np.asarray(read_region(path, (5, 6, 50, 60))), pixels()[6:60, 5:50])
+
+
+@pytest.mark.parametrize("fixture", ["tiled", "striped"])
+def test_decode_reduced_matches_full_reduce(request, fixture):
+    path = request.getfixturevalue(fixture)
+    reduced = decode_reduced(path, 4)
+    expected = Image.fromarray(pixels()).reduce(4)
+    assert reduced.size == expected.size
+    assert np.array_equal(np.asarray(reduced), np.asarray(expected))
+
+
+HUGE_SIZE = (20000, 10000)
+
+
+def test_huge_tiled_tiff_opens_reduced(tmp_path):
+    assert HUGE_SIZE[0] * HUGE_SIZE[1] > Image.MAX_IMAGE_PIXELS * 2
+    path = str(tmp_path / "huge.tif")
+    tile = pixels(256, 256)
+    write_huge_tiff(path, tile, HUGE_SIZE)
+    with pytest.raises(Image.DecompressionBombError):
+        Image.open(path)
+    image, size = open_working_image(path)
+    assert size == HUGE_SIZE
+    assert max(image.size) <= REDUCED_MAX_SIDE
+    region = read_region(path, (1000, 2000, 1300, 2100))
+    expected = np.tile(tile, (HUGE_SIZE[1] // 256 + 1, HUGE_SIZE[0] // 256 + 1, 1))[2000:2100, 1000:1300]
+    assert np.array_equal(np.asarray(region), expected)
+
+
+@pytest.mark.skipif(not features.check("libtiff"), reason="needs libtiff")
+def test_huge_compressed_tiff_is_still_refused(tmp_path):
+    # Compressed tiles are decoded by libtiff as a whole, so they take the
+    # full-decode path, which keeps Pillow's decompression bomb check
+    path = str(tmp_path / "huge.tif")
+    write_huge_tiff(path, pixels(256, 256), HUGE_SIZE, compression=5)
+    with pytest.raises(Image.DecompressionBombError):
+        open_working_image(path)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pruneriq import (  # noqa: E402
+    EXACT_QUANTILE_SAMPLES,
+    StreamingQuantile,
+    export_results,
+    load_results,
+    results_working_size,
+)
+
+
+def estimate(values, p):
+    quantile = StreamingQuantile(p)
+    for value in values:
+        quantile.add(float(value))
+    return quantile.value()
+
+
+@pytest.mark.parametrize("count", [1, 5, 6, 10, EXACT_QUANTILE_SAMPLES])
+@pytest.mark.parametrize("p", [0.1, 0.25, 0.75, 0.9])
+def test_small_streams_are_exact(count, p):
+    values = np.random.default_rng(count).lognormal(size=count)
+    assert estimate(values, p) == pytest.approx(np.quantile(values, p))
+
+
+@pytest.mark.parametrize("p", [0.1, 0.25, 0.75, 0.9])
+def test_large_streams_are_close(p):
+    values = np.random.default_rng(1).lognormal(size=20 * EXACT_QUANTILE_SAMPLES)
+    assert estimate(values, p) == pytest.approx(np.quantile(values, p), rel=0.02)
+
+
+def test_no_values():
+    assert StreamingQuantile(0.5).value() is None
+
+
+@pytest.mark.parametrize("ext", [".csv", ".jsonl", ".npz"])
+@pytest.mark.parametrize("working_size", [None, 1024])
+def test_working_size_survives_export(tmp_path, ext, working_size):
+    result = {"filename": "cropped_a.png", "contrast": 50.0, "clarity": 200.0, "noise": 3.0}
+    if working_size:
+        result["working_size"] = working_size
+    path = str(tmp_path / f"results{ext}")
+    export_results([result], path)
+    assert results_working_size(load_results(path)) == working_size
+
+
+def test_mixed_working_sizes_are_refused():
+    with pytest.raises(ValueError):
+        results_working_size([{"working_size": 1024}, {}])
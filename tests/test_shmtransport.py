@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shmtransport import PixelRing, decode_parallel  # noqa: E402
+
+
+@pytest.fixture
+def ring():
+    with PixelRing(slots=2, slot_bytes=64 * 64 * 4) as ring:
+        yield ring
+
+
+def test_slot_is_reused_only_after_every_lease_is_released(ring):
+    first = ring.lease(ring.acquire(), (8, 8, 3), "RGB")
+    second = ring.lease(ring.acquire(), (8, 8, 3), "RGB")
+    assert ring.acquire(timeout=0) is None
+    extra = first.retain()
+    first.release()
+    assert ring.acquire(timeout=0) is None
+    extra.release()
+    assert ring.acquire(timeout=0) == first.slot
+    second.release()
+    assert ring.in_use() == 1
+
+
+def test_released_lease_cannot_be_used(ring):
+    lease = ring.lease(ring.acquire(), (8, 8, 3), "RGB")
+    lease.release()
+    lease.release()
+    assert ring.in_use() == 0
+    with pytest.raises(ValueError):
+        lease.array()
+    with pytest.raises(ValueError):
+        lease.retain()
+
+
+def test_acquire_waits_for_a_release(ring):
+    leases = [ring.lease(ring.acquire(), (8, 8), "L") for _ in range(2)]
+    threading.Timer(0.05, leases[1].release).start()
+    assert ring.acquire(timeout=5) == leases[1].slot
+    leases[0].release()
+
+
+def test_lease_shares_the_slot(ring):
+    lease = ring.lease(ring.acquire(), (4, 6), "L")
+    lease.array()[...] = 7
+    assert np.asarray(lease.image()).tolist() == [[7] * 6] * 4
+    lease.release()
+
+
+def test_decode_parallel_keeps_order(tmp_path, ring):
+    paths = []
+    for i in range(6):
+        path = str(tmp_path / f"{i}.png")
+        Image.new("RGB", (10 + i, 20), (i * 40, 0, 0)).save(path)
+        paths.append(path)
+    broken = str(tmp_path / "broken.png")
+    with open(broken, "wb") as f:
+        f.write(b"not an image")
+    paths.insert(3, broken)
+
+    seen = []
+    for path, lease in decode_parallel(paths, ring, workers=2):
+        if lease is None:
+            seen.append((path, None))
+            continue
+        with lease:
+            seen.append((path, lease.size, int(lease.array()[0, 0, 0])))
+    expected = [(p, (10 + i, 20), i * 40) for i, p in enumerate(p for p in paths if p != broken)]
+    expected.insert(3, (broken, None))
+    assert seen == expected
+    assert ring.in_use() == 0
@@ -0,0 +1,212 @@
+"""Reversible, non-blocking deletes.
+
+Deleted files are not removed straight away.  They are moved into a
+``.pixelpruner_trash`` folder next to them, which is a cheap rename on the
+same drive, by a single background thread, so the UI never waits on the
+filesystem.  Each trash folder keeps a ``manifest.jsonl`` recording where
+every file came from.  This lets a deletion, or everything in the trash, be
+restored later, even after a restart.
+
+Files are only removed for good by :meth:`Trash.purge`, which runs in the
+background and by default only removes files that have been in the trash
+longer than a given number of days.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+TRASH_DIR = ".pixelpruner_trash"
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def trash_dir_for(path):
+    """Return the trash folder used for files in the same folder as ``path``."""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), TRASH_DIR)
+
+
+def _append_manifest(trash_dir, entries):
+    with open(os.path.join(trash_dir, MANIFEST_NAME), "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def read_manifest(trash_dir):
+    """Return ``{staged_path: entry}`` for files currently in ``trash_dir``."""
+    staged = {}
+    path = os.path.join(trash_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return staged
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("op") == "trash":
+                staged[entry["staged"]] = entry
+            else:
+                staged.pop(entry.get("staged"), None)
+    return staged
+
+
+class Trash:
+    """Queue of trash, restore and purge operations run on one worker thread.
+
+    Operations run in the order they were requested, so a restore queued
+    after a delete always sees the file in the trash.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = []  # Batches of (original, staged) staged this session
+        self._sequence = 0
+        self._thread = None
+
+    def _submit(self, func):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put(func)
+
+    def _run(self):
+        while True:
+            func = self._queue.get()
+            try:
+                func()
+            except Exception as exc:
+                print(f"Trash operation failed: {exc}")
+            finally:
+                self._queue.task_done()
+
+    def _staged_path(self, path):
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        name = f"{int(time.time())}_{sequence}_{os.path.basename(path)}"
+        return os.path.join(trash_dir_for(path), name)
+
+    def stage(self, paths, on_done=None):
+        """Move ``paths`` to the trash in the background.
+
+        Returns the batch of ``(original, staged)`` pairs immediately.
+        ``on_done(batch)`` is called on the worker thread once the files
+        have been moved.
+        """
+        batch = [(path, self._staged_path(path)) for path in paths]
+        if not batch:
+            return batch
+        with self._lock:
+            self._batches.append(batch)
+
+        def move():
+            try:
+                for original, staged in batch:
+                    if not os.path.exists(original):
+                        continue
+                    trash_dir = os.path.dirname(staged)
+                    try:
+                        os.makedirs(trash_dir, exist_ok=True)
+                        os.replace(original, staged)
+                    except OSError as exc:
+                        print(f"Could not move {original} to the trash: {exc}")
+                        continue
+                    # Record each file as soon as it is moved, so a later
+                    # failure cannot leave it in the trash untracked
+                    _append_manifest(trash_dir, [{
+                        "op": "trash",
+                        "original": original,
+                        "staged": staged,
+                        "time": time.time(),
+                    }])
+            finally:
+                if on_done:
+                    on_done(batch)
+
+        self._submit(move)
+        return batch
+
+    def has_session_batches(self):
+        return bool(self._batches)
+
+    def restore(self, batch=None, on_done=None):
+        """Restore ``batch``, or the most recent batch of this session.
+
+        ``on_done(restored_paths)`` is called on the worker thread.
+        """
+        with self._lock:
+            if batch is None:
+                if not self._batches:
+                    return
+                batch = self._batches.pop()
+            elif batch in self._batches:
+                self._batches.remove(batch)
+        self._submit(lambda: self._restore(batch, on_done))
+
+    def restore_all(self, folders, on_done=None):
+        """Restore every file in the trash folders of ``folders``."""
+        with self._lock:
+            self._batches.clear()
+
+        def restore():
+            batch = []
+            for folder in folders:
+                trash_dir = os.path.join(folder, TRASH_DIR)
+                batch.extend(
+                    (entry["original"], staged) for staged, entry in read_manifest(trash_dir).items()
+                )
+            self._restore(batch, on_done)
+
+        self._submit(restore)
+
+    def _restore(self, batch, on_done):
+        restored = []
+        done = {}
+        for original, staged in batch:
+            if not os.path.exists(staged) or os.path.exists(original):
+                continue
+            os.replace(staged, original)
+            restored.append(original)
+            done.setdefault(os.path.dirname(staged), []).append({"op": "restore", "staged": staged})
+        for trash_dir, entries in done.items():
+            _append_manifest(trash_dir, entries)
+        if on_done:
+            on_done(restored)
+
+    def purge(self, folders, max_age_days=0, on_done=None):
+        """Permanently remove trashed files older than ``max_age_days``.
+
+        ``on_done(count)`` is called on the worker thread with the number of
+        files removed.
+        """
+        cutoff = time.time() - max_age_days * 86400
+
+        def purge():
+            count = 0
+            for folder in folders:
+                trash_dir = os.path.join(folder, TRASH_DIR)
+                purged = []
+                for staged, entry in read_manifest(trash_dir).items():
+                    if entry.get("time", 0) > cutoff:
+                        continue
+                    if os.path.exists(staged):
+                        os.remove(staged)
+                        count += 1
+                    purged.append({"op": "purge", "staged": staged})
+                if purged:
+                    _append_manifest(trash_dir, purged)
+            if max_age_days == 0:
+                with self._lock:
+                    self._batches.clear()
+            if on_done:
+                on_done(count)
+
+        self._submit(purge)
+
+    def wait(self):
+        """Block until every queued operation has finished."""
+        self._queue.join()
@@ -0,0 +1,171 @@
+"""Video files as sources.
+
+A dataset that starts as video no longer has to be dumped to thousands of
+images first.  Frames get virtual paths like archive members (see
+:mod:`archives`), ``clip.mp4::clip_f000120.png``, and are decoded on
+demand by a :class:`FrameIndex`, which keeps the video open and seeks to
+the requested frame.  Reading frames in order never seeks.
+
+:func:`sharpest_frames` picks the frame to keep from every window of a few
+seconds.  Frames are scored with PrunerIQ's clarity metric (the variance
+of the Laplacian) at a reduced size.  The video is split into runs of
+windows that are scanned in parallel, each with its own capture, so every
+worker decodes its frames sequentially.  Only the chosen frames become
+sources, so only they are viewed, cropped and written.
+"""
+
+import os
+import re
+import threading
+
+import cv2
+from PIL import Image
+
+from archives import member_path, split_path
+from jobs import default_workers, run_parallel
+from pruneriq import laplacian_clarity, resize_to_working
+
+DEFAULT_WINDOW_SECONDS = 1.0
+
+# Longest side frames are scored at
+SCAN_SIZE = 512
+
+# Windows scanned per work item; smaller runs report progress more often
+# but seek more
+WINDOWS_PER_RUN = 8
+
+_FRAME_RE = re.compile(r"_f(\d+)\.png$")
+
+_indexes = {}  # Absolute video path -> FrameIndex
+_indexes_lock = threading.Lock()
+
+
+class FrameIndex:
+    """Seekable access to the frames of one video."""
+
+    def __init__(self, path):
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            raise OSError(f"Cannot open video {path}")
+        self.path = path
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        self.frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        self.width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self._capture = capture
+        self._position = 0  # Frame the next read returns without seeking
+        self._lock = threading.Lock()  # Captures are not thread safe
+
+    def frame_path(self, index):
+        """Return the virtual path of frame ``index``."""
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        return member_path(self.path, f"{stem}_f{index:06d}.png")
+
+    def header(self):
+        """Return the header fields shared by every frame."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "mode": "RGB",
+            "format": None,
+            "size": 0,
+            "mtime_ns": self.mtime_ns,
+        }
+
+    def read(self, index):
+        """Decode frame ``index`` as an RGB image."""
+        with self._lock:
+            if index != self._position:
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, frame = self._capture.read()
+            self._position = index + 1 if ok else -1
+        if not ok:
+            raise OSError(f"Cannot read frame {index} of {self.path}")
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def windows(self, seconds):
+        """Return ``(start, end)`` frame ranges of ``seconds`` each."""
+        length = max(1, round(self.fps * seconds))
+        return [(start, min(start + length, self.frame_count)) for start in range(0, self.frame_count, length)]
+
+    def close(self):
+        with self._lock:
+            self._capture.release()
+
+
+def frame_index(video):
+    """Return the shared index of ``video``, reopening it if the file changed."""
+    key = os.path.abspath(video)
+    with _indexes_lock:
+        current = _indexes.get(key)
+        if current is not None and current.mtime_ns != os.stat(key).st_mtime_ns:
+            current.close()
+            current = None
+        if current is None:
+            current = _indexes[key] = FrameIndex(key)
+        return current
+
+
+def frame_number(path):
+    """Return the frame index encoded in the virtual path ``path``."""
+    match = _FRAME_RE.search(split_path(path)[1] or "")
+    if match is None:
+        raise ValueError(f"{path!r} is not a video frame")
+    return int(match.group(1))
+
+
+def read_frame(path):
+    """Decode the frame at the virtual path ``path``."""
+    video, _ = split_path(path)
+    return frame_index(video).read(frame_number(path))
+
+
+def _scan_run(video, run, cancel_event=None):
+    """Return the sharpest frame of every window in ``run``."""
+    capture = cv2.VideoCapture(video)
+    try:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, run[0][0])
+        best = []
+        for start, end in run:
+            if cancel_event and cancel_event.is_set():
+                break
+            sharpest, top = None, -1.0
+            for index in range(start, end):
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if max(frame.shape[:2]) > SCAN_SIZE:
+                    frame = resize_to_working(frame, SCAN_SIZE)
+                clarity = laplacian_clarity(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                if clarity > top:
+                    sharpest, top = index, clarity
+            if sharpest is not None:
+                best.append(sharpest)
+        return best
+    finally:
+        capture.release()
+
+
+def sharpest_frames(video, window_seconds=DEFAULT_WINDOW_SECONDS, workers=None,
+                    progress_callback=None, cancel_event=None):
+    """Return the virtual paths of the sharpest frame in each window of ``video``."""
+    index = frame_index(video)
+    windows = index.windows(window_seconds)
+    runs = [windows[i:i + WINDOWS_PER_RUN] for i in range(0, len(windows), WINDOWS_PER_RUN)]
+    results = run_parallel(
+        lambda run: _scan_run(index.path, run, cancel_event),
+        runs,
+        workers or default_workers(),
+        progress_callback,
+        cancel_event,
+    )
+    return [index.frame_path(frame) for best in results if best for frame in best]
+
+
+def close_all():
+    """Release every open video."""
+    with _indexes_lock:
+        for current in _indexes.values():
+            current.close()
+        _indexes.clear()